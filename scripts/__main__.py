@@ -0,0 +1,61 @@
+"""
+One entry point for the content scripts.
+
+    python scripts seed --bulk --languages all
+    python -m scripts validate --report validation.json
+    python scripts clear lessons --yes
+
+Each subcommand runs the `main()` of its script with the remaining
+arguments. A script is only imported when its subcommand runs, and the
+scripts import supabase and httpx only once they create a client, so
+`--help`, validation and generation start in well under 100 ms
+(benchmarks/bench_startup.py measures it).
+"""
+import importlib
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Subcommand: (module, description)
+COMMANDS = {
+    'seed': ('main', "Seed the lessons table from the lesson data files"),
+    'clear': ('cleartable', "Delete all rows from one or more tables"),
+    'remove-matching': ('remove_matching', "Delete the rows of a table that match column filters"),
+    'generate': ('enhanced_chinese_lessons', "Generate the enhanced Chinese lessons data file"),
+    'compile': ('lesson_compiler', "Compile lesson specs into lesson data files"),
+    'validate': ('validate_lessons', "Validate lesson data files"),
+    'index': ('vocabulary_index', "Build or query the vocabulary inverted index"),
+}
+
+
+def usage(prog: str) -> str:
+    lines = [f"usage: {prog} <command> [arguments]", "", "commands:"]
+    lines += [f"  {name:<16} {description}" for name, (_, description) in COMMANDS.items()]
+    lines += ["", f"Run '{prog} <command> --help' for the arguments of a command."]
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # `python -m scripts` runs this file as scripts.__main__, `python scripts` as __main__
+    prog = 'python -m scripts' if __spec__ and __spec__.name != '__main__' else 'python scripts'
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage(prog))
+        return 0
+    command, arguments = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"{prog}: unknown command '{command}'\n\n{usage(prog)}", file=sys.stderr)
+        return 2
+
+    # The scripts import each other as top-level modules
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+    module = importlib.import_module(COMMANDS[command][0])
+    # argparse takes the program name in its usage line from argv[0]
+    sys.argv = [f"{prog} {command}"] + arguments
+    return module.main(arguments)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
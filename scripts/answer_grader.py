@@ -0,0 +1,410 @@
+"""
+Grading of `written` activities.
+
+Every written activity is compiled into answer keys when lessons are seeded:
+
+- `exact`: the accepted answers after normalization (NFKC, lower case, no
+  punctuation or symbols, single spaces; no spaces at all around Chinese
+  characters);
+- `loose`: the same answers without accents, pinyin tone marks or tone
+  numbers and without spaces, each with the number of typos it tolerates;
+- `near`: other words of the course that are within those typos of an
+  answer ("madre" for "padre"). They are real words, not typos, so they are
+  graded wrong.
+
+Accepted answers are `correct_answer`, the optional `accepted_answers` list
+and the alternatives of answers written as "a / b". For Chinese answers the
+pinyin given in the lesson's teaching text, as in "蓝色 (lán sè)", is
+accepted too.
+
+main.py stores the keys in each written activity (`answer_keys`), where the
+lesson page grades against them, and writes all of them to
+scripts/.answer_index.json for grading submissions in bulk. The
+normalization in src/lib/answer-grading.ts must stay in step with this
+module.
+
+Usage:
+    python answer_grader.py compile spanish_data2.json chinese_data1.json
+    python answer_grader.py grade submissions.jsonl -o results.jsonl
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+from functools import lru_cache
+
+from lesson_loader import LessonDataError, stream_all_lessons
+
+INDEX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.answer_index.json')
+INDEX_VERSION = 1
+
+HAN = re.compile('[一-龥]')
+SPACES = re.compile(r'\s+')
+SPACES_AROUND_HAN = re.compile(r'\s*([一-龥])\s*')
+TONE_NUMBER = re.compile(r'([a-z])[1-5]')
+# "蓝色 (lán sè)": Chinese text followed by pinyin with at least one tone mark
+PINYIN_GLOSS = re.compile(
+    r"([一-龥]+)[？?！!。，,]*\s*[（(]"
+    r"((?=[^)）]*[āáǎàēéěèīíǐìōóǒòūúǔùǖǘǚǜ])[a-zA-ZāáǎàēéěèīíǐìōóǒòūúǔùǖǘǚǜüÀ-ÿ' ]+)[.?!]?[)）]"
+)
+
+# Frequent words that are a typo away from other words ("pero" and "perro"),
+# known to the grader even when no lesson uses them
+COMMON_WORDS = {
+    'es': """pero para por como cómo esta este esto eso ese esa todo toda bien bueno buena mucho
+             poco casa cosa donde cuando quien hola adiós gracias tiene tengo hace está están son
+             somos muy más menos""".split(),
+    'de': """aber oder auch noch nach mein dein sein ihre eine einen einem einer diese dieser hier
+             dort wann wenn dann denn doch schon sehr viel weil wird sind habe haben hast kann muss
+             will gern nein danke bitte heute""".split(),
+}
+
+
+# Submissions repeat a lot, so normalized forms are cached
+@lru_cache(maxsize=65536)
+def normalize(text: str) -> str:
+    """Exact-match form of an answer"""
+    text = unicodedata.normalize('NFKC', text).lower().replace('ß', 'ss')
+    # Punctuation and symbols never decide whether an answer is right
+    text = ''.join(' ' if unicodedata.category(c)[0] in 'PS' else c for c in text)
+    text = SPACES.sub(' ', text).strip()
+    return SPACES_AROUND_HAN.sub(r'\1', text)
+
+
+@lru_cache(maxsize=65536)
+def loosen(key: str) -> str:
+    """Tolerant form of a normalized answer: no accents, tone marks, tone numbers or spaces"""
+    text = ''.join(c for c in unicodedata.normalize('NFD', key) if unicodedata.category(c) != 'Mn')
+    return TONE_NUMBER.sub(r'\1', text).replace(' ', '')
+
+
+def allowed_edits(key: str) -> int:
+    """Typos tolerated for an answer; none for Chinese characters or very short words"""
+    if HAN.search(key) or len(key) < 4:
+        return 0
+    return 1 if len(key) < 8 else 2
+
+
+def within_edits(a: str, b: str, limit: int) -> bool:
+    """Whether the Levenshtein distance between a and b is at most `limit`"""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    if limit == 0:
+        return a == b
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i] + [0] * len(b)
+        # Only cells within `limit` of the diagonal can stay under the limit
+        low, high = max(1, i - limit), min(len(b), i + limit)
+        if low > 1:
+            current[low - 1] = limit + 1
+        for j in range(low, high + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != b[j - 1]))
+        if high < len(b):
+            current[high + 1:] = [limit + 1] * (len(b) - high)
+        if min(current[low - 1:high + 1]) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+class KnownWords:
+    """Tolerant forms of the words and phrases a course uses, grouped by length"""
+
+    def __init__(self, texts=()):
+        self.by_length = {}
+        self._seen = set()
+        self._near = {}
+        self.update(texts)
+
+    def update(self, texts):
+        for text in texts:
+            # Lessons repeat most of their words, so each text is only split once
+            if not isinstance(text, str) or text in self._seen:
+                continue
+            self._seen.add(text)
+            key = normalize(text)
+            for form in {key, *key.split(' ')}:
+                form = loosen(form)
+                if form:
+                    self.by_length.setdefault(len(form), set()).add(form)
+        self._near.clear()
+
+    def near(self, key: str, edits: int) -> frozenset:
+        """Known words other than `key` that are within `edits` typos of it"""
+        if (key, edits) not in self._near:
+            self._near[key, edits] = frozenset(
+                word for length in range(len(key) - edits, len(key) + edits + 1)
+                for word in self.by_length.get(length, ())
+                if word != key and within_edits(word, key, edits))
+        return self._near[key, edits]
+
+
+def lesson_words(lesson: dict):
+    """The vocabulary, phrases, answers, options and matching pairs of a lesson"""
+    content = lesson.get('content')
+    if isinstance(content, dict):
+        for field in ('vocabulary', 'phrases'):
+            yield from content.get(field, [])
+    for activity in lesson.get('activities', []):
+        if not isinstance(activity, dict):
+            continue
+        yield from accepted_answers(activity)
+        yield from activity.get('options', [])
+        for pair in activity.get('pairs', []):
+            if isinstance(pair, dict):
+                yield from pair.values()
+    yield from pinyin_glosses(lesson).values()
+
+
+def add_lesson_words(known: dict, language: str, lesson: dict):
+    """Add the words of a lesson to `known`, a {language_code: KnownWords} dict"""
+    if language not in known:
+        known[language] = KnownWords(COMMON_WORDS.get(language, ()))
+    known[language].update(lesson_words(lesson))
+
+
+def course_words(language: str, lessons: list) -> KnownWords:
+    """KnownWords for the lessons of one course that are already loaded, and COMMON_WORDS"""
+    known = {}
+    add_lesson_words(known, language, {})
+    for lesson in lessons:
+        if isinstance(lesson, dict):
+            add_lesson_words(known, language, lesson)
+    return known[language]
+
+
+def known_words(paths: list) -> dict:
+    """{language_code: KnownWords} for the lessons in the data files and COMMON_WORDS"""
+    known = {}
+    for path in paths:
+        for language, lesson in stream_all_lessons(path):
+            if isinstance(lesson, dict):
+                add_lesson_words(known, language, lesson)
+    return known
+
+
+def pinyin_glosses(lesson: dict) -> dict:
+    """Pinyin written next to Chinese words in a lesson's teaching text"""
+    glosses = {}
+    for activity in lesson.get('activities', []):
+        if isinstance(activity, dict) and activity.get('type') == 'teaching':
+            for hanzi, pinyin in PINYIN_GLOSS.findall(str(activity.get('content', ''))):
+                glosses.setdefault(hanzi, pinyin.strip())
+    return glosses
+
+
+def accepted_answers(activity: dict) -> list:
+    """Every answer a written activity accepts, as written in the data file"""
+    correct = activity.get('correct_answer')
+    answers = list(correct) if isinstance(correct, list) else [correct]
+    answers += activity.get('accepted_answers', [])
+    expanded = []
+    for answer in answers:
+        if isinstance(answer, str) and answer.strip():
+            expanded.append(answer)
+            if '/' in answer:
+                expanded.extend(part for part in answer.split('/') if part.strip())
+    return expanded
+
+
+def compile_activity(activity: dict, glosses: dict = None, known: KnownWords = None) -> dict:
+    """Answer keys for one written activity; `known` words of the course are never accepted as typos"""
+    answers = accepted_answers(activity)
+    for answer in list(answers):
+        if glosses and answer.strip() in glosses:
+            answers.append(glosses[answer.strip()])
+
+    # In order, so the first key is the main answer
+    exact = [key for key in dict.fromkeys(normalize(answer) for answer in answers) if key]
+    loose = {}
+    for key in exact:
+        edits = activity.get('max_edits', allowed_edits(key))
+        loose[loosen(key)] = max(loose.get(loosen(key), 0), edits)
+    compiled = {'exact': exact, 'loose': sorted([key, edits] for key, edits in loose.items())}
+    return add_near(compiled, known) if known is not None else compiled
+
+
+def add_near(compiled: dict, known: KnownWords) -> dict:
+    """Record the known words that are a typo away from the answers, so they are graded wrong"""
+    loose = dict(compiled['loose'])
+    near = {word for key, edits in loose.items() if edits for word in known.near(key, edits)} - set(loose)
+    if near:
+        compiled['near'] = sorted(near)
+    return compiled
+
+
+def compile_lesson(lesson: dict, known: KnownWords = None) -> list:
+    """Answer keys for each activity of a lesson (None for activities that are not written)"""
+    glosses = pinyin_glosses(lesson)
+    return [compile_activity(activity, glosses, known)
+            if isinstance(activity, dict) and activity.get('type') == 'written' else None
+            for activity in lesson.get('activities', [])]
+
+
+def with_answer_keys(lesson: dict, known: KnownWords = None) -> dict:
+    """A copy of a lesson whose written activities carry their answer keys"""
+    keys = compile_lesson(lesson, known)
+    if not any(keys):
+        return lesson
+    activities = [dict(activity, answer_keys=key) if key else activity
+                  for activity, key in zip(lesson['activities'], keys)]
+    return dict(lesson, activities=activities)
+
+
+def activity_id(language_code: str, lesson_number: int, order) -> str:
+    return f"{language_code}:{lesson_number}:{order}"
+
+
+class AnswerIndex:
+    """Answer keys of many written activities, ready for grading"""
+
+    def __init__(self, entries: dict = None):
+        self.entries = {}
+        self.compiled = {}
+        for key, compiled in (entries or {}).items():
+            self.add(key, compiled)
+
+    def add(self, key: str, compiled: dict):
+        self.compiled[key] = compiled
+        loose = {answer: edits for answer, edits in compiled['loose']}
+        # Lookups only need sets; the typo check walks the (few) loose answers
+        self.entries[key] = (frozenset(compiled['exact']), loose, frozenset(compiled.get('near', ())),
+                             compiled['exact'][0] if compiled['exact'] else '')
+
+    def __len__(self):
+        return len(self.entries)
+
+    def grade(self, key: str, answer: str) -> dict:
+        """
+        Grade one submission.
+
+        Returns:
+            Dict with 'correct', 'match' ('exact', 'loose', 'typo' or None)
+            and the 'expected' answer in normalized form
+        """
+        exact, loose, near, expected = self.entries[key]
+        submitted = normalize(answer)
+        if submitted in exact:
+            return {'correct': True, 'match': 'exact', 'expected': expected}
+        relaxed = loosen(submitted)
+        if relaxed in loose:
+            return {'correct': True, 'match': 'loose', 'expected': expected}
+        if relaxed in near:
+            return {'correct': False, 'match': None, 'expected': expected}
+        for candidate, edits in loose.items():
+            if edits and within_edits(relaxed, candidate, edits):
+                return {'correct': True, 'match': 'typo', 'expected': expected}
+        return {'correct': False, 'match': None, 'expected': expected}
+
+    def grade_batch(self, submissions) -> list:
+        """Grade (activity id, answer) pairs; unknown activities get an 'error' instead"""
+        results = []
+        for key, answer in submissions:
+            if key in self.entries:
+                results.append(self.grade(key, answer))
+            else:
+                results.append({'correct': False, 'match': None, 'error': f"unknown activity '{key}'"})
+        return results
+
+    @classmethod
+    def from_data_files(cls, paths: list) -> 'AnswerIndex':
+        """Compile every written activity in the data files; lessons are numbered as main.py seeds them"""
+        index = cls()
+        known = {}
+        seen = {}
+        for path in paths:
+            numbers = {}
+            for language, lesson in stream_all_lessons(path):
+                if seen.setdefault(language, path) != path:
+                    raise LessonDataError(f"'{language}' lessons are in both {seen[language]} and {path}; "
+                                          "lessons are numbered per data file, so use one file per language")
+                numbers[language] = numbers.get(language, 0) + 1
+                if not isinstance(lesson, dict):
+                    continue
+                # Known words are collected in the same pass and applied once all lessons are read
+                add_lesson_words(known, language, lesson)
+                for activity, compiled in zip(lesson.get('activities', []), compile_lesson(lesson)):
+                    if compiled:
+                        key = activity_id(language, numbers[language], activity.get('order'))
+                        index.compiled[key] = compiled
+        for key, compiled in index.compiled.items():
+            index.add(key, add_near(compiled, known[key.split(':')[0]]))
+        return index
+
+    def save(self, path: str = INDEX_FILE):
+        temporary = path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'activities': self.compiled}, f,
+                      ensure_ascii=False, separators=(',', ':'))
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str = INDEX_FILE) -> 'AnswerIndex':
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"{path} was written by another version of answer_grader.py; compile it again")
+        return cls(data['activities'])
+
+
+def read_submissions(path: str):
+    """(activity id, answer) pairs from a JSON-lines file of {"activity": ..., "answer": ...}"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                yield item['activity'], item['answer']
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compile answer keys and grade written activities")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    compile_parser = commands.add_parser('compile', help="Compile the answer index from lesson data files")
+    compile_parser.add_argument('data_files', nargs='+', help="Lesson data files")
+    compile_parser.add_argument('-o', '--output', default=INDEX_FILE,
+                                help="Index file (default: scripts/.answer_index.json)")
+
+    grade_parser = commands.add_parser('grade', help="Grade a JSON-lines file of submissions")
+    grade_parser.add_argument('submissions', help='JSON lines of {"activity": "es:3:5", "answer": "..."}')
+    grade_parser.add_argument('--index', default=INDEX_FILE, help="Index file (default: scripts/.answer_index.json)")
+    grade_parser.add_argument('-o', '--output', help="Write one JSON result per submission to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == 'compile':
+        try:
+            index = AnswerIndex.from_data_files(args.data_files)
+        except (OSError, LessonDataError) as e:
+            print(f"✗ {str(e)}")
+            return 1
+        index.save(args.output)
+        print(f"✓ Compiled {len(index)} written activities into {args.output}")
+        return 0
+
+    index = AnswerIndex.load(args.index)
+    submissions = list(read_submissions(args.submissions))
+    started = time.perf_counter()
+    results = index.grade_batch(submissions)
+    elapsed = time.perf_counter() - started
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            for (key, answer), result in zip(submissions, results):
+                f.write(json.dumps({'activity': key, 'answer': answer, **result}, ensure_ascii=False) + '\n')
+
+    correct = sum(result['correct'] for result in results)
+    errors = sum('error' in result for result in results)
+    per_item = elapsed / len(results) * 1e6 if results else 0
+    print(f"✓ Graded {len(results)} submissions in {elapsed:.3f}s ({per_item:.1f} µs each): "
+          f"{correct} correct, {len(results) - correct - errors} incorrect, {errors} unknown activities")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
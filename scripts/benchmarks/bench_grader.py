@@ -0,0 +1,115 @@
+"""
+Benchmark answer_grader.py over a synthetic catalog.
+
+First checks the grader against a few fixed cases (CASES), then compiles
+the answer index for every written activity in the catalog and grades a
+batch of submissions that mixes exact answers, answers in upper case without
+accents, typos and wrong answers.
+
+Usage:
+    python benchmarks/bench_grader.py --lessons 100000 --submissions 200000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from answer_grader import AnswerIndex, KnownWords, compile_activity, known_words  # noqa: E402
+from synthetic import WORDS, write_corpus  # noqa: E402
+
+# (correct answer, submission, expected match): typos are forgiven, other words of the course are not
+CASES = [
+    ('padre', 'Padre', 'exact'),
+    ('tío', 'tio', 'loose'),
+    ('perro', 'perrro', 'typo'),
+    ('hermano', 'hermnao', None),
+    ('hermano', 'hermanp', 'typo'),
+    ('hermano', 'hermana', None),
+    ('padre', 'madre', None),
+    ('perro', 'pero', None),
+    ('gato', 'pato', 'typo'),
+    ('蓝色', '蓝', None),
+]
+
+
+def check_grading(known: KnownWords) -> list:
+    """The CASES the grader gets wrong, as (answer, submission, expected, got)"""
+    failures = []
+    for answer, submission, expected in CASES:
+        index = AnswerIndex({'case': compile_activity({'type': 'written', 'correct_answer': answer}, None, known)})
+        got = index.grade('case', submission)['match']
+        if got != expected:
+            failures.append((answer, submission, expected, got))
+    return failures
+
+
+def make_submissions(index: AnswerIndex, count: int, seed: int = 0) -> list:
+    """(activity id, answer) pairs: a quarter each exact, upper case without accents, misspelt and wrong"""
+    rng = random.Random(seed)
+    keys = list(index.compiled)
+    submissions = []
+    for number in range(count):
+        key = rng.choice(keys)
+        answer = index.compiled[key]['exact'][0]
+        kind = number % 4
+        if kind == 1:
+            answer = answer.replace('ñ', 'n').upper()
+        elif kind == 2 and len(answer) > 3:
+            position = rng.randrange(len(answer))
+            answer = answer[:position] + 'x' + answer[position + 1:]
+        elif kind == 3:
+            answer = rng.choice(WORDS) + 'zz'
+        submissions.append((key, answer))
+    return submissions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the written-answer grader")
+    parser.add_argument('--lessons', type=int, default=100_000, help="Lessons in the catalog (default: 100000)")
+    parser.add_argument('--submissions', type=int, default=200_000,
+                        help="Submissions to grade (default: 200000)")
+    args = parser.parse_args(argv)
+
+    data_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'spanish_data2.json')
+    failures = check_grading(known_words([data_file])['es'])
+    for answer, submission, expected, got in failures:
+        print(f"✗ '{submission}' for '{answer}': expected {expected or 'wrong'}, got {got or 'wrong'}")
+    if failures:
+        return 1
+    print(f"✓ {len(CASES)} grading cases")
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_corpus(directory, args.lessons)
+
+        started = time.perf_counter()
+        index = AnswerIndex.from_data_files(paths)
+        elapsed = time.perf_counter() - started
+        index_path = os.path.join(directory, 'answer_index.json')
+        index.save(index_path)
+        size = os.path.getsize(index_path)
+        print(f"Compiled {len(index)} written activities from {args.lessons} lessons in {elapsed:.2f}s "
+              f"({len(index) / elapsed:,.0f} activities/s), index {size / 1e6:.1f} MB")
+
+        started = time.perf_counter()
+        index = AnswerIndex.load(index_path)
+        print(f"Loaded the index in {time.perf_counter() - started:.2f}s")
+
+    submissions = make_submissions(index, args.submissions)
+    started = time.perf_counter()
+    results = index.grade_batch(submissions)
+    elapsed = time.perf_counter() - started
+    matches = {}
+    for result in results:
+        matches[result['match']] = matches.get(result['match'], 0) + 1
+    print(f"Graded {len(results)} submissions in {elapsed:.2f}s "
+          f"({elapsed / len(results) * 1e6:.2f} µs each, {len(results) / elapsed:,.0f}/s)")
+    print("  " + ", ".join(f"{match or 'wrong'}: {count}" for match, count in sorted(
+        matches.items(), key=lambda item: str(item[0]))))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
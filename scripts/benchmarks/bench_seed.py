@@ -0,0 +1,182 @@
+"""
+Benchmark main.py and cleartable.py against the local PostgREST stand-in.
+
+For each catalog size a synthetic data file is generated, seeded with
+main.py and then cleared again with cleartable.py, each in its own
+process. The stand-in records every request, so the report shows rows per
+second, request latency percentiles and the peak RSS of each script
+without touching a real Supabase project. With `--backend sqlite` the
+scripts use the embedded SQLite backend instead, and the latencies come from
+their `--trace` files.
+
+Usage:
+    python benchmarks/bench_seed.py --sizes 100 1000 10000 --latency-ms 20
+    python benchmarks/bench_seed.py --sizes 1000 --error-rate 0.02 --json results.json
+    python benchmarks/bench_seed.py --sizes 1000 10000 --backend sqlite
+"""
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPT_DIR)
+
+from postgrest_standin import DUMMY_KEY, start_server  # noqa: E402
+from supabase_tracing import percentile  # noqa: E402
+from synthetic import write_corpus  # noqa: E402
+
+
+def run_script(args: list, env: dict, verbose: bool = False) -> dict:
+    """Run a script to completion, returning its exit code, duration and peak RSS"""
+    started = time.perf_counter()
+    output = None if verbose else subprocess.DEVNULL
+    process = subprocess.Popen([sys.executable] + args, cwd=SCRIPT_DIR, env=env,
+                               stdout=output, stderr=output)
+    # wait4 reports the resource usage of this child only
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    elapsed = time.perf_counter() - started
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return {
+        'exit_code': process.returncode,
+        'seconds': elapsed,
+        'peak_rss_mb': usage.ru_maxrss * scale / 1e6,
+    }
+
+
+def summarize(phase: str, run: dict, requests: list, rows: int) -> dict:
+    latencies = [request['seconds'] * 1000 for request in requests]
+    errors = sum(1 for request in requests if request['status'] >= 400)
+    return {
+        'phase': phase,
+        'rows': rows,
+        'seconds': round(run['seconds'], 3),
+        'rows_per_second': round(rows / run['seconds'], 1) if run['seconds'] else 0,
+        'requests': len(requests),
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 0.50), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+        'peak_rss_mb': round(run['peak_rss_mb'], 1),
+        'exit_code': run['exit_code'],
+    }
+
+
+def seed_command(path: str, directory: str, args) -> list:
+    return ['main.py', '--bulk', '--languages', 'es', '--data-file', f'es={path}',
+            '--chunk-size', str(args.chunk_size), '--skip-validation',
+            '--answer-index', os.path.join(directory, 'answer_index.json')]
+
+
+def clear_command(args) -> list:
+    return ['cleartable.py', 'lessons', '--yes', '--batch-size', str(args.batch_size)]
+
+
+def bench_size(server, size: int, directory: str, args) -> list:
+    path = write_corpus(directory, size, files=1)[0]
+    env = dict(os.environ,
+               NEXT_PUBLIC_SUPABASE_URL=server.url,
+               SUPABASE_SERVICE_ROLE_KEY=DUMMY_KEY,
+               NEXT_PUBLIC_SUPABASE_ANON_KEY=DUMMY_KEY)
+    server.db.reset()
+    results = []
+
+    server.stats.reset()
+    run = run_script(seed_command(path, directory, args), env, args.verbose)
+    rows = len(server.db.table('lessons')[0])
+    results.append(summarize('seed', run, server.stats.snapshot(server.db)['requests'], rows))
+
+    server.stats.reset()
+    run = run_script(clear_command(args), env, args.verbose)
+    cleared = rows - len(server.db.table('lessons')[0])
+    results.append(summarize('clear', run, server.stats.snapshot(server.db)['requests'], cleared))
+
+    for result in results:
+        result['size'] = size
+    return results
+
+
+def traced_requests(path: str) -> list:
+    """The statements recorded in a --trace file, in the stand-in's request format"""
+    with open(path, encoding='utf-8') as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    return [{'seconds': event['ms'] / 1000, 'status': event['status'] or 500} for event in events]
+
+
+def count_lessons(database: str) -> int:
+    connection = sqlite3.connect(database)
+    try:
+        return connection.execute('SELECT COUNT(*) FROM lessons').fetchone()[0]
+    finally:
+        connection.close()
+
+
+def bench_size_sqlite(size: int, directory: str, args) -> list:
+    """Like bench_size, with the scripts on the embedded SQLite backend"""
+    path = write_corpus(directory, size, files=1)[0]
+    database = os.path.join(directory, f'bench_{size}.db')
+    env = dict(os.environ, SUPABASE_SQLITE_DB=database)
+    trace = os.path.join(directory, 'trace.jsonl')
+    results = []
+
+    run = run_script(seed_command(path, directory, args) + ['--trace', trace], env, args.verbose)
+    rows = count_lessons(database)
+    results.append(summarize('seed', run, traced_requests(trace), rows))
+
+    run = run_script(clear_command(args) + ['--trace', trace], env, args.verbose)
+    cleared = rows - count_lessons(database)
+    results.append(summarize('clear', run, traced_requests(trace), cleared))
+
+    for result in results:
+        result['size'] = size
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the seeding and clearing scripts offline")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000],
+                        help="Catalog sizes in lessons (default: 100 1000 10000)")
+    parser.add_argument('--backend', choices=['standin', 'sqlite'], default='standin',
+                        help="Run the scripts against the PostgREST stand-in or the embedded SQLite backend")
+    parser.add_argument('--latency-ms', type=float, default=0, help="Latency added to every request")
+    parser.add_argument('--error-rate', type=float, default=0, help="Fraction of requests that fail with 503")
+    parser.add_argument('--chunk-size', type=int, default=50, help="main.py --chunk-size (default: 50)")
+    parser.add_argument('--batch-size', type=int, default=500, help="cleartable.py --batch-size (default: 500)")
+    parser.add_argument('--json', help="Also write the results to this file")
+    parser.add_argument('--verbose', action='store_true', help="Show the scripts' own output")
+    args = parser.parse_args(argv)
+
+    results = []
+    if args.backend == 'sqlite':
+        with tempfile.TemporaryDirectory() as directory:
+            for size in args.sizes:
+                results.extend(bench_size_sqlite(size, directory, args))
+    else:
+        server = start_server(latency_ms=args.latency_ms, error_rate=args.error_rate)
+        with tempfile.TemporaryDirectory() as directory:
+            for size in args.sizes:
+                results.extend(bench_size(server, size, directory, args))
+        server.shutdown()
+
+    header = f"{'size':>7} {'phase':6} {'rows/s':>9} {'secs':>7} {'reqs':>6} {'errs':>5} " \
+             f"{'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} {'RSS MB':>7}"
+    print(header)
+    for r in results:
+        print(f"{r['size']:>7} {r['phase']:6} {r['rows_per_second']:>9.1f} {r['seconds']:>7.2f} "
+              f"{r['requests']:>6} {r['errors']:>5} {r['p50_ms']:>7.2f} {r['p95_ms']:>7.2f} "
+              f"{r['p99_ms']:>7.2f} {r['peak_rss_mb']:>7.1f}"
+              + ('' if r['exit_code'] == 0 else f"  (exit {r['exit_code']})"))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'backend': args.backend, 'latency_ms': args.latency_ms, 'error_rate': args.error_rate, 'results': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
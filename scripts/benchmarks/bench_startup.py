@@ -0,0 +1,111 @@
+"""
+Benchmark how long the content CLI takes to start.
+
+Every subcommand of `python scripts` is run with `--help` several times,
+each in a fresh interpreter, next to a bare `python -c pass` as the floor.
+The report shows the wall time per command, the time it adds to the bare
+interpreter and the modules that took the longest to import (from
+`python -X importtime`), so an import that slips back onto the startup path
+shows up. With `--budget-ms`, the exit code is 1 when the median time a
+command adds is over the budget, for use in CI.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 50 --budget-ms 100 --json startup.json
+"""
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def cli_commands() -> list:
+    """The subcommands of scripts/__main__.py (which cannot be imported as `__main__` here)"""
+    spec = importlib.util.spec_from_file_location('scripts_cli', os.path.join(SCRIPT_DIR, '__main__.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return list(module.COMMANDS)
+
+
+def run_times(command: list, runs: int) -> list:
+    """Wall time in milliseconds of each of `runs` runs of a command"""
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        times.append((time.perf_counter() - started) * 1000)
+    return times
+
+
+def top_level_imports(command: list) -> list:
+    """(module, cumulative import ms) of the top-level imports of a command"""
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + command[1:],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Only top-level imports; nested ones are included in their parent's time
+        if not name.startswith('  '):
+            imports.append((name.strip(), int(cumulative) / 1000))
+    return imports
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the startup time of the content CLI")
+    parser.add_argument('--runs', type=int, default=20, help="Runs per command (default: 20)")
+    parser.add_argument('--budget-ms', type=float, help="Fail when the median time a command adds to the interpreter's startup exceeds this")
+    parser.add_argument('--imports', type=int, default=3, help="Slowest imports to list per command (default: 3)")
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    floor_command = [sys.executable, '-c', 'pass']
+    floor = statistics.median(run_times(floor_command, args.runs))
+    # Modules the bare interpreter imports anyway (site, encodings, ...)
+    startup_modules = {name for name, _ in top_level_imports(floor_command)}
+
+    results = []
+    print(f"{'command':24} {'min ms':>7} {'median':>7} {'p95':>7} {'added':>7}  slowest imports (ms)")
+    print(f"{'python -c pass':24} {'':>7} {floor:>7.1f}")
+    for name in cli_commands():
+        command = [sys.executable, SCRIPT_DIR, name, '--help']
+        times = sorted(run_times(command, args.runs))
+        imports = sorted((item for item in top_level_imports(command) if item[0] not in startup_modules),
+                         key=lambda item: -item[1])[:args.imports]
+        median = statistics.median(times)
+        result = {
+            'command': f'{name} --help',
+            'min_ms': round(times[0], 1),
+            'median_ms': round(median, 1),
+            'p95_ms': round(times[min(len(times) - 1, int(len(times) * 0.95))], 1),
+            'added_ms': round(median - floor, 1),
+            'imports': [{'module': module, 'ms': round(ms, 1)} for module, ms in imports],
+        }
+        results.append(result)
+        listed = ', '.join(f"{module} {ms:.1f}" for module, ms in imports)
+        print(f"{result['command']:24} {result['min_ms']:>7.1f} {result['median_ms']:>7.1f} "
+              f"{result['p95_ms']:>7.1f} {result['added_ms']:>7.1f}  {listed}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'runs': args.runs, 'python': sys.version.split()[0], 'floor_ms': round(floor, 1),
+                       'results': results}, f, indent=2)
+
+    if args.budget_ms is not None:
+        over = [r['command'] for r in results if r['added_ms'] > args.budget_ms]
+        if over:
+            print(f"\n✗ Over the {args.budget_ms:.0f} ms budget: {', '.join(over)}")
+            return 1
+        print(f"\n✓ Every command adds less than {args.budget_ms:.0f} ms to the interpreter's startup")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
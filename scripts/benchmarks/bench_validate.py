@@ -0,0 +1,46 @@
+"""
+Benchmark validate_lessons.py over a synthetic catalog.
+
+Usage:
+    python benchmarks/bench_validate.py --lessons 100000 --files 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import write_corpus  # noqa: E402
+from validate_lessons import validate_files  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the lesson validator")
+    parser.add_argument('--lessons', type=int, default=100_000, help="Lessons in the corpus (default: 100000)")
+    parser.add_argument('--files', type=int, default=8, help="Data files to split them across (default: 8)")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, None],
+                        help="Worker counts to compare (default: 1 and one per CPU)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        paths = write_corpus(directory, args.lessons, args.files)
+        size = sum(os.path.getsize(path) for path in paths)
+        print(f"Generated {args.lessons} lessons in {len(paths)} files "
+              f"({size / 1e6:.1f} MB) in {time.perf_counter() - started:.1f}s")
+
+        for workers in args.workers:
+            started = time.perf_counter()
+            report = validate_files(paths, workers)
+            elapsed = time.perf_counter() - started
+            summary = report['summary']
+            label = workers or os.cpu_count()
+            print(f"workers={label}: {summary['lessons']} lessons, {summary['activities']} activities "
+                  f"in {elapsed:.2f}s ({summary['lessons'] / elapsed:,.0f} lessons/s, "
+                  f"{size / 1e6 / elapsed:.1f} MB/s), {summary['errors']} errors")
+
+
+if __name__ == "__main__":
+    main()
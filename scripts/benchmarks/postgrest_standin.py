@@ -0,0 +1,530 @@
+"""
+Local stand-in for the parts of the PostgREST API the scripts use.
+
+It keeps tables in memory and answers the requests that supabase-py sends
+for select/insert/upsert/update/delete with eq, neq, gt, gte, lt, lte and in
+filters, order, limit, `Prefer: count=exact` and `on_conflict` upserts.
+Writes that complete a lesson run the on_lesson_completed trigger, which
+adds XP to user_profiles. Latency and error rates can be injected to see how
+the scripts behave against a slow or flaky project. Every request is timed,
+and GET /__stats returns the latencies recorded so far and how long requests
+waited for each table's lock.
+
+Run it on its own:
+    python benchmarks/postgrest_standin.py --port 54321 --latency-ms 20 --error-rate 0.01
+
+and point the scripts at it:
+    NEXT_PUBLIC_SUPABASE_URL=http://127.0.0.1:54321 SUPABASE_SERVICE_ROLE_KEY=<any JWT-shaped string>
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+# Unique keys per table, from supabase/migrations, used to resolve upserts
+# and reject duplicate inserts
+UNIQUE_KEYS = {
+    'language_courses': [('language_code',)],
+    'lessons': [('course_id', 'lesson_number')],
+    'user_lesson_progress': [('user_id', 'lesson_id')],
+    'user_reading_progress': [('user_id', 'text_id')],
+    'user_vocabulary': [('user_id', 'word', 'language_code')],
+    'translation_cache': [('source_lang', 'target_lang', 'text')],
+}
+
+# Columns filled in on insert when missing, per table
+DEFAULTS = {
+    'lessons': {'is_published': True, 'xp_reward': 10},
+    'user_profiles': {'xp_points': 0, 'lessons_completed': 0, 'words_learned': 0, 'current_streak': 0},
+    'user_lesson_progress': {'status': 'not_started', 'attempts': 0, 'time_spent_seconds': 0},
+    'user_vocabulary': {'times_reviewed': 1},
+}
+
+DEFAULT_COURSES = [
+    ('es', 'Spanish'), ('fr', 'French'), ('de', 'German'), ('it', 'Italian'),
+    ('pt', 'Portuguese'), ('ja', 'Japanese'), ('ko', 'Korean'), ('zh', 'Chinese'),
+]
+
+# A syntactically valid JWT, accepted by supabase-py's key check
+DUMMY_KEY = ('eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.'
+             'eyJyb2xlIjoic2VydmljZV9yb2xlIiwiaXNzIjoic3RhbmRpbiJ9.'
+             'c3RhbmRpbi1zaWduYXR1cmU')
+
+
+class ConflictError(Exception):
+    """A write violated one of the table's unique keys"""
+
+
+def _coerce(raw: str, current):
+    """Convert a filter value from the query string to the type stored in the row"""
+    if isinstance(current, bool):
+        return raw.lower() == 'true'
+    if isinstance(current, int):
+        try:
+            return int(raw)
+        except ValueError:
+            return raw
+    if isinstance(current, float):
+        return float(raw)
+    return raw
+
+
+def _split_in_list(raw: str) -> list:
+    """Parse the `(a,b,"c,d")` value of an in filter"""
+    inner = raw[1:-1] if raw.startswith('(') and raw.endswith(')') else raw
+    items, current, quoted = [], '', False
+    for char in inner:
+        if char == '"':
+            quoted = not quoted
+        elif char == ',' and not quoted:
+            items.append(current)
+            current = ''
+        else:
+            current += char
+    if current or inner:
+        items.append(current)
+    return items
+
+
+@lru_cache(maxsize=64)
+def _in_values(raw: str, kind: type) -> frozenset:
+    """Members of an in filter, converted to the column's type once per request"""
+    return frozenset(_coerce(item, kind()) for item in _split_in_list(raw))
+
+
+def _matches(row: dict, filters: list) -> bool:
+    for column, operator, raw in filters:
+        value = row.get(column)
+        if operator == 'is':
+            if (raw == 'null') != (value is None):
+                return False
+            continue
+        if value is None:
+            return False
+        if operator == 'in':
+            if value not in _in_values(raw, type(value)):
+                return False
+            continue
+        target = _coerce(raw, value)
+        try:
+            ok = {
+                'eq': value == target, 'neq': value != target,
+                'gt': value > target, 'gte': value >= target,
+                'lt': value < target, 'lte': value <= target,
+            }[operator]
+        except (KeyError, TypeError):
+            return False
+        if not ok:
+            return False
+    return True
+
+
+class Database:
+    """In-memory tables with per-table locks"""
+
+    def __init__(self):
+        self.tables = {}
+        self.locks = {}
+        self.lock_wait = {}
+        self.indexes = {}
+        self._guard = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._guard:
+            self.tables = {'language_courses': [
+                {'id': str(uuid.uuid4()), 'language_code': code, 'language_name': name, 'is_active': True}
+                for code, name in DEFAULT_COURSES
+            ]}
+            self.lock_wait = {}
+            self.indexes = {}
+
+    def table(self, name: str):
+        """Return (rows, lock) for a table, creating it on first use"""
+        with self._guard:
+            rows = self.tables.setdefault(name, [])
+            lock = self.locks.setdefault(name, threading.Lock())
+        return rows, lock
+
+    def acquire(self, name: str):
+        """Lock a table, recording how long the caller had to wait"""
+        rows, lock = self.table(name)
+        started = time.perf_counter()
+        lock.acquire()
+        waited = time.perf_counter() - started
+        with self._guard:
+            total, count, longest = self.lock_wait.get(name, (0.0, 0, 0.0))
+            self.lock_wait[name] = (total + waited, count + 1, max(longest, waited))
+        return rows, lock
+
+    def key_indexes(self, name: str, rows: list, keys: list) -> list:
+        """
+        Lookups of a table's rows by the values of each unique key. They are
+        built on first use and kept until a write could make them stale, so
+        a write does not scan the table; the caller holds the table's lock.
+        """
+        with self._guard:
+            cached = self.indexes.setdefault(name, {})
+        indexes = []
+        for key in keys:
+            if key not in cached:
+                index = {}
+                for existing in rows:
+                    values = tuple(existing.get(column) for column in key)
+                    if None not in values:
+                        index[values] = existing
+                cached[key] = index
+            indexes.append((key, cached[key]))
+        return indexes
+
+    def index_row(self, name: str, row: dict):
+        """Add a new row to the table's cached indexes"""
+        for key, index in self.indexes.get(name, {}).items():
+            values = tuple(row.get(column) for column in key)
+            if None not in values:
+                index[values] = row
+
+    def drop_indexes(self, name: str, columns=None):
+        """Forget the cached indexes of a table, or only those on any of `columns`"""
+        with self._guard:
+            cached = self.indexes.get(name, {})
+            for key in list(cached):
+                if columns is None or set(key) & set(columns):
+                    del cached[key]
+
+    def unique_match(self, indexes: list, row: dict):
+        for key, index in indexes:
+            values = tuple(row.get(column) for column in key)
+            if None not in values and values in index:
+                return index[values]
+        return None
+
+    def on_lesson_completed(self, completed: list):
+        """
+        The on_lesson_completed trigger (003_create_lessons.sql): add the
+        lesson's XP and one completed lesson to the learner's profile. Called
+        with the user_lesson_progress lock held, as the trigger runs inside
+        the statement.
+        """
+        lessons, lock = self.acquire('lessons')
+        try:
+            by_id = self.key_indexes('lessons', lessons, [('id',)])[0][1]
+            rewards = [(row, by_id.get((row.get('lesson_id'),))) for row in completed]
+        finally:
+            lock.release()
+
+        now = datetime.now(timezone.utc).isoformat()
+        profiles, lock = self.acquire('user_profiles')
+        try:
+            by_id = self.key_indexes('user_profiles', profiles, [('id',)])[0][1]
+            for row, lesson in rewards:
+                profile = by_id.get((row.get('user_id'),))
+                if profile is None:
+                    continue
+                profile['lessons_completed'] = (profile.get('lessons_completed') or 0) + 1
+                # Like the SQL, which adds NULL when the lesson does not exist
+                reward = lesson.get('xp_reward') if lesson else None
+                profile['xp_points'] = None if reward is None else (profile.get('xp_points') or 0) + reward
+                profile['last_activity_date'] = now
+                profile['updated_at'] = now
+        finally:
+            lock.release()
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = []
+
+    def record(self, method: str, table: str, status: int, seconds: float, rows: int):
+        with self.lock:
+            self.requests.append((method, table, status, seconds, rows))
+
+    def reset(self):
+        with self.lock:
+            self.requests = []
+
+    def snapshot(self, db: Database) -> dict:
+        with self.lock:
+            requests = list(self.requests)
+        return {
+            'requests': [
+                {'method': m, 'table': t, 'status': s, 'seconds': round(sec, 6), 'rows': r}
+                for m, t, s, sec, r in requests
+            ],
+            'lock_wait': {
+                table: {'seconds': round(total, 6), 'acquisitions': count, 'max_seconds': round(longest, 6)}
+                for table, (total, count, longest) in db.lock_wait.items()
+            },
+        }
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'PostgRESTStandIn/1.0'
+    # Headers and body go out in separate writes; with Nagle's algorithm the
+    # body waits for the client's delayed ACK, adding ~40 ms to a keep-alive request
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    # -- helpers -------------------------------------------------------------
+
+    def _send(self, status: int, body=None, headers: dict = None):
+        payload = b'' if body is None else json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if payload:
+            self.wfile.write(payload)
+
+    def _error(self, status: int, message: str, code: str = 'PGRST000'):
+        self._send(status, {'code': code, 'message': message, 'details': None, 'hint': None})
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return None
+        return json.loads(self.rfile.read(length).decode('utf-8'))
+
+    def _parse(self):
+        parts = urlsplit(self.path)
+        path = unquote(parts.path)
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        filters, options = [], {}
+        for key, value in params:
+            if key in ('select', 'order', 'limit', 'offset', 'on_conflict', 'columns'):
+                options[key] = value
+            elif '.' in value:
+                operator, _, raw = value.partition('.')
+                filters.append((key, operator, raw))
+        return path, filters, options
+
+    def _prefer(self) -> str:
+        return self.headers.get('Prefer', '')
+
+    def _project(self, rows: list, select: str):
+        if not select or select == '*':
+            return [dict(row) for row in rows]
+        columns = [column.strip() for column in select.split(',') if column.strip()]
+        return [{column: row.get(column) for column in columns} for row in rows]
+
+    def _returned(self, rows: list, options: dict):
+        if 'return=minimal' in self._prefer():
+            return None
+        return self._project(rows, options.get('select', '*'))
+
+    # -- request handling ----------------------------------------------------
+
+    def _handle(self, method: str):
+        server = self.server
+        started = time.perf_counter()
+        path, filters, options = self._parse()
+        # Read the body up front so the connection stays usable even when the request fails
+        self.payload = self._body()
+
+        if path == '/__stats':
+            if method == 'DELETE':
+                server.stats.reset()
+                return self._send(204)
+            return self._send(200, server.stats.snapshot(server.db))
+        if path == '/__reset' and method == 'POST':
+            server.db.reset()
+            server.stats.reset()
+            return self._send(204)
+
+        if not path.startswith('/rest/v1/'):
+            return self._error(404, f"Unknown path {path}")
+        table = path[len('/rest/v1/'):].strip('/')
+
+        if server.latency:
+            time.sleep(max(0.0, random.gauss(server.latency, server.latency * server.jitter)))
+        if server.error_rate and random.random() < server.error_rate:
+            self._error(503, "Injected failure")
+            server.stats.record(method, table, 503, time.perf_counter() - started, 0)
+            return
+
+        try:
+            status, rows = getattr(self, f'_{method.lower()}')(table, filters, options)
+        except ConflictError as e:
+            self._error(409, str(e), code='23505')
+            server.stats.record(method, table, 409, time.perf_counter() - started, 0)
+            return
+        server.stats.record(method, table, status, time.perf_counter() - started, len(rows or []))
+
+    def _get(self, table, filters, options):
+        rows, lock = self.server.db.acquire(table)
+        try:
+            matched = [row for row in rows if _matches(row, filters)]
+        finally:
+            lock.release()
+
+        if 'order' in options:
+            for term in reversed(options['order'].split(',')):
+                column, *modifiers = term.split('.')
+                descending = 'desc' in modifiers
+                matched.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=descending)
+        total = len(matched)
+        offset = int(options.get('offset', 0))
+        if 'limit' in options:
+            matched = matched[offset:offset + int(options['limit'])]
+        elif offset:
+            matched = matched[offset:]
+
+        headers = {}
+        if 'count=exact' in self._prefer():
+            end = offset + len(matched) - 1
+            headers['Content-Range'] = f"{offset}-{end}/{total}" if matched else f"*/{total}"
+        body = self._project(matched, options.get('select', '*'))
+        self._send(200, body, headers)
+        return 200, matched
+
+    def _post(self, table, filters, options):
+        payload = self.payload
+        rows_in = payload if isinstance(payload, list) else [payload]
+        upsert = 'resolution=merge-duplicates' in self._prefer()
+        ignore = 'resolution=ignore-duplicates' in self._prefer()
+        keys = UNIQUE_KEYS.get(table, [])
+        if options.get('on_conflict'):
+            keys = [tuple(column.strip() for column in options['on_conflict'].split(','))]
+        keys = [('id',)] + keys
+
+        db = self.server.db
+        rows, lock = db.acquire(table)
+        written, completed = [], []
+        try:
+            staged = []
+            indexes = db.key_indexes(table, rows, keys)
+            for row in rows_in:
+                existing = db.unique_match(indexes, row)
+                if existing is not None and not (upsert or ignore):
+                    raise ConflictError(f'duplicate key value violates unique constraint on "{table}"')
+                staged.append((existing, row))
+            # Apply only after the whole batch is known to succeed, like one statement
+            for existing, row in staged:
+                if existing is not None:
+                    if upsert:
+                        was_completed = existing.get('status') == 'completed'
+                        changed = [column for column, value in row.items() if existing.get(column) != value]
+                        existing.update(row)
+                        db.drop_indexes(table, changed)
+                        written.append(existing)
+                        if not was_completed and existing.get('status') == 'completed':
+                            completed.append(existing)
+                    continue
+                new_row = dict(DEFAULTS.get(table, {}))
+                new_row.update(row)
+                new_row.setdefault('id', str(uuid.uuid4()))
+                rows.append(new_row)
+                db.index_row(table, new_row)
+                written.append(new_row)
+                if new_row.get('status') == 'completed':
+                    completed.append(new_row)
+            if table == 'user_lesson_progress' and completed:
+                db.on_lesson_completed(completed)
+        finally:
+            lock.release()
+
+        self._send(201, self._returned(written, options))
+        return 201, written
+
+    def _patch(self, table, filters, options):
+        changes = self.payload or {}
+        db = self.server.db
+        rows, lock = db.acquire(table)
+        try:
+            updated = [row for row in rows if _matches(row, filters)]
+            completed = [row for row in updated
+                         if changes.get('status') == 'completed' and row.get('status') != 'completed']
+            for row in updated:
+                row.update(changes)
+            db.drop_indexes(table, changes)
+            if table == 'user_lesson_progress' and completed:
+                db.on_lesson_completed(completed)
+        finally:
+            lock.release()
+        self._send(200, self._returned(updated, options))
+        return 200, updated
+
+    def _delete(self, table, filters, options):
+        rows, lock = self.server.db.acquire(table)
+        try:
+            deleted = [row for row in rows if _matches(row, filters)]
+            if deleted:
+                gone = {id(row) for row in deleted}
+                rows[:] = [row for row in rows if id(row) not in gone]
+                self.server.db.drop_indexes(table)
+        finally:
+            lock.release()
+        self._send(200, self._returned(deleted, options))
+        return 200, deleted
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PATCH(self):
+        self._handle('PATCH')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connections when many clients connect
+    # at once, and each retry after a dropped SYN costs them a second
+    request_queue_size = 1024
+
+    def __init__(self, address, latency_ms: float = 0, jitter: float = 0.2, error_rate: float = 0):
+        super().__init__(address, StandInHandler)
+        self.db = Database()
+        self.stats = Stats()
+        self.latency = latency_ms / 1000
+        self.jitter = jitter
+        self.error_rate = error_rate
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_server(port: int = 0, latency_ms: float = 0, error_rate: float = 0) -> StandInServer:
+    """Start a stand-in on a background thread; port 0 picks a free port"""
+    server = StandInServer(('127.0.0.1', port), latency_ms=latency_ms, error_rate=error_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local PostgREST stand-in")
+    parser.add_argument('--port', type=int, default=54321)
+    parser.add_argument('--latency-ms', type=float, default=0, help="Mean added latency per request")
+    parser.add_argument('--error-rate', type=float, default=0, help="Fraction of requests answered with 503")
+    args = parser.parse_args(argv)
+
+    server = StandInServer(('127.0.0.1', args.port), latency_ms=args.latency_ms, error_rate=args.error_rate)
+    print(f"PostgREST stand-in listening on {server.url}")
+    print(f"  NEXT_PUBLIC_SUPABASE_URL={server.url}")
+    print(f"  SUPABASE_SERVICE_ROLE_KEY={DUMMY_KEY}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Synthetic lesson catalogs for the benchmarks.
+
+Lessons have the same shape as the real data files (teaching, multiple
+choice, written and matching activities), with deterministic content so
+runs are comparable.
+"""
+import json
+import os
+import random
+
+WORDS = ['casa', 'perro', 'gato', 'libro', 'mesa', 'agua', 'sol', 'luna', 'amigo', 'ciudad',
+         'tiempo', 'camino', 'comida', 'noche', 'mañana', 'escuela', 'familia', 'trabajo']
+MEANINGS = ['house', 'dog', 'cat', 'book', 'table', 'water', 'sun', 'moon', 'friend', 'city',
+            'time', 'road', 'food', 'night', 'morning', 'school', 'family', 'work']
+
+
+def make_lesson(number: int, rng: random.Random, activities: int = 10) -> dict:
+    """Build one synthetic lesson with `activities` activities"""
+    picks = rng.sample(range(len(WORDS)), 6)
+    vocabulary = [WORDS[i] for i in picks]
+    steps = []
+    for order in range(1, activities + 1):
+        i = picks[order % len(picks)]
+        kind = order % 4
+        if kind == 1:
+            steps.append({'type': 'teaching', 'order': order, 'title': f"Words {number}.{order}",
+                          'content': '\n'.join(f"{WORDS[j]} – {MEANINGS[j]}" for j in picks)})
+        elif kind == 2:
+            options = [MEANINGS[j] for j in picks[:4]]
+            if MEANINGS[i] not in options:
+                options[-1] = MEANINGS[i]
+            steps.append({'type': 'multiple_choice', 'order': order,
+                          'question': f"What does '{WORDS[i]}' mean?", 'options': options,
+                          'correct_answer': MEANINGS[i], 'explanation': f"'{WORDS[i]}' means {MEANINGS[i]}."})
+        elif kind == 3:
+            steps.append({'type': 'written', 'order': order,
+                          'question': f"Write the word for '{MEANINGS[i]}'.", 'correct_answer': WORDS[i],
+                          'hint': f"Starts with '{WORDS[i][0]}'", 'explanation': f"'{WORDS[i]}' means {MEANINGS[i]}."})
+        else:
+            steps.append({'type': 'matching', 'order': order, 'question': 'Match the pairs:',
+                          'pairs': [{'spanish': WORDS[j], 'english': MEANINGS[j]} for j in picks[:3]],
+                          'explanation': 'Review these words.'})
+    return {
+        'title': f"Synthetic Lesson {number}",
+        'description': f"Generated lesson number {number}",
+        'difficulty': rng.choice(['easy', 'medium', 'hard']),
+        'content': {'vocabulary': vocabulary, 'phrases': [f"{vocabulary[0]} y {vocabulary[1]}"]},
+        'xp_reward': rng.choice([10, 15, 20, 25]),
+        'activities': steps,
+    }
+
+
+def make_lessons(count: int, seed: int = 0, start: int = 1) -> list:
+    rng = random.Random(seed)
+    return [make_lesson(number, rng) for number in range(start, start + count)]
+
+
+def write_corpus(directory: str, lessons: int, files: int = 1, language_code: str = 'es', seed: int = 0) -> list:
+    """
+    Write `lessons` synthetic lessons split across `files` data files.
+
+    Returns:
+        Paths of the written files
+    """
+    os.makedirs(directory, exist_ok=True)
+    per_file = -(-lessons // files)
+    paths = []
+    for index in range(files):
+        start = index * per_file + 1
+        count = min(per_file, lessons - index * per_file)
+        if count <= 0:
+            break
+        path = os.path.join(directory, f"synthetic_data{index + 1}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({language_code: make_lessons(count, seed + index, start)}, f, ensure_ascii=False)
+        paths.append(path)
+    return paths
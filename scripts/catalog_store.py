@@ -0,0 +1,393 @@
+"""
+Content-addressed store for the lesson data-file variants.
+
+scripts/ holds several near-copies of the same catalogs (spanish_data1/2,
+german_data1/2, chinese_data*, ...). This tool stores every lesson and
+activity once, keyed by a hash of its normalized content, and records each
+file as a list of lesson hashes per language. From the store it can:
+
+  report     show which variants are identical and where the others differ
+  delta      write a compact delta turning one variant into another
+  canonical  write one deduplicated data file per language for seeding
+
+Usage:
+    python catalog_store.py build
+    python catalog_store.py report
+    python catalog_store.py delta german_data1.json german_data2.json -o de.delta.json
+    python catalog_store.py canonical es -o spanish_canonical.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import unicodedata
+from collections import Counter
+
+from lesson_loader import DATA_FILES, SCRIPT_DIR, LessonDataError, find_data_files, load_data_file
+
+STORE_VERSION = 1
+DEFAULT_STORE = os.path.join(SCRIPT_DIR, '.catalog_store.json')
+
+# Older copy of the Chinese catalog kept at the repository root
+EXTRA_DATA_FILES = [os.path.join(os.path.dirname(SCRIPT_DIR), 'chinese_data.json')]
+
+
+def normalize(value):
+    """Normalize text and key order so cosmetic differences do not change hashes"""
+    if isinstance(value, str):
+        return unicodedata.normalize('NFC', value).strip()
+    if isinstance(value, list):
+        return [normalize(item) for item in value]
+    if isinstance(value, dict):
+        return {key: normalize(value[key]) for key in sorted(value)}
+    return value
+
+
+def content_hash(value) -> str:
+    encoded = json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:20]
+
+
+class CatalogStore:
+    """Lessons and activities stored once each, plus the files that use them"""
+
+    def __init__(self):
+        self.objects = {}
+        self.lessons = {}
+        self.variants = {}
+
+    def add_activity(self, activity: dict) -> str:
+        # The position is stored by the lesson, so moving an activity keeps its hash
+        body = normalize({key: value for key, value in activity.items() if key != 'order'})
+        key = content_hash(body)
+        self.objects.setdefault(key, body)
+        return key
+
+    def add_lesson(self, lesson: dict) -> str:
+        fields = normalize({key: value for key, value in lesson.items() if key != 'activities'})
+        activities = [self.add_activity(activity) for activity in lesson.get('activities', [])]
+        record = dict(fields, activities=activities)
+        key = content_hash(record)
+        self.lessons.setdefault(key, record)
+        return key
+
+    def add_variant(self, name: str, data: dict):
+        self.variants[name] = {
+            'languages': {
+                code: [self.add_lesson(lesson) for lesson in lessons]
+                for code, lessons in data.items()
+            },
+        }
+
+    def materialize_lesson(self, key: str) -> dict:
+        """Rebuild a lesson in data-file format from the store"""
+        record = dict(self.lessons[key])
+        activity_keys = record.pop('activities')
+        record['activities'] = [
+            {'type': self.objects[a]['type'], 'order': order,
+             **{k: v for k, v in self.objects[a].items() if k != 'type'}}
+            for order, a in enumerate(activity_keys, start=1)
+        ]
+        return record
+
+    def to_json(self) -> dict:
+        return {
+            'version': STORE_VERSION,
+            'objects': self.objects,
+            'lessons': self.lessons,
+            'variants': self.variants,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'CatalogStore':
+        if data.get('version') != STORE_VERSION:
+            raise ValueError(f"Unsupported store version {data.get('version')}")
+        store = cls()
+        store.objects = data['objects']
+        store.lessons = data['lessons']
+        store.variants = data['variants']
+        return store
+
+
+def build_store(paths: list) -> tuple:
+    """
+    Load every file into a new store.
+
+    Returns:
+        Tuple of (store, {path: error} for files that could not be read)
+    """
+    store = CatalogStore()
+    errors = {}
+    for path in paths:
+        name = os.path.relpath(path, os.path.dirname(SCRIPT_DIR))
+        try:
+            store.add_variant(name, load_data_file(path))
+        except (OSError, ValueError, LessonDataError) as e:
+            errors[name] = str(e)
+    return store, errors
+
+
+def load_store(path: str) -> CatalogStore:
+    with open(path, 'r', encoding='utf-8') as f:
+        return CatalogStore.from_json(json.load(f))
+
+
+def save_store(store: CatalogStore, path: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(store.to_json(), f, ensure_ascii=False, separators=(',', ':'))
+
+
+def dedup_stats(store: CatalogStore) -> dict:
+    lesson_refs = [key for variant in store.variants.values()
+                   for keys in variant['languages'].values() for key in keys]
+    activity_refs = [a for key in lesson_refs for a in store.lessons[key]['activities']]
+    return {
+        'variants': len(store.variants),
+        'lesson_refs': len(lesson_refs),
+        'unique_lessons': len(store.lessons),
+        'activity_refs': len(activity_refs),
+        'unique_activities': len(store.objects),
+    }
+
+
+def _by_title(store: CatalogStore, keys: list) -> dict:
+    return {store.lessons[key].get('title'): key for key in keys}
+
+
+def diff_variants(store: CatalogStore, old: str, new: str, language: str) -> list:
+    """
+    Compare one language in two variants, matching lessons by title.
+
+    Returns:
+        List of (op, title, detail) with op in 'add', 'remove', 'update', 'move'
+    """
+    old_keys = store.variants[old]['languages'].get(language, [])
+    new_keys = store.variants[new]['languages'].get(language, [])
+    old_titles, new_titles = _by_title(store, old_keys), _by_title(store, new_keys)
+    changes = []
+
+    for title, key in new_titles.items():
+        if title not in old_titles:
+            changes.append(('add', title, f"{len(store.lessons[key]['activities'])} activities"))
+        elif old_titles[title] != key:
+            before, after = store.lessons[old_titles[title]], store.lessons[key]
+            fields = sorted(f for f in set(before) | set(after)
+                            if f != 'activities' and before.get(f) != after.get(f))
+            shared = set(before['activities']) & set(after['activities'])
+            detail = (f"{len(after['activities']) - len(shared)} of {len(after['activities'])} activities "
+                      f"new or edited")
+            if fields:
+                detail += f", fields changed: {', '.join(fields)}"
+            changes.append(('update', title, detail))
+    for title in old_titles:
+        if title not in new_titles:
+            changes.append(('remove', title, ''))
+
+    common_old = [t for t in old_titles if t in new_titles]
+    common_new = [t for t in new_titles if t in old_titles]
+    if common_old != common_new:
+        changes.append(('move', '', 'lesson order changed'))
+    return changes
+
+
+def make_delta(store: CatalogStore, old: str, new: str) -> dict:
+    """
+    Build a delta that turns variant `old` into variant `new`.
+
+    The delta carries only the lessons and activities that `old` does not
+    already contain, plus the new lesson order per language.
+    """
+    old_languages = store.variants[old]['languages']
+    new_languages = store.variants[new]['languages']
+    known_lessons = {key for keys in old_languages.values() for key in keys}
+    known_objects = {a for key in known_lessons for a in store.lessons[key]['activities']}
+
+    lessons, objects = {}, {}
+    for keys in new_languages.values():
+        for key in keys:
+            if key in known_lessons:
+                continue
+            lessons[key] = store.lessons[key]
+            for a in store.lessons[key]['activities']:
+                if a not in known_objects:
+                    objects[a] = store.objects[a]
+
+    return {
+        'base': old,
+        'target': new,
+        'objects': objects,
+        'lessons': lessons,
+        'languages': new_languages,
+    }
+
+
+def apply_delta(store: CatalogStore, delta: dict, name: str = None):
+    """Add the variant described by a delta to a store that holds its base"""
+    if delta['base'] not in store.variants:
+        raise ValueError(f"Base variant {delta['base']} is not in the store")
+    store.objects.update(delta['objects'])
+    store.lessons.update(delta['lessons'])
+    store.variants[name or delta['target']] = {'languages': delta['languages']}
+
+
+def newest_first(names: list, language: str) -> list:
+    """
+    Order the variants of a language from newest to oldest.
+
+    File modification times differ from one checkout to the next, so the
+    order comes from the names: the data file main.py seeds for the language
+    first, then files under scripts/ before copies elsewhere, then by file
+    name with higher numbers first (spanish_data2 before spanish_data1).
+    """
+    seeded = os.path.join(os.path.basename(SCRIPT_DIR), DATA_FILES.get(language, ''))
+
+    def version(name: str) -> list:
+        parts = re.split(r'(\d+)', os.path.basename(name))
+        return [(1, int(part), '') if part.isdigit() else (0, 0, part) for part in parts]
+
+    ordered = sorted(names, key=version, reverse=True)
+    return sorted(ordered, key=lambda name: (name != seeded,
+                                             os.path.dirname(name) != os.path.basename(SCRIPT_DIR)))
+
+
+def canonical_lessons(store: CatalogStore, language: str, prefer: list = None) -> list:
+    """
+    Merge every variant of a language into one deduplicated lesson list.
+
+    Lessons are matched by title. When variants disagree on a lesson, the
+    version from the first variant in `prefer` wins; otherwise the version
+    used by the most variants, then the one from the newest file (see
+    `newest_first`). Lessons keep the order of the newest variant, followed
+    by lessons found only in older ones.
+    """
+    prefer = prefer or []
+    variants = newest_first([name for name, v in store.variants.items() if language in v['languages']], language)
+    variants.sort(key=lambda name: (name not in prefer, prefer.index(name) if name in prefer else 0))
+
+    versions = {}
+    order = []
+    for name in variants:
+        for key in store.variants[name]['languages'][language]:
+            title = store.lessons[key].get('title')
+            if title not in versions:
+                versions[title] = Counter()
+                order.append(title)
+            versions[title][key] += 1
+
+    chosen = []
+    for title in order:
+        counts = versions[title]
+        preferred = next((key for name in variants if name in prefer
+                          for key in store.variants[name]['languages'][language]
+                          if store.lessons[key].get('title') == title), None)
+        if preferred is not None:
+            key = preferred
+        else:
+            # most_common keeps first-seen order on ties, and variants are newest first
+            key = counts.most_common(1)[0][0]
+        chosen.append(store.materialize_lesson(key))
+    return chosen
+
+
+def _resolve_variant(store: CatalogStore, name: str) -> str:
+    if name in store.variants:
+        return name
+    matches = [v for v in store.variants if os.path.basename(v) == name or v.endswith(os.sep + name)]
+    if len(matches) != 1:
+        raise SystemExit(f"✗ Unknown or ambiguous variant '{name}'. Known: {', '.join(sorted(store.variants))}")
+    return matches[0]
+
+
+def print_report(store: CatalogStore):
+    languages = sorted({code for v in store.variants.values() for code in v['languages']})
+    for language in languages:
+        names = sorted(name for name, v in store.variants.items() if language in v['languages'])
+        groups = {}
+        for name in names:
+            groups.setdefault(tuple(store.variants[name]['languages'][language]), []).append(name)
+        print(f"\n[{language}] {len(names)} variants, {len(groups)} distinct")
+        for members in groups.values():
+            if len(members) > 1:
+                print(f"  = identical: {', '.join(members)}")
+
+        # Compare each distinct version against the newest one
+        newest = newest_first(names, language)[0]
+        for members in groups.values():
+            other = members[0]
+            if newest in members:
+                continue
+            changes = diff_variants(store, other, newest, language)
+            print(f"  {other} -> {newest}: {len(changes)} differences")
+            for op, title, detail in changes:
+                print(f"    {op:6} {title}{' - ' + detail if detail else ''}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Deduplicate and compare lesson data-file variants")
+    parser.add_argument('--store', default=DEFAULT_STORE, help="Store file (default: scripts/.catalog_store.json)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="Build the store from data files")
+    build.add_argument('paths', nargs='*', help="Data files (default: every variant in the repository)")
+
+    commands.add_parser('report', help="Show which variants differ and where")
+
+    delta = commands.add_parser('delta', help="Write the delta from one variant to another")
+    delta.add_argument('old')
+    delta.add_argument('new')
+    delta.add_argument('-o', '--output', help="Output file (default: stdout)")
+
+    canonical = commands.add_parser('canonical', help="Write a deduplicated data file for a language")
+    canonical.add_argument('language')
+    canonical.add_argument('-o', '--output', required=True)
+    canonical.add_argument('--prefer', action='append', default=[],
+                           help="Variant whose lessons win conflicts (repeatable, in priority order)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.command == 'build':
+        paths = args.paths or find_data_files() + [p for p in EXTRA_DATA_FILES if os.path.exists(p)]
+        store, errors = build_store(paths)
+        save_store(store, args.store)
+        for name, error in errors.items():
+            print(f"✗ Skipped {name}: {error}")
+        stats = dedup_stats(store)
+        print(f"✓ Stored {stats['variants']} variants: {stats['unique_lessons']} unique of "
+              f"{stats['lesson_refs']} lessons, {stats['unique_activities']} unique of "
+              f"{stats['activity_refs']} activities -> {args.store}")
+        return 1 if errors else 0
+
+    try:
+        store = load_store(args.store)
+    except FileNotFoundError:
+        print(f"✗ No store at {args.store}; run `python catalog_store.py build` first")
+        return 1
+
+    if args.command == 'report':
+        print_report(store)
+    elif args.command == 'delta':
+        delta = make_delta(store, _resolve_variant(store, args.old), _resolve_variant(store, args.new))
+        text = json.dumps(delta, ensure_ascii=False, separators=(',', ':'))
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(text)
+            print(f"✓ Delta with {len(delta['lessons'])} lessons and {len(delta['objects'])} activities "
+                  f"({len(text.encode('utf-8'))} bytes) -> {args.output}")
+        else:
+            print(text)
+    elif args.command == 'canonical':
+        prefer = [_resolve_variant(store, name) for name in args.prefer]
+        lessons = canonical_lessons(store, args.language, prefer)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({args.language: lessons}, f, ensure_ascii=False, indent=2)
+        print(f"✓ {len(lessons)} {args.language} lessons -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
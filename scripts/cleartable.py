@@ -1,57 +1,219 @@
 """
-Script to delete all rows from a Supabase table
+Script to delete all rows from one or more Supabase tables
+
+Rows are deleted in batches: each batch selects the next page of ids in id
+order (keyset pagination) and deletes exactly those ids, so no single
+request has to touch the whole table. Tables are cleared in foreign-key
+order, with tables that do not depend on each other cleared in parallel.
+
+Usage:
+    python cleartable.py user_lesson_progress lessons --batch-size 500
 """
-import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
+import argparse
+import time
+from supabase_client import get_client
+from supabase_tracing import tracing
 
-# Configuration - Change this to the table you want to clear
+# Configuration - Default table to clear when none is given on the command line
 TABLE_NAME = "user_lesson_progress"
 
-# Load environment variables from parent directory
-import sys
-from pathlib import Path
+# Number of rows selected and deleted per request
+DEFAULT_BATCH_SIZE = 500
+
+# Tables that reference each other, from supabase/migrations. A table must be
+# cleared before the tables it references (its children go first).
+TABLE_DEPENDENCIES = {
+    'language_courses': [],
+    'lessons': ['language_courses'],
+    'user_profiles': [],
+    'user_lesson_progress': ['user_profiles', 'lessons'],
+    'reading_texts': [],
+    'user_reading_progress': ['user_profiles', 'reading_texts'],
+    'user_vocabulary': [],
+}
+
+def clear_order(tables: list):
+    """
+    Group tables into stages that can be cleared one after another.
+
+    Every table comes after the selected tables that reference it, and the
+    tables within a stage do not reference each other.
+
+    Returns:
+        List of stages, each a list of table names
+    """
+    selected = set(tables)
+    # Selected tables that must be cleared before each table
+    referenced_by = {table: set() for table in selected}
+    for table in selected:
+        for parent in TABLE_DEPENDENCIES.get(table, []):
+            if parent in selected:
+                referenced_by[parent].add(table)
+
+    stages = []
+    remaining = set(selected)
+    while remaining:
+        stage = sorted(t for t in remaining if not (referenced_by[t] & remaining))
+        if not stage:
+            raise ValueError(f"Circular foreign keys between: {', '.join(sorted(remaining))}")
+        stages.append(stage)
+        remaining -= set(stage)
+    return stages
 
-# Add parent directory to path to find .env file
-parent_dir = Path(__file__).parent.parent
-load_dotenv(parent_dir / '.env')
+def count_rows(table_name: str):
+    """Return the exact number of rows in a table"""
+    response = get_client().table(table_name).select('id', count='exact').limit(1).execute()
+    return response.count or 0
 
-# Initialize Supabase client
-supabase_url = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
-supabase_key = os.getenv("NEXT_PUBLIC_SUPABASE_ANON_KEY")
+def iter_id_batches(table_name: str, batch_size: int, after: str = None):
+    """
+    Yield lists of row ids in ascending id order, one page at a time.
 
-if not supabase_url or not supabase_key:
-    raise ValueError("Missing Supabase credentials. Make sure NEXT_PUBLIC_SUPABASE_URL and NEXT_PUBLIC_SUPABASE_ANON_KEY are set in your .env file")
+    Each page starts after the last id of the previous one, so the pages stay
+    cheap even when earlier pages have already been deleted.
+    """
+    while True:
+        query = get_client().table(table_name).select('id').order('id').limit(batch_size)
+        if after is not None:
+            query = query.gt('id', after)
+        ids = [row['id'] for row in query.execute().data or []]
+        if not ids:
+            return
+        yield ids
+        if len(ids) < batch_size:
+            return
+        after = ids[-1]
 
-supabase: Client = create_client(supabase_url, supabase_key)
+def delete_ids(table_name: str, ids: list):
+    """Delete the given ids from a table with a single request"""
+    get_client().table(table_name).delete().in_('id', ids).execute()
 
-def delete_all_rows(table_name: str):
+def delete_all_rows(table_name: str, batch_size: int = DEFAULT_BATCH_SIZE, expected: int = None):
     """
-    Delete all rows from the specified table
-    
+    Delete all rows from the specified table in batches
+
     Args:
         table_name: Name of the table to clear
+        batch_size: Rows deleted per request
+        expected: Row count from before the run, used for progress output
+
+    Returns:
+        Number of rows deleted
     """
     try:
         print(f"Starting to delete all rows from table: {table_name}")
-        
-        # Delete all rows - using neq (not equal) with an impossible condition
-        # This effectively selects all rows and deletes them
-        response = supabase.table(table_name).delete().neq('id', '00000000-0000-0000-0000-000000000000').execute()
-        
-        print(f"✓ Successfully deleted all rows from {table_name}")
-        print(f"Response: {response}")
-        
+
+        deleted = 0
+        started = time.perf_counter()
+        for ids in iter_id_batches(table_name, batch_size):
+            delete_ids(table_name, ids)
+            deleted += len(ids)
+            elapsed = time.perf_counter() - started
+            rate = deleted / elapsed if elapsed > 0 else 0
+            progress = f"{deleted}/{expected}" if expected else f"{deleted}"
+            print(f"  {table_name}: {progress} rows deleted ({rate:.0f} rows/s)")
+
+        elapsed = time.perf_counter() - started
+        print(f"✓ Successfully deleted {deleted} rows from {table_name} in {elapsed:.2f}s")
+        return deleted
+
     except Exception as e:
         print(f"✗ Error deleting rows from {table_name}: {str(e)}")
         raise
 
-if __name__ == "__main__":
+def estimate_seconds(row_count: int, batch_size: int, round_trip: float):
+    """Estimate clearing time from the number of requests and one measured round trip"""
+    batches = -(-row_count // batch_size)
+    # Each batch needs one select and one delete
+    return batches * 2 * round_trip
+
+def clear_tables(tables: list, batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 4, counts: dict = None):
+    """
+    Clear several tables in foreign-key order.
+
+    Returns:
+        Dict mapping table name to the number of rows deleted
+    """
+    # Imported here so that `--help` starts quickly
+    from concurrent.futures import ThreadPoolExecutor
+
+    counts = counts or {}
+    deleted = {}
+    for stage in clear_order(tables):
+        with ThreadPoolExecutor(max_workers=min(workers, len(stage))) as pool:
+            futures = {
+                table: pool.submit(delete_all_rows, table, batch_size, counts.get(table))
+                for table in stage
+            }
+            for table, future in futures.items():
+                deleted[table] = future.result()
+    return deleted
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Delete all rows from one or more Supabase tables")
+    parser.add_argument('tables', nargs='*', default=[TABLE_NAME],
+                        help=f"Tables to clear (default: {TABLE_NAME})")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Rows deleted per request (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument('--workers', type=int, default=4,
+                        help="Independent tables cleared at the same time (default: 4)")
+    parser.add_argument('--yes', action='store_true', help="Skip the confirmation prompt")
+    parser.add_argument('--trace', metavar='PATH',
+                        help="Record every Supabase request to this JSON-lines file and print a summary")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="Sample local stacks during the run and write them here in folded format")
+    args = parser.parse_args(argv)
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    return args
+
+def confirm_and_clear(args):
+    """Show what will be deleted, ask for confirmation and clear the tables"""
+    stages = clear_order(args.tables)
+
+    counts = {}
+    round_trip = None
+    for table in args.tables:
+        started = time.perf_counter()
+        counts[table] = count_rows(table)
+        elapsed = time.perf_counter() - started
+        round_trip = elapsed if round_trip is None else min(round_trip, elapsed)
+
+    print("Tables to clear (in this order):")
+    for number, stage in enumerate(stages, start=1):
+        for table in stage:
+            print(f"  {number}. {table}: {counts[table]} rows")
+    # Tables in the same stage run in parallel, so a stage takes as long as its largest table
+    estimate = sum(
+        max(estimate_seconds(counts[table], args.batch_size, round_trip) for table in stage)
+        for stage in stages
+    )
+    print(f"Estimated time: {estimate:.1f}s")
+
     # Confirmation prompt
-    print(f"⚠️  WARNING: This will delete ALL rows from the table '{TABLE_NAME}'")
-    confirmation = input("Are you sure you want to continue? (yes/no): ")
-    
-    if confirmation.lower() == "yes":
-        delete_all_rows(TABLE_NAME)
-    else:
-        print("Operation cancelled.")
+    if not args.yes:
+        print(f"⚠️  WARNING: This will delete ALL rows from: {', '.join(args.tables)}")
+        confirmation = input("Are you sure you want to continue? (yes/no): ")
+        if confirmation.lower() != "yes":
+            print("Operation cancelled.")
+            return
+
+    started = time.perf_counter()
+    deleted = clear_tables(args.tables, args.batch_size, args.workers, counts)
+    elapsed = time.perf_counter() - started
+    total = sum(deleted.values())
+    rate = total / elapsed if elapsed > 0 else 0
+    print(f"\n✓ Deleted {total} rows from {len(deleted)} tables in {elapsed:.2f}s ({rate:.0f} rows/s)")
+    if {'lessons', 'user_lesson_progress'} & set(args.tables):
+        # The completion trigger only ever adds to these stats
+        print("Note: user XP and completed lessons are now out of date, run recompute_user_stats.py to fix them")
+
+def main(argv=None):
+    args = parse_args(argv)
+    with tracing(get_client(), args.trace, args.profile):
+        confirm_and_clear(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""
+Ingest reading texts from JSONL files into the reading_texts table.
+
+Each input line is one passage:
+
+    {"language_code": "zh", "title": "My Day - 我的一天", "content": "我每天早上七点起床。...",
+     "difficulty": "beginner", "category": "article", "source": "..."}
+
+Passages are streamed and upserted in batches on (language_code, title), so
+a file can be ingested again after it is edited. While ingesting, each text
+is split into the tokens the reading page renders (words for Chinese,
+letters/spaces/punctuation runs for the other languages) and word
+frequencies and difficulty statistics are computed, so the page does not
+have to re-split the text on every view. See
+supabase/migrations/009_add_reading_text_tokens.sql.
+
+Chinese is segmented with jieba when it is installed (pip install jieba),
+and otherwise by forward maximum matching against a small built-in word
+list plus the vocabulary of the lesson data files.
+
+Usage:
+    python ingest_reading_texts.py texts/spanish.jsonl texts/chinese.jsonl
+    python ingest_reading_texts.py texts/chinese.jsonl --dry-run
+    python ingest_reading_texts.py --backfill          # tokenize texts already in the table
+"""
+import argparse
+import itertools
+import json
+import re
+import sys
+import time
+from collections import Counter
+
+from lesson_loader import LessonDataError, find_data_files, stream_all_lessons
+from supabase_client import get_client
+
+try:
+    import jieba
+except ImportError:
+    jieba = None
+
+DEFAULT_BATCH_SIZE = 100
+
+# Matches the UNIQUE index added by migration 009
+CONFLICT_KEY = 'language_code,title'
+
+DIFFICULTIES = ['beginner', 'intermediate', 'advanced']
+
+# Same token pattern as src/app/reading/[id]/page.tsx: runs of letters
+# (including accented Latin letters), runs of whitespace, and anything else
+LATIN_LETTERS = 'a-zA-ZÀ-ÿĀ-ſ'
+LATIN_TOKEN = re.compile(f'[{LATIN_LETTERS}]+|\\s+|[^{LATIN_LETTERS}\\s]+')
+LATIN_WORD = re.compile(f'^[{LATIN_LETTERS}]+$')
+
+HAN = re.compile('[一-龥]')
+HAN_RUN = re.compile('[一-龥]+|\\s+|[^一-龥\\s]')
+SENTENCE_END = re.compile('[.!?。！？]+')
+
+# Common words that the fallback segmenter knows without any lesson data
+COMMON_ZH_WORDS = """
+我们 你们 他们 她们 它们 自己 什么 怎么 为什么 这个 那个 这里 那里 这些 那些 哪里
+今天 明天 昨天 现在 以前 以后 然后 已经 还是 但是 因为 所以 如果 虽然 可是 而且
+一起 一下 一点 一些 一直 一定 一样 有点 非常 特别 真的 可能 应该 可以 需要 喜欢
+知道 觉得 认为 希望 开始 结束 学习 工作 生活 朋友 家人 老师 学生 同学 学校 大学
+中国 中文 汉语 英语 文化 历史 时间 时候 地方 东西 事情 问题 办法 意思 名字 电话
+早上 上午 中午 下午 晚上 每天 周末 星期 小时 分钟 起床 睡觉 吃饭 早饭 午饭 晚饭
+上学 放学 下班 上班 回家 作业 电视 电影 音乐 运动 跑步 游泳 旅行 公园 商店 超市
+医院 银行 饭店 餐厅 公交车 地铁 飞机 火车 出租车 自行车 附近 旁边 前面 后面 对面
+高兴 快乐 幸福 害怕 担心 生气 漂亮 可爱 好吃 好看 容易 困难 重要 有名 有意思
+天气 下雨 下雪 春天 夏天 秋天 冬天 身体 健康 帮助 帮忙 谢谢 不客气 对不起 没关系
+从前 有一天 好朋友 大家 孩子 爸爸 妈妈 哥哥 姐姐 弟弟 妹妹 爷爷 奶奶 先生 小姐
+故乡 茶叶 绿茶 红茶 饮料 味道 传统 节日 春节 中秋节 月饼 饺子 包子 豆浆 米饭 面条
+城市 北京 上海 国家 世界 经济 发展 社会 环境 保护 科技 手机 电脑 网络 互联网
+""".split()
+
+MAX_WORD_LENGTH = 6
+
+
+def lesson_vocabulary() -> dict:
+    """Vocabulary and phrases of every lesson data file, as {language_code: set of words}"""
+    words = {}
+    for path in find_data_files():
+        try:
+            for language, lesson in stream_all_lessons(path):
+                content = lesson.get('content') if isinstance(lesson, dict) else None
+                if not isinstance(content, dict):
+                    continue
+                for item in content.get('vocabulary', []) + content.get('phrases', []):
+                    if isinstance(item, str):
+                        words.setdefault(language, set()).add(item)
+        except (OSError, LessonDataError):
+            # A malformed data file only means fewer known words
+            continue
+    return words
+
+
+class Tokenizer:
+    """Splits texts into tokens and knows which words learners have met in lessons"""
+
+    def __init__(self, vocabulary: dict = None):
+        vocabulary = lesson_vocabulary() if vocabulary is None else vocabulary
+
+        zh_words = set(COMMON_ZH_WORDS)
+        for item in vocabulary.get('zh', ()):
+            zh_words.update(HAN_RUN.findall(item))
+        self.zh_words = {word for word in zh_words if HAN.match(word) and len(word) <= MAX_WORD_LENGTH}
+        if jieba is not None:
+            for word in self.zh_words:
+                jieba.add_word(word)
+        self.name = 'jieba' if jieba is not None else 'max-match'
+
+        self.known = {}
+        for language, items in vocabulary.items():
+            known = set()
+            for item in items:
+                known.update(word.lower() for word in self.words(language, self.split(language, item)))
+            self.known[language] = known
+        self.known['zh'] = self.known.get('zh', set()) | set(COMMON_ZH_WORDS)
+
+    def _max_match(self, run: str) -> list:
+        tokens = []
+        position = 0
+        while position < len(run):
+            for length in range(min(MAX_WORD_LENGTH, len(run) - position), 0, -1):
+                candidate = run[position:position + length]
+                if length == 1 or candidate in self.zh_words:
+                    tokens.append(candidate)
+                    position += length
+                    break
+        return tokens
+
+    def split(self, language: str, text: str) -> list:
+        """Split text into tokens that join back into the original text"""
+        if language != 'zh':
+            return LATIN_TOKEN.findall(text)
+        if jieba is not None:
+            return [token for token in jieba.cut(text, HMM=True) if token]
+        tokens = []
+        for run in HAN_RUN.findall(text):
+            tokens.extend(self._max_match(run) if HAN.match(run) else [run])
+        return tokens
+
+    @staticmethod
+    def words(language: str, tokens: list) -> list:
+        """The tokens the reading page makes clickable"""
+        if language == 'zh':
+            return [token for token in tokens if HAN.search(token)]
+        return [token for token in tokens if LATIN_WORD.match(token)]
+
+    def analyze(self, language: str, text: str) -> dict:
+        """Tokens, word frequencies and difficulty statistics of one text"""
+        tokens = self.split(language, text)
+        words = self.words(language, tokens)
+        normalized = [word.lower() for word in words]
+        frequencies = Counter(normalized)
+        sentences = max(1, len([part for part in SENTENCE_END.split(text) if part.strip()]))
+        known = self.known.get(language, set())
+        known_ratio = sum(1 for word in normalized if word in known) / len(normalized) if normalized else 0.0
+
+        avg_sentence_words = len(words) / sentences
+        # Long sentences and words learners have not met make a text harder
+        score = round(100 * (0.5 * min(1.0, avg_sentence_words / 25) + 0.5 * (1 - known_ratio)))
+        return {
+            'tokens': tokens,
+            'word_count': len(words),
+            'word_frequencies': dict(frequencies.most_common()),
+            'stats': {
+                'unique_words': len(frequencies),
+                'sentences': sentences,
+                'avg_sentence_words': round(avg_sentence_words, 2),
+                'avg_word_length': round(sum(map(len, words)) / len(words), 2) if words else 0.0,
+                'known_word_ratio': round(known_ratio, 3),
+                'difficulty_score': score,
+                'tokenizer': self.name if language == 'zh' else 'regex',
+            },
+        }
+
+
+def suggested_difficulty(score: int) -> str:
+    if score < 35:
+        return 'beginner'
+    if score < 65:
+        return 'intermediate'
+    return 'advanced'
+
+
+def read_jsonl(paths: list):
+    """Yield (location, passage) for every non-empty line of the input files"""
+    for path in paths:
+        f = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+        try:
+            for number, line in enumerate(f, start=1):
+                if line.strip():
+                    yield f"{path}:{number}", line
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+def build_row(tokenizer: Tokenizer, passage: dict) -> dict:
+    """Turn one input passage into a reading_texts row"""
+    if not isinstance(passage, dict):
+        raise ValueError(f"expected a JSON object, got {type(passage).__name__}")
+    for field in ('language_code', 'title', 'content'):
+        if not passage.get(field):
+            raise ValueError(f"missing '{field}'")
+    analysis = tokenizer.analyze(passage['language_code'], passage['content'])
+    difficulty = passage.get('difficulty') or suggested_difficulty(analysis['stats']['difficulty_score'])
+    if difficulty not in DIFFICULTIES:
+        raise ValueError(f"difficulty '{difficulty}' is not one of {', '.join(DIFFICULTIES)}")
+
+    row = {
+        'language_code': passage['language_code'],
+        'title': passage['title'],
+        'content': passage['content'],
+        'difficulty': difficulty,
+        'category': passage.get('category'),
+        'source': passage.get('source'),
+        'is_published': passage.get('is_published', True),
+    }
+    if 'id' in passage:
+        row['id'] = passage['id']
+    row.update(analysis)
+    return row
+
+
+def upsert_batch(rows: list, conflict_key: str = CONFLICT_KEY):
+    get_client().table('reading_texts').upsert(rows, on_conflict=conflict_key, returning='minimal').execute()
+
+
+def ingest(passages, tokenizer: Tokenizer, batch_size: int = DEFAULT_BATCH_SIZE,
+           dry_run: bool = False, conflict_key: str = CONFLICT_KEY):
+    """
+    Build rows from (location, passage) pairs and upsert them in batches.
+
+    Passages may be dicts or JSON strings.
+
+    Returns:
+        (rows written, list of (location, error))
+    """
+    written = 0
+    errors = []
+    started = time.perf_counter()
+
+    def rows():
+        for location, passage in passages:
+            try:
+                if isinstance(passage, str):
+                    passage = json.loads(passage)
+                yield location, build_row(tokenizer, passage)
+            except ValueError as e:
+                errors.append((location, str(e)))
+                print(f"✗ {location}: {str(e)}")
+
+    stream = rows()
+    while True:
+        batch = list(itertools.islice(stream, batch_size))
+        if not batch:
+            break
+        if dry_run:
+            for location, row in batch:
+                stats = row['stats']
+                print(f"  {row['language_code']} {row['title']}: {row['word_count']} words, "
+                      f"{stats['unique_words']} unique, score {stats['difficulty_score']} ({row['difficulty']})")
+            written += len(batch)
+            continue
+        try:
+            upsert_batch([row for _, row in batch], conflict_key)
+            written += len(batch)
+            print(f"✓ Upserted {len(batch)} reading texts ({written} so far)")
+        except Exception as e:
+            errors.extend((location, str(e)) for location, _ in batch)
+            print(f"✗ Batch of {len(batch)} reading texts rejected: {str(e)}")
+
+    elapsed = time.perf_counter() - started
+    rate = written / elapsed if elapsed > 0 else 0
+    print(f"{written} reading texts in {elapsed:.2f}s ({rate:.0f} texts/s)")
+    return written, errors
+
+
+def existing_texts(page_size: int = 500):
+    """Yield (location, row) for every reading text already in the table, in id order"""
+    after = None
+    while True:
+        query = get_client().table('reading_texts').select('*').order('id').limit(page_size)
+        if after is not None:
+            query = query.gt('id', after)
+        rows = query.execute().data or []
+        for row in rows:
+            yield f"reading_texts:{row['id']}", row
+        if len(rows) < page_size:
+            return
+        after = rows[-1]['id']
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest reading texts from JSONL files")
+    parser.add_argument('paths', nargs='*', help="JSONL files to ingest ('-' for stdin)")
+    parser.add_argument('--backfill', action='store_true',
+                        help="Tokenize the texts already in the table instead of reading files")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Texts per upsert request (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument('--dry-run', action='store_true', help="Print the statistics without writing anything")
+    args = parser.parse_args(argv)
+    if not args.paths and not args.backfill:
+        parser.error("give JSONL files to ingest or --backfill")
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    tokenizer = Tokenizer()
+    print(f"Chinese segmentation: {tokenizer.name}")
+
+    if args.backfill:
+        # Rows keep their id, so upsert on the primary key
+        _, errors = ingest(existing_texts(), tokenizer, args.batch_size, args.dry_run, conflict_key='id')
+    else:
+        _, errors = ingest(read_jsonl(args.paths), tokenizer, args.batch_size, args.dry_run)
+
+    if errors:
+        print(f"\n✗ {len(errors)} reading texts failed")
+        return 1
+    print("\n✓ Reading texts ingested")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+"""
+Compile compact lesson specs into lesson data files.
+
+A spec (see lesson_specs/) lists each lesson's vocabulary and phrases once,
+with their translations, and describes the activities as a sequence of
+steps. Steps are expanded into the full activity objects that main.py
+seeds, so a new lesson or a new language only needs its vocabulary and a
+few lines of steps:
+
+    {"teach": "Colors", "intro": "...", "words": ["红色", "蓝色"]}
+    {"ask": "meaning", "word": "红色"}
+    {"ask": "write", "word": "蓝色", "hint": "Starts with 蓝"}
+    {"activity": {...}}           # literal activity, copied as-is
+
+A teach step can give its whole `content` instead of intro/words/outro, and
+an ask step can override its `question`, `explanation`, `hint` or
+`options`, so hand-written prose survives compilation.
+
+Lessons are compiled in parallel on a process pool. Output is written as
+one minified data file per language, or split into shards of a fixed number
+of lessons.
+
+Usage:
+    python lesson_compiler.py lesson_specs/zh.json -o chinese_data_compiled.json
+    python lesson_compiler.py lesson_specs/*.json --out-dir build --shard-size 500
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import time
+
+# Question wording for each step template. Placeholders are filled from the
+# vocabulary entry: {word}, {meaning}, {romanization}, {language}.
+QUESTION_TEMPLATES = {
+    'meaning': "What does {word} mean in English?",
+    'pick': "Which of these means '{meaning}'?",
+    'write': "Write the {language} word for '{meaning_lower}'.",
+    'phrase_meaning': "What does '{word}' mean?",
+    'translate_phrase': "Write in {language}: '{meaning}'",
+    'match': "Match the {language} words with their meanings:",
+}
+
+EXPLANATION_TEMPLATES = {
+    'meaning': "{word}{reading} means '{meaning}'.",
+    'pick': "{word}{reading} means '{meaning}'.",
+    'write': "{word}{reading} means '{meaning_lower}'.",
+    'phrase_meaning': "'{word}' means '{meaning}'.",
+    'translate_phrase': "'{word}' means '{meaning}'.",
+    'match': "Review these words until you can recall each meaning.",
+}
+
+OPTION_COUNT = 4
+
+
+class SpecError(ValueError):
+    """Raised when a lesson spec cannot be compiled"""
+
+
+def _rng(*parts) -> random.Random:
+    """Deterministic random source, so the same spec always compiles to the same output"""
+    seed = hashlib.sha256('\x1f'.join(str(part) for part in parts).encode('utf-8')).digest()
+    return random.Random(seed)
+
+
+def _entries(items: list) -> dict:
+    """Turn [[text, meaning, romanization?], ...] into {text: entry}"""
+    entries = {}
+    for item in items:
+        if isinstance(item, str):
+            item = [item]
+        text = item[0]
+        entries[text] = {
+            'word': text,
+            'meaning': item[1] if len(item) > 1 else '',
+            'romanization': item[2] if len(item) > 2 else '',
+        }
+    return entries
+
+
+def _fields(entry: dict, language: str) -> dict:
+    reading = f" ({entry['romanization']})" if entry['romanization'] else ''
+    return {
+        'word': entry['word'],
+        'meaning': entry['meaning'],
+        'meaning_lower': entry['meaning'][:1].lower() + entry['meaning'][1:],
+        'romanization': entry['romanization'],
+        'reading': reading,
+        'language': language,
+    }
+
+
+def _options(correct: str, pool: list, rng: random.Random, distractors: list = None) -> list:
+    """Pick OPTION_COUNT options including `correct`, in a deterministic order"""
+    candidates = distractors if distractors is not None else [item for item in pool if item != correct]
+    candidates = list(dict.fromkeys(item for item in candidates if item and item != correct))
+    chosen = rng.sample(candidates, min(OPTION_COUNT - 1, len(candidates)))
+    options = chosen + [correct]
+    rng.shuffle(options)
+    return options
+
+
+def _lookup(table: dict, key: str, kind: str, title: str) -> dict:
+    if key not in table:
+        raise SpecError(f"Lesson '{title}': unknown {kind} '{key}'")
+    return table[key]
+
+
+def compile_step(step: dict, lesson: dict, language: str, vocabulary: dict, phrases: dict) -> dict:
+    """Expand one spec step into an activity (without its order)"""
+    title = lesson['title']
+
+    if 'activity' in step:
+        return dict(step['activity'])
+
+    if 'teach' in step:
+        lines = []
+        for word in step.get('words', []):
+            entry = vocabulary.get(word) or _lookup(phrases, word, 'word or phrase', title)
+            reading = f" ({entry['romanization']})" if entry['romanization'] else ''
+            lines.append(f"{entry['word']}{reading} - {entry['meaning']}")
+        parts = [step.get('intro', ''), '\n'.join(lines), step.get('outro', '')]
+        return {
+            'type': 'teaching',
+            'title': step['teach'],
+            'content': step.get('content', '\n\n'.join(part for part in parts if part)),
+        }
+
+    template = step.get('ask')
+    if template not in QUESTION_TEMPLATES:
+        raise SpecError(f"Lesson '{title}': unknown step {json.dumps(step, ensure_ascii=False)}")
+    rng = _rng(language, title, template, step.get('word'), step.get('words'))
+
+    if template == 'match':
+        entries = [_lookup(vocabulary, word, 'word', title) for word in step['words']]
+        fields = {'language': language}
+        return {
+            'type': 'matching',
+            'question': step.get('question', QUESTION_TEMPLATES[template].format(**fields)),
+            # The lesson page reads the `spanish` key for every language
+            'pairs': [{'spanish': entry['word'], 'english': entry['meaning']} for entry in entries],
+            'explanation': step.get('explanation', EXPLANATION_TEMPLATES[template]),
+        }
+
+    if template in ('phrase_meaning', 'translate_phrase'):
+        table = phrases
+    else:
+        # Other templates work on single words but also accept phrases
+        table = vocabulary if step['word'] in vocabulary or step['word'] not in phrases else phrases
+    entry = _lookup(table, step['word'], 'phrase' if table is phrases else 'word', title)
+    fields = _fields(entry, language)
+    question = step.get('question', QUESTION_TEMPLATES[template]).format(**fields)
+    explanation = step.get('explanation', EXPLANATION_TEMPLATES[template]).format(**fields)
+
+    if template in ('write', 'translate_phrase'):
+        activity = {
+            'type': 'written',
+            'question': question,
+            'correct_answer': entry['word'],
+            'hint': step.get('hint', f"Starts with {entry['word'][:1]}"),
+            'explanation': explanation,
+        }
+        if 'accepted_answers' in step:
+            activity['accepted_answers'] = step['accepted_answers']
+        return activity
+
+    if template == 'pick':
+        correct = entry['word']
+        pool = list(table)
+    else:
+        correct = entry['meaning']
+        pool = [other['meaning'] for other in table.values()]
+    return {
+        'type': 'multiple_choice',
+        'question': question,
+        'options': step['options'] if 'options' in step else _options(correct, pool, rng, step.get('distractors')),
+        'correct_answer': correct,
+        'explanation': explanation,
+    }
+
+
+def compile_lesson(spec: dict, language: str) -> dict:
+    """Compile one lesson spec into a lesson in the data-file format"""
+    vocabulary = _entries(spec.get('vocabulary', []))
+    phrases = _entries(spec.get('phrases', []))
+
+    activities = []
+    for order, step in enumerate(spec.get('steps', []), start=1):
+        activity = compile_step(step, spec, language, vocabulary, phrases)
+        activities.append({'type': activity.pop('type'), 'order': order, **activity})
+
+    content = {'vocabulary': list(vocabulary)}
+    if phrases:
+        content['phrases'] = list(phrases)
+    content.update(spec.get('extra_content', {}))
+
+    return {
+        'title': spec['title'],
+        'description': spec.get('description', ''),
+        'difficulty': spec.get('difficulty', 'easy'),
+        'content': content,
+        'xp_reward': spec.get('xp_reward', 10),
+        'activities': activities,
+    }
+
+
+def _compile_batch(args):
+    specs, language = args
+    return [compile_lesson(spec, language) for spec in specs]
+
+
+def load_spec(path: str) -> dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        spec = json.load(f)
+    for key in ('language_code', 'language_name', 'lessons'):
+        if key not in spec:
+            raise SpecError(f"{os.path.basename(path)}: missing '{key}'")
+    return spec
+
+
+def compile_spec(spec: dict, workers: int = None, batch_size: int = 50) -> list:
+    """
+    Compile all lessons of a spec, in parallel when there are enough of them.
+
+    Lessons are sent to the pool in batches to keep the per-task overhead
+    small; the result keeps the order of the spec.
+    """
+    lessons = spec['lessons']
+    language = spec['language_name']
+    batches = [(lessons[i:i + batch_size], language) for i in range(0, len(lessons), batch_size)]
+
+    if workers == 1 or len(batches) <= 1:
+        return [lesson for batch in batches for lesson in _compile_batch(batch)]
+
+    # Imported here: multiprocessing is slow to import and small specs do not need it
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [lesson for compiled in pool.map(_compile_batch, batches) for lesson in compiled]
+
+
+def write_output(language_code: str, lessons: list, path: str, minify: bool = True):
+    """Write lessons as a data file, minified unless `minify` is off"""
+    with open(path, 'w', encoding='utf-8') as f:
+        if minify:
+            json.dump({language_code: lessons}, f, ensure_ascii=False, separators=(',', ':'))
+        else:
+            json.dump({language_code: lessons}, f, ensure_ascii=False, indent=2)
+
+
+def write_shards(language_code: str, lessons: list, out_dir: str, shard_size: int, minify: bool = True) -> list:
+    """Split lessons into data files of at most `shard_size` lessons each"""
+    paths = []
+    for number, start in enumerate(range(0, len(lessons), shard_size), start=1):
+        path = os.path.join(out_dir, f"{language_code}_data.{number:04d}.json")
+        write_output(language_code, lessons[start:start + shard_size], path, minify)
+        paths.append(path)
+    return paths
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compile lesson specs into lesson data files")
+    parser.add_argument('specs', nargs='+', help="Spec files to compile")
+    parser.add_argument('-o', '--output', help="Output file (only with a single spec)")
+    parser.add_argument('--out-dir', default='.', help="Directory for output files (default: current)")
+    parser.add_argument('--shard-size', type=int, default=0,
+                        help="Split each language into files of this many lessons")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Compiler processes (default: one per CPU, 1 to compile inline)")
+    parser.add_argument('--pretty', action='store_true', help="Indent the output instead of minifying it")
+    args = parser.parse_args(argv)
+    if args.shard_size < 0:
+        parser.error("--shard-size must be at least 0")
+    if args.output and len(args.specs) > 1:
+        parser.error("--output can only be used with a single spec")
+    if args.output and args.shard_size:
+        parser.error("--output and --shard-size cannot be combined")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    for spec_path in args.specs:
+        started = time.perf_counter()
+        try:
+            spec = load_spec(spec_path)
+            lessons = compile_spec(spec, args.workers)
+        except (OSError, ValueError) as e:
+            print(f"✗ Error compiling {spec_path}: {str(e)}")
+            raise SystemExit(1)
+        code = spec['language_code']
+        activities = sum(len(lesson['activities']) for lesson in lessons)
+
+        if args.shard_size:
+            paths = write_shards(code, lessons, args.out_dir, args.shard_size, not args.pretty)
+        else:
+            paths = [args.output or os.path.join(args.out_dir, f"{code}_data.json")]
+            write_output(code, lessons, paths[0], not args.pretty)
+
+        elapsed = time.perf_counter() - started
+        print(f"✓ {spec['language_name']}: {len(lessons)} lessons, {activities} activities "
+              f"in {elapsed:.2f}s -> {', '.join(paths)}")
+
+
+if __name__ == "__main__":
+    main()
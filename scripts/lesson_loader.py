@@ -0,0 +1,281 @@
+"""
+Loading lesson data files for the seeding scripts.
+
+Data files map a language code to a list of lessons:
+
+    {"es": [{"title": ..., "content": {...}, "activities": [...]}, ...]}
+
+Lessons are streamed from the file one at a time, so a large catalog never
+has to be held in memory as a whole. Parsed lessons can be kept in a
+per-process cache keyed on the file's mtime and size, so each file is parsed
+at most once as long as it does not change on disk.
+"""
+import glob
+import json
+import os
+import threading
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Data file used for each language when none is given explicitly
+DATA_FILES = {
+    'es': 'spanish_data2.json',
+    'de': 'german_data2.json',
+    'zh': 'chinese_data1.json',
+}
+
+# Every lesson data file kept under scripts/
+DATA_FILE_PATTERNS = [
+    'spanish_data*.json',
+    'german_data*.json',
+    'chinese_data*.json',
+    'lessons_data.json',
+]
+
+READ_SIZE = 64 * 1024
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+class LessonDataError(ValueError):
+    """Raised when a data file does not have the expected structure"""
+
+
+def resolve_data_file(language_code: str, data_file: str = None) -> str:
+    """Return the absolute path of the data file to use for a language"""
+    if data_file is None:
+        if language_code not in DATA_FILES:
+            raise LessonDataError(f"No data file configured for language '{language_code}'")
+        data_file = DATA_FILES[language_code]
+    if not os.path.isabs(data_file):
+        data_file = os.path.join(SCRIPT_DIR, data_file)
+    return data_file
+
+
+def find_data_files(directory: str = SCRIPT_DIR) -> list:
+    """Return all lesson data files in a directory, sorted by name"""
+    paths = set()
+    for pattern in DATA_FILE_PATTERNS:
+        paths.update(glob.glob(os.path.join(directory, pattern)))
+    return sorted(paths)
+
+
+def _cache_key(path: str):
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+
+class _JSONStream:
+    """Incremental reader that decodes one JSON value at a time from a text file"""
+
+    def __init__(self, f, read_size: int = READ_SIZE):
+        self.f = f
+        self.read_size = read_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        data = self.f.read(self.read_size)
+        if not data:
+            self.eof = True
+            return False
+        # Drop the consumed prefix so the buffer stays around one value in size
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise LessonDataError(f"Expected '{char}' but found '{found or 'end of file'}'")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                # The value may simply be cut off at the end of the buffer
+                if self._fill():
+                    continue
+                raise LessonDataError(f"Invalid JSON: {e}") from e
+            if end == len(self.buf) and not self.eof:
+                # Numbers and literals can continue into the next read
+                if self._fill():
+                    continue
+            self.pos = end
+            return value
+
+    def array_items(self):
+        """Yield the items of the array starting at the current position"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ',':
+                self.pos += 1
+                continue
+            self.expect(']')
+            return
+
+    def skip_value(self):
+        """Consume the next value, decoding large arrays one item at a time"""
+        if self.peek() == '[':
+            for _ in self.array_items():
+                pass
+        else:
+            self.value()
+
+
+def stream_language_lessons(path: str, language_code: str):
+    """
+    Yield the lessons for one language from a data file as they are parsed.
+
+    Arrays of other languages in the same file are skipped item by item, so
+    memory use stays around the size of a single lesson.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        stream = _JSONStream(f)
+        stream.expect('{')
+        if stream.peek() == '}':
+            return
+        while True:
+            key = stream.value()
+            stream.expect(':')
+            if key == language_code:
+                yield from stream.array_items()
+                return
+            stream.skip_value()
+            if stream.peek() == ',':
+                stream.pos += 1
+                continue
+            stream.expect('}')
+            return
+
+
+def stream_all_lessons(path: str):
+    """Yield (language_code, lesson) for every lesson in a data file, in file order"""
+    with open(path, 'r', encoding='utf-8') as f:
+        stream = _JSONStream(f)
+        stream.expect('{')
+        if stream.peek() == '}':
+            return
+        while True:
+            key = stream.value()
+            stream.expect(':')
+            if stream.peek() != '[':
+                raise LessonDataError(f"Value for '{key}' is not a list of lessons")
+            for lesson in stream.array_items():
+                yield key, lesson
+            if stream.peek() == ',':
+                stream.pos += 1
+                continue
+            stream.expect('}')
+            return
+
+
+def _cached_entry(key):
+    with _cache_lock:
+        return _cache.get(key)
+
+
+def _store(key, languages: dict, complete: bool = False):
+    """Add parsed languages for one version of a file to the cache"""
+    with _cache_lock:
+        # Entries for older versions of the file are no longer reachable
+        for stale in [k for k in _cache if k[0] == key[0] and k != key]:
+            del _cache[stale]
+        entry = _cache.setdefault(key, {'languages': {}, 'complete': False})
+        entry['languages'].update(languages)
+        entry['complete'] = entry['complete'] or complete
+
+
+def iter_lessons(path: str, language_code: str, cache: bool = True):
+    """
+    Yield the lessons for one language, parsing the file at most once.
+
+    When the file has already been parsed in this process and has not
+    changed since, lessons come from the cache. Otherwise they are streamed
+    from disk; with `cache` set, they are also kept for later calls once the
+    whole language has been read.
+    """
+    key = _cache_key(path)
+    entry = _cached_entry(key)
+    if entry is not None and language_code in entry['languages']:
+        yield from entry['languages'][language_code]
+        return
+    if entry is not None and entry['complete']:
+        return
+
+    lessons = [] if cache else None
+    for lesson in stream_language_lessons(path, language_code):
+        if lessons is not None:
+            lessons.append(lesson)
+        yield lesson
+
+    if lessons is not None:
+        _store(key, {language_code: lessons})
+
+
+def load_lessons(language_code: str, data_file: str = None) -> list:
+    """Return all lessons for a language as a list, using the cache"""
+    return list(iter_lessons(resolve_data_file(language_code, data_file), language_code))
+
+
+def load_data_file(path: str) -> dict:
+    """Parse a whole data file into {language_code: [lessons]}, using the cache"""
+    key = _cache_key(path)
+    entry = _cached_entry(key)
+    if entry is not None and entry['complete']:
+        return dict(entry['languages'])
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise LessonDataError(f"{os.path.basename(path)}: expected an object of language codes")
+    _store(key, data, complete=True)
+    return dict(data)
+
+
+def list_languages(path: str) -> list:
+    """Return the language codes in a data file without keeping their lessons"""
+    languages = []
+    with open(path, 'r', encoding='utf-8') as f:
+        stream = _JSONStream(f)
+        stream.expect('{')
+        if stream.peek() == '}':
+            return languages
+        while True:
+            languages.append(stream.value())
+            stream.expect(':')
+            stream.skip_value()
+            if stream.peek() == ',':
+                stream.pos += 1
+                continue
+            stream.expect('}')
+            return languages
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
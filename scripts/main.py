@@ -1,84 +1,446 @@
 import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
+import sys
+import argparse
+import itertools
+import time
 import json
+from typing import TYPE_CHECKING
 
-# Load environment variables
-load_dotenv()
-
-# Initialize Supabase client with service role key to bypass RLS
-url: str = os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
-# Use service role key instead of anon key to bypass RLS
-service_key: str = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
-if not service_key:
-    print("Warning: SUPABASE_SERVICE_ROLE_KEY not found, trying anon key...")
-    service_key = os.environ.get("NEXT_PUBLIC_SUPABASE_ANON_KEY")
-supabase: Client = create_client(url, service_key)
-
-def load_lessons_data():
-    """Load lessons data from JSON file"""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    json_path = os.path.join(script_dir, 'spanish_data2.json')
-    
-    with open(json_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+# The other modules are imported where they are used, so `--help` starts quickly
+if TYPE_CHECKING:
+    from answer_grader import KnownWords
+    from seed_manifest import SeedManifest
+
+# Number of lessons sent per upsert request in bulk mode
+DEFAULT_CHUNK_SIZE = 50
+
+# Matches the UNIQUE(course_id, lesson_number) constraint on the lessons table
+LESSONS_CONFLICT_KEY = 'course_id,lesson_number'
+
+# Languages that can be seeded, as (language_code, language_name)
+LANGUAGES = [
+    ('es', 'Spanish'),
+    ('de', 'German'),
+    ('zh', 'Chinese'),
+]
+
+def get_client():
+    """The shared Supabase client from supabase_client.py"""
+    from supabase_client import get_client as shared_client
+    return shared_client()
+
+def load_lessons_data(language_code: str, data_file: str = None):
+    """Stream the lessons for a language from its JSON data file"""
+    from lesson_loader import iter_lessons, resolve_data_file
+    return iter_lessons(resolve_data_file(language_code, data_file), language_code)
 
 def get_course_id(language_code: str):
     """Get course ID by language code"""
-    response = supabase.table('language_courses').select('id').eq('language_code', language_code).execute()
+    response = get_client().table('language_courses').select('id').eq('language_code', language_code).execute()
     if response.data and len(response.data) > 0:
         return response.data[0]['id']
     return None
 
-def create_lessons_for_language(language_code: str, language_name: str):
-    """Create 10 lessons for a specific language"""
-    course_id = get_course_id(language_code)
+def get_course_ids(language_codes: list):
+    """Get course IDs for several language codes with a single query"""
+    response = (get_client().table('language_courses').select('id, language_code')
+                .in_('language_code', language_codes).execute())
+    return {row['language_code']: row['id'] for row in response.data or []}
+
+def build_lesson_row(course_id: str, lesson_number: int, lesson_data: dict, known: 'KnownWords' = None):
+    """Build a row for the lessons table from one entry of the data file"""
+    from answer_grader import with_answer_keys
+    # Written activities carry their compiled answer keys for grading
+    return lesson_row(course_id, lesson_number, with_answer_keys(lesson_data, known))
+
+def lesson_row(course_id: str, lesson_number: int, lesson_data: dict):
+    """Build a row for the lessons table from a lesson that already carries its answer keys"""
+    # Merge content with activities
+    content_with_activities = lesson_data['content'].copy()
+    if 'activities' in lesson_data:
+        content_with_activities['activities'] = lesson_data['activities']
+
+    return {
+        'course_id': course_id,
+        'lesson_number': lesson_number,
+        'title': lesson_data['title'],
+        'description': lesson_data['description'],
+        'difficulty': lesson_data['difficulty'],
+        'xp_reward': lesson_data['xp_reward'],
+        'content': json.dumps(content_with_activities),
+        'is_published': True
+    }
+
+def chunked(items, size: int):
+    """Yield successive lists of at most `size` items from any iterable"""
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def upsert_lessons_bulk(rows, language_name: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                        table: str = 'lessons'):
+    """
+    Upsert lesson rows in chunks, one request per chunk.
+
+    Rows are keyed on (course_id, lesson_number), so running this again with
+    the same data updates the existing lessons instead of failing. When a
+    chunk is rejected, its rows are retried one at a time so the error can be
+    attributed to the offending lessons. `rows` may be a generator, in which
+    case the first chunk is sent before the remaining rows are produced.
+    `table` is lessons_staging when a course is staged for publishing.
+
+    Returns:
+        Tuple of (number of rows written, list of (lesson_number, error) pairs)
+    """
+    written = 0
+    total = 0
+    errors = []
+    requests = 0
+    started = time.perf_counter()
+
+    for chunk in chunked(rows, chunk_size):
+        requests += 1
+        total += len(chunk)
+        try:
+            get_client().table(table).upsert(chunk, on_conflict=LESSONS_CONFLICT_KEY).execute()
+            written += len(chunk)
+            first, last = chunk[0]['lesson_number'], chunk[-1]['lesson_number']
+            print(f"✓ Upserted {language_name} Lessons {first}-{last} ({written} so far)")
+            continue
+        except Exception as e:
+            print(f"✗ Chunk of {len(chunk)} {language_name} lessons rejected: {str(e)}")
+
+        # Retry the rejected chunk row by row to find the bad lessons
+        for row in chunk:
+            requests += 1
+            try:
+                get_client().table(table).upsert(row, on_conflict=LESSONS_CONFLICT_KEY).execute()
+                written += 1
+            except Exception as e:
+                errors.append((row['lesson_number'], str(e)))
+
+    elapsed = time.perf_counter() - started
+    rate = written / elapsed if elapsed > 0 else float('inf')
+    print(f"{language_name}: {written}/{total} lessons in {elapsed:.2f}s "
+          f"({rate:.1f} rows/s, {requests} requests)")
+
+    if errors:
+        print(f"✗ {len(errors)} {language_name} lessons failed:")
+        for lesson_number, error in errors:
+            print(f"  - Lesson {lesson_number}: {error}")
+
+    return written, errors
+
+def seed_incremental(language_code: str, language_name: str, course_id: str, lessons: list,
+                     manifest: 'SeedManifest', chunk_size: int = DEFAULT_CHUNK_SIZE, known: 'KnownWords' = None):
+    """
+    Push only the lessons that changed since the last recorded run.
+
+    Added and changed lessons are upserted in chunks and lessons that
+    disappeared from the data file are deleted. The manifest is updated for
+    every lesson that was written, so failed lessons are retried next time.
+
+    Returns:
+        Tuple of (number of lessons written, list of (lesson_number, error) pairs)
+    """
+    from answer_grader import with_answer_keys
+    from seed_manifest import diff_lessons, format_diff, hash_lesson
+
+    previous = manifest.lessons(language_code, course_id)
+    # Hash the lessons as they are seeded: the typos their answer keys forgive depend
+    # on the words of the whole course, so editing one lesson can change the others
+    seeded = [with_answer_keys(lesson_data, known) for lesson_data in lessons]
+    current = {i: hash_lesson(lesson) for i, lesson in enumerate(seeded, start=1)}
+    diff = diff_lessons(previous, current)
+    print(format_diff(language_name, diff))
+
+    pending = diff['added'] + diff['changed']
+    rows = [lesson_row(course_id, number, seeded[number - 1]) for number in pending]
+    written, errors = 0, []
+    if rows:
+        written, errors = upsert_lessons_bulk(rows, language_name, chunk_size)
+
+    removed = diff['removed']
+    if removed:
+        try:
+            (get_client().table('lessons').delete()
+             .eq('course_id', course_id).in_('lesson_number', removed).execute())
+            print(f"✓ Deleted {len(removed)} {language_name} lessons")
+        except Exception as e:
+            print(f"✗ Error deleting {language_name} lessons: {str(e)}")
+            errors.extend((number, str(e)) for number in removed)
+
+    # Failed lessons keep their previous entry (or none) so they are retried
+    failed = {number for number, _ in errors}
+    recorded = {}
+    for number in set(previous) | set(current):
+        if number not in failed:
+            entry = current.get(number)
+        else:
+            entry = previous.get(number)
+        if entry is not None:
+            recorded[number] = entry
+    manifest.record(language_code, course_id, recorded)
+
+    return written, errors
+
+def publish_course(language_name: str, course_id: str, rows, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Stage a whole course, then publish it in one transaction.
+
+    The rows are upserted into lessons_staging, which learners never read.
+    Only when every row was staged does publish_course() (migration 012) check
+    the course and swap it into lessons. Lessons matched on their content or
+    title keep their id, and the progress pointing at it, even when renumbered.
+    If anything fails, the published course is left as it was.
+
+    Returns:
+        Tuple of (number of lessons inserted or updated, list of (lesson_number, error) pairs)
+    """
+    # Drop whatever an interrupted run left behind
+    get_client().table('lessons_staging').delete().eq('course_id', course_id).execute()
+    staged, errors = upsert_lessons_bulk(rows, language_name, chunk_size, table='lessons_staging')
+    if errors:
+        print(f"✗ {language_name} was not published, the published lessons are unchanged")
+        return 0, errors
+
+    try:
+        counts = get_client().rpc('publish_course', {'p_course_id': course_id}).execute().data
+    except Exception as e:
+        print(f"✗ Error publishing {language_name}: {str(e)}")
+        return 0, [(None, str(e))]
+    print(f"✓ Published {language_name}: {counts['inserted']} added, {counts['updated']} updated, "
+          f"{counts['moved']} renumbered, {counts['unchanged']} unchanged, {counts['deleted']} removed")
+    return counts['inserted'] + counts['updated'], []
+
+def create_lessons_for_language(language_code: str, language_name: str, bulk: bool = False,
+                                chunk_size: int = DEFAULT_CHUNK_SIZE, course_id: str = None,
+                                manifest: 'SeedManifest' = None, data_file: str = None,
+                                publish: bool = False):
+    """
+    Create the lessons for a specific language
+
+    Args:
+        course_id: Course ID if already known, otherwise it is looked up
+        manifest: When given, only lessons changed since the last run are pushed
+        data_file: Data file to read instead of the language's default one
+        publish: Stage the whole course and publish it atomically
+
+    Returns:
+        Tuple of (number of lessons written, list of (lesson_number, error) pairs)
+    """
+    if course_id is None:
+        course_id = get_course_id(language_code)
     if not course_id:
         print(f"Error: Course not found for {language_name}")
-        return
-    
+        return 0, [(None, 'course not found')]
+
     # Load lessons data from JSON file
-    lessons_data = load_lessons_data()
-    lessons = lessons_data[language_code]
-    
+    try:
+        lessons = list(load_lessons_data(language_code, data_file))
+    except (OSError, ValueError) as e:
+        print(f"Error: Could not load lesson data for {language_name}: {str(e)}")
+        return 0, [(None, str(e))]
+    if not lessons:
+        print(f"Error: No lesson data for {language_name}")
+        return 0, [(None, 'no lesson data')]
+    # Every answer key needs the words of the whole course, so the file is read in full first
+    from answer_grader import course_words
+    known = course_words(language_code, lessons)
+
+    if (bulk or publish) and manifest is None:
+        # Rows are built as the chunks are sent
+        rows = (build_lesson_row(course_id, i, lesson_data, known)
+                for i, lesson_data in enumerate(lessons, start=1))
+        if publish:
+            return publish_course(language_name, course_id, rows, chunk_size)
+        return upsert_lessons_bulk(rows, language_name, chunk_size)
+
+    if manifest is not None:
+        return seed_incremental(language_code, language_name, course_id, lessons, manifest, chunk_size, known)
+
+    written = 0
+    errors = []
     for i, lesson_data in enumerate(lessons, start=1):
-        # Merge content with activities
-        content_with_activities = lesson_data['content'].copy()
-        if 'activities' in lesson_data:
-            content_with_activities['activities'] = lesson_data['activities']
-        
-        lesson = {
-            'course_id': course_id,
-            'lesson_number': i,
-            'title': lesson_data['title'],
-            'description': lesson_data['description'],
-            'difficulty': lesson_data['difficulty'],
-            'xp_reward': lesson_data['xp_reward'],
-            'content': json.dumps(content_with_activities),
-            'is_published': True
-        }
-        
+        lesson = build_lesson_row(course_id, i, lesson_data, known)
+
         try:
-            response = supabase.table('lessons').insert(lesson).execute()
-            print(f"✓ Created {language_name} Lesson {i}: {lesson_data['title']}")
+            response = get_client().table('lessons').insert(lesson).execute()
+            written += 1
+            print(f"✓ Created {language_name} Lesson {i}/{len(lessons)}: {lesson_data['title']}")
         except Exception as e:
+            errors.append((i, str(e)))
             print(f"✗ Error creating {language_name} Lesson {i}: {str(e)}")
+    return written, errors
+
+def seed_languages(languages: list, bulk: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   workers: int = None, manifest: 'SeedManifest' = None, data_files: dict = None,
+                   publish: bool = False):
+    """
+    Seed several languages concurrently.
+
+    All course IDs are fetched up front in one query, then each language is
+    seeded on its own worker thread. The number of requests in flight at once
+    is capped by `set_max_in_flight`, independently of the worker count.
+
+    Returns:
+        Dict mapping language_code to (lessons written, errors)
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    course_ids = get_course_ids([code for code, _ in languages])
+    data_files = data_files or {}
+    results = {}
+
+    with ThreadPoolExecutor(max_workers=workers or len(languages)) as pool:
+        futures = {
+            pool.submit(create_lessons_for_language, code, name, bulk, chunk_size,
+                        course_ids.get(code, ''), manifest, data_files.get(code), publish): code
+            for code, name in languages
+        }
+        for future, code in futures.items():
+            try:
+                results[code] = future.result()
+            except Exception as e:
+                print(f"✗ Error seeding {code}: {str(e)}")
+                results[code] = (0, [(None, str(e))])
+
+    return results
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Seed the lessons table from the lesson data files")
+    parser.add_argument('--bulk', action='store_true',
+                        help="Upsert lessons in chunks instead of inserting them one by one")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Lessons per upsert request in bulk and publish mode (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only push lessons that were added, changed or removed since the last run")
+    parser.add_argument('--publish', action='store_true',
+                        help="Stage each course in full and publish it in one transaction, "
+                             "keeping the ids of lessons that are still there")
+    parser.add_argument('--manifest', default=None,
+                        help="Where incremental mode records lesson hashes (default: scripts/.seed_manifest.json)")
+    parser.add_argument('--languages', default='es',
+                        help="Comma-separated language codes to seed, or 'all' (default: es)")
+    parser.add_argument('--data-file', action='append', default=[], metavar='LANG=PATH',
+                        help="Read a language's lessons from another data file (repeatable)")
+    parser.add_argument('--answer-index', default=None,
+                        help="Where the answer keys of written activities are compiled to "
+                             "(default: scripts/.answer_index.json)")
+    parser.add_argument('--skip-validation', action='store_true',
+                        help="Seed even if the data files fail validation")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Languages seeded at the same time (default: one per language)")
+    parser.add_argument('--max-in-flight', type=int, default=None,
+                        help="Maximum concurrent Supabase requests (default: 4, see supabase_client.py)")
+    parser.add_argument('--trace', metavar='PATH',
+                        help="Record every Supabase request to this JSON-lines file and print a summary")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="Sample local stacks during the run and write them here in folded format")
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.max_in_flight is not None and args.max_in_flight < 1:
+        parser.error("--max-in-flight must be at least 1")
+    if args.publish and args.incremental:
+        parser.error("--publish and --incremental cannot be combined")
+
+    known = dict(LANGUAGES)
+    if args.languages == 'all':
+        args.languages = list(LANGUAGES)
+    else:
+        codes = [code.strip() for code in args.languages.split(',') if code.strip()]
+        unknown = [code for code in codes if code not in known]
+        if unknown:
+            parser.error(f"unknown language code(s): {', '.join(unknown)}")
+        args.languages = [(code, known[code]) for code in codes]
+
+    data_files = {}
+    for item in args.data_file:
+        code, sep, path = item.partition('=')
+        if not sep or not path:
+            parser.error(f"--data-file expects LANG=PATH, got '{item}'")
+        data_files[code.strip()] = path.strip()
+    args.data_files = data_files
+    return args
+
+def compile_answer_index(languages: list, data_files: dict, path: str = None):
+    """Write the answer keys of every written activity being seeded to the answer index"""
+    from answer_grader import INDEX_FILE, AnswerIndex
+    from lesson_loader import resolve_data_file
+
+    path = path or INDEX_FILE
+    paths = [resolve_data_file(code, data_files.get(code)) for code, _ in languages]
+    try:
+        index = AnswerIndex.from_data_files(paths)
+        # Keep the activities of languages that are not being seeded
+        seeded = {code for code, _ in languages}
+        if os.path.exists(path):
+            for key, compiled in AnswerIndex.load(path).compiled.items():
+                if key.split(':')[0] not in seeded:
+                    index.add(key, compiled)
+        index.save(path)
+        print(f"✓ Compiled answer keys for {len(index)} written activities")
+    except (OSError, ValueError) as e:
+        print(f"✗ Could not compile the answer index: {str(e)}")
+
+def seed(args):
+    """Seed the selected languages and report the outcome; returns the exit status"""
+    from seed_manifest import SeedManifest, default_manifest_path
+    from supabase_client import project_url
+
+    manifest = None
+    if args.incremental:
+        manifest = SeedManifest(args.manifest or default_manifest_path(), project_url())
+
+    compile_answer_index(args.languages, args.data_files, args.answer_index)
+
+    started = time.perf_counter()
+    names = ', '.join(name for _, name in args.languages)
+    print(f"Creating lessons for {names}...")
+    results = seed_languages(args.languages, bulk=args.bulk, chunk_size=args.chunk_size,
+                             workers=args.workers, manifest=manifest, data_files=args.data_files,
+                             publish=args.publish)
+    elapsed = time.perf_counter() - started
+    if manifest is not None:
+        manifest.save()
+
+    failed = {code: errors for code, (_, errors) in results.items() if errors}
+    total = sum(written for written, _ in results.values())
+    if failed:
+        print(f"\n✗ {total} lessons written in {elapsed:.2f}s, failures in: {', '.join(failed)}")
+        return 1
+    print(f"\n✓ All lessons created successfully! ({total} lessons in {elapsed:.2f}s)")
+    return 0
+
+def main(argv=None):
+    """Main function to create lessons for the selected languages"""
+    args = parse_args(argv)
+    from lesson_loader import resolve_data_file
+    from supabase_client import set_max_in_flight
+    from supabase_tracing import tracing
+    from validate_lessons import format_report, validate_files
+
+    if args.max_in_flight is not None:
+        set_max_in_flight(args.max_in_flight)
+
+    if not args.skip_validation:
+        paths = sorted({resolve_data_file(code, args.data_files.get(code)) for code, _ in args.languages})
+        report = validate_files(paths)
+        if report['summary']['errors']:
+            print(format_report(report))
+            print("\n✗ Data files failed validation, nothing was seeded (use --skip-validation to override)")
+            return 1
 
-def main():
-    """Main function to create lessons for all three languages"""
     print("Starting lesson creation...\n")
-    
-    languages = [
-        ('es', 'Spanish'),
-        # ('de', 'German'),
-        # ('zh', 'Chinese')
-    ]
-    
-    for lang_code, lang_name in languages:
-        print(f"\nCreating lessons for {lang_name}...")
-        create_lessons_for_language(lang_code, lang_name)
-    
-    print("\n✓ All lessons created successfully!")
+
+    with tracing(get_client(), args.trace, args.profile):
+        return seed(args)
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,319 @@
+"""
+Pre-render speech for the lesson content so the app can play it instantly.
+
+Every teaching activity, phrase and vocabulary item in the lesson data files
+is synthesized once per (voice, model, language, text). The SHA-256 of those
+four values names the audio file, so identical text is rendered once however
+many lessons use it, and edited text gets a new file on the next run while
+unchanged text is skipped. Files are written under public/audio/lessons/
+and listed in manifest.json there, which src/lib/tts.ts looks up before
+streaming from ElevenLabs when the lesson and vocabulary pages play text.
+Commit that directory after a run: deployments serve it as static files.
+
+Backends:
+    elevenlabs  the ElevenLabs text-to-speech API (NEXT_PUBLIC_ELEVEN_LABS_API_KEY), the default
+    local       deterministic WAV tones, no network; for testing the pipeline, so
+                it never writes to public/audio/lessons
+
+Usage:
+    python prerender_audio.py --dry-run
+    python prerender_audio.py --concurrency 4 --prune
+    python prerender_audio.py --backend local --output /tmp/audio
+"""
+import argparse
+import hashlib
+import io
+import itertools
+import json
+import math
+import os
+import sys
+import threading
+import time
+import unicodedata
+import wave
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import httpx
+from dotenv import load_dotenv
+
+from lesson_loader import LessonDataError, find_data_files, stream_all_lessons
+
+ENV_FILE = Path(__file__).parent.parent / '.env'
+AUDIO_DIR = Path(__file__).parent.parent / 'public' / 'audio' / 'lessons'
+MANIFEST_NAME = 'manifest.json'
+
+# Same voice and model as src/lib/tts.ts
+DEFAULT_VOICE = 'JBFqnCBsd6RMkjVDRZzb'
+DEFAULT_MODEL = 'eleven_v3'
+
+DEFAULT_CONCURRENCY = 4
+# Renders between manifest saves, so an interrupted run keeps most of its work
+SAVE_EVERY = 25
+
+
+def normalize(text: str) -> str:
+    """Text as it is hashed and synthesized; tts.ts normalizes the same way"""
+    return unicodedata.normalize('NFC', text).strip()
+
+
+def audio_key(voice: str, model: str, language: str, text: str) -> str:
+    return hashlib.sha256(f"{voice}\n{model}\n{language}\n{text}".encode('utf-8')).hexdigest()
+
+
+class LocalBackend:
+    """Stand-in that renders a short tone per text instead of speech"""
+
+    name = 'local'
+    extension = 'wav'
+    RATE = 8000
+
+    def __init__(self, latency_ms: float = 0):
+        self.latency = latency_ms / 1000
+
+    def synthesize(self, text: str, voice: str, model: str, language: str) -> bytes:
+        if self.latency:
+            time.sleep(self.latency)
+        # Length and pitch follow the text, so different texts sound different
+        seconds = min(5.0, 0.2 + 0.05 * len(text))
+        pitch = 220 + int(hashlib.md5(text.encode('utf-8')).hexdigest()[:4], 16) % 440
+        step = 2 * math.pi * pitch / self.RATE
+        frames = array('h', (int(8000 * math.sin(step * i)) for i in range(int(seconds * self.RATE))))
+        if sys.byteorder == 'big':
+            frames.byteswap()
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(self.RATE)
+            out.writeframes(frames.tobytes())
+        return buffer.getvalue()
+
+    def close(self):
+        pass
+
+
+class ElevenLabsBackend:
+    """ElevenLabs text-to-speech over pooled connections, returning MP3"""
+
+    name = 'elevenlabs'
+    extension = 'mp3'
+    URL = 'https://api.elevenlabs.io/v1/text-to-speech/{voice}'
+
+    def __init__(self, timeout: float = 60):
+        load_dotenv(ENV_FILE)
+        api_key = os.environ.get('NEXT_PUBLIC_ELEVEN_LABS_API_KEY')
+        if not api_key:
+            raise ValueError("Missing ElevenLabs credentials. Make sure NEXT_PUBLIC_ELEVEN_LABS_API_KEY "
+                             "is set in your .env file")
+        self.client = httpx.Client(timeout=timeout, headers={'xi-api-key': api_key})
+
+    def synthesize(self, text: str, voice: str, model: str, language: str) -> bytes:
+        response = self.client.post(
+            self.URL.format(voice=voice),
+            params={'output_format': 'mp3_44100_128'},
+            json={'text': text, 'model_id': model},
+        )
+        response.raise_for_status()
+        return response.content
+
+    def close(self):
+        self.client.close()
+
+
+BACKENDS = {
+    'local': LocalBackend,
+    'elevenlabs': ElevenLabsBackend,
+}
+
+
+def lesson_texts(paths: list = None) -> dict:
+    """Texts to render, as {language_code: set of texts}"""
+    texts = {}
+    for path in paths or find_data_files():
+        try:
+            for language, lesson in stream_all_lessons(path):
+                if not isinstance(lesson, dict):
+                    continue
+                found = texts.setdefault(language, set())
+                content = lesson.get('content') if isinstance(lesson.get('content'), dict) else {}
+                found.update(item for item in content.get('vocabulary', []) + content.get('phrases', [])
+                             if isinstance(item, str))
+                found.update(activity['content'] for activity in lesson.get('activities', [])
+                             if isinstance(activity, dict) and activity.get('type') == 'teaching'
+                             and isinstance(activity.get('content'), str))
+        except (OSError, LessonDataError) as e:
+            print(f"✗ Skipping {path}: {str(e)}")
+    return texts
+
+
+class AudioCache:
+    """Rendered files on disk and the manifest that maps keys to them"""
+
+    def __init__(self, directory: Path = AUDIO_DIR):
+        self.directory = Path(directory)
+        self.manifest_path = self.directory / MANIFEST_NAME
+        self.lock = threading.Lock()
+        self.entries = {}
+        if self.manifest_path.exists():
+            with open(self.manifest_path, encoding='utf-8') as f:
+                self.entries = json.load(f).get('entries', {})
+
+    def has(self, key: str, backend: str) -> bool:
+        """Whether the key was rendered by this backend; audio of another backend is replaced"""
+        entry = self.entries.get(key)
+        return (entry is not None and entry.get('backend') == backend
+                and (self.directory / entry['file']).exists())
+
+    def store(self, key: str, audio: bytes, extension: str, **details):
+        relative = f"{key[:2]}/{key}.{extension}"
+        path = self.directory / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(path.name + '.partial')
+        partial.write_bytes(audio)
+        os.replace(partial, path)
+        with self.lock:
+            self.entries[key] = {'file': relative, 'bytes': len(audio), **details}
+
+    def prune(self, keep: set, voice: str, model: str) -> int:
+        """Forget and delete audio of a voice and model whose text is no longer in the lessons"""
+        with self.lock:
+            stale = [key for key, entry in self.entries.items()
+                     if key not in keep and entry.get('voice') == voice and entry.get('model') == model]
+            for key in stale:
+                path = self.directory / self.entries.pop(key)['file']
+                if path.exists():
+                    path.unlink()
+        return len(stale)
+
+    def save(self):
+        with self.lock:
+            data = {'version': 1, 'entries': dict(sorted(self.entries.items()))}
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temporary = self.manifest_path.with_name(MANIFEST_NAME + '.tmp')
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(temporary, self.manifest_path)
+
+
+def plan(texts: dict, voice: str, model: str) -> dict:
+    """Unique render jobs as {key: (language, text)}"""
+    jobs = {}
+    for language, items in texts.items():
+        for text in items:
+            text = normalize(text)
+            if text:
+                jobs[audio_key(voice, model, language, text)] = (language, text)
+    return jobs
+
+
+def render(jobs: dict, cache: AudioCache, backend, voice: str, model: str,
+           concurrency: int = DEFAULT_CONCURRENCY, dry_run: bool = False) -> dict:
+    """
+    Render every job that is not in the cache yet.
+
+    Returns:
+        Dict with 'rendered', 'cached' and 'failed' counts
+    """
+    todo = [(key, language, text) for key, (language, text) in sorted(jobs.items())
+            if not cache.has(key, backend.name)]
+    totals = {'rendered': 0, 'cached': len(jobs) - len(todo), 'failed': 0}
+    print(f"  {len(jobs)} unique texts, {totals['cached']} cached, {len(todo)} to render")
+    if dry_run or not todo:
+        return totals
+
+    def synthesize(item):
+        key, language, text = item
+        audio = backend.synthesize(text, voice, model, language)
+        cache.store(key, audio, backend.extension, language=language, voice=voice, model=model,
+                    backend=backend.name, chars=len(text))
+
+    started = time.perf_counter()
+    # Submit lazily so at most `concurrency` texts are in flight at once
+    items = iter(todo)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {pool.submit(synthesize, item): item for item in itertools.islice(items, concurrency)}
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                key, language, text = futures.pop(future)
+                try:
+                    future.result()
+                except Exception as e:
+                    totals['failed'] += 1
+                    print(f"✗ {language} '{text[:40]}': {str(e)}")
+                else:
+                    totals['rendered'] += 1
+                    if totals['rendered'] % SAVE_EVERY == 0:
+                        cache.save()
+                        print(f"✓ Rendered {totals['rendered']}/{len(todo)}")
+                for item in itertools.islice(items, 1):
+                    futures[pool.submit(synthesize, item)] = item
+    cache.save()
+
+    elapsed = time.perf_counter() - started
+    rate = totals['rendered'] / elapsed if elapsed > 0 else 0
+    print(f"{totals['rendered']} rendered in {elapsed:.2f}s ({rate:.1f}/s)")
+    return totals
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-render speech for lesson content")
+    parser.add_argument('data_files', nargs='*', help="Lesson data files (default: all in scripts/)")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='elevenlabs',
+                        help="Speech backend (default: elevenlabs)")
+    parser.add_argument('--voice', default=DEFAULT_VOICE, help=f"Voice ID (default: {DEFAULT_VOICE})")
+    parser.add_argument('--model', default=DEFAULT_MODEL, help=f"Model ID (default: {DEFAULT_MODEL})")
+    parser.add_argument('--output', default=str(AUDIO_DIR), help="Audio directory (default: public/audio/lessons)")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Renders in flight at once (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument('--prune', action='store_true',
+                        help="Delete audio for text that is no longer in the lessons")
+    parser.add_argument('--dry-run', action='store_true', help="Count the texts to render and stop")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.prune and args.data_files:
+        parser.error("--prune needs every data file, so it cannot be combined with data_files")
+    # The app plays whatever is in public/audio/lessons, so test tones must go elsewhere
+    if args.backend == LocalBackend.name and not args.dry_run and Path(args.output).resolve() == AUDIO_DIR.resolve():
+        parser.error("the local backend renders tones, not speech; pass --output outside public/audio/lessons")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    jobs = plan(lesson_texts(args.data_files), args.voice, args.model)
+    cache = AudioCache(args.output)
+
+    if args.prune and not args.dry_run:
+        removed = cache.prune(set(jobs), args.voice, args.model)
+        if removed:
+            cache.save()
+            print(f"✓ Pruned {removed} stale audio files")
+
+    if args.dry_run:
+        # Counting needs only the backend's name, not its credentials
+        totals = render(jobs, cache, BACKENDS[args.backend], args.voice, args.model, dry_run=True)
+        print(f"\n✓ {totals['cached']} already cached, {len(jobs) - totals['cached']} to render")
+        return 0
+
+    try:
+        backend = BACKENDS[args.backend]()
+    except ValueError as e:
+        print(f"✗ {str(e)}")
+        return 1
+    try:
+        totals = render(jobs, cache, backend, args.voice, args.model, args.concurrency)
+    finally:
+        backend.close()
+
+    print(f"\n{'✗' if totals['failed'] else '✓'} {totals['rendered']} rendered, "
+          f"{totals['cached']} already cached, {totals['failed']} failed")
+    return 1 if totals['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
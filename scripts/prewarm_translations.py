@@ -0,0 +1,297 @@
+"""
+Fill the translation cache with every word and phrase learners can click.
+
+Texts are collected from the lesson data files (vocabulary, phrases, the
+foreign-language options, answers and matching pairs of activities) and from
+the reading texts in Supabase. They are cleaned the way the reading page
+cleans a clicked word and deduplicated per language pair. Texts already in
+translation_cache are skipped, so an interrupted run continues where it
+stopped; rows written by the local stand-in do not count and are replaced. The rest are translated through a backend with a bounded number of
+concurrent requests and upserted in batches as they finish.
+
+/api/translate looks words up in the same table before calling the
+translation service. See supabase/migrations/010_create_translation_cache.sql.
+
+Backends:
+    google  the translate.googleapis.com endpoint used by /api/translate (default)
+    local   deterministic stand-in, no network; for testing the pipeline, so it
+            only writes to the SQLite backend (SUPABASE_SQLITE_DB)
+
+Usage:
+    python prewarm_translations.py --dry-run
+    python prewarm_translations.py --concurrency 8
+    SUPABASE_SQLITE_DB=local.db python prewarm_translations.py --backend local
+"""
+import argparse
+import itertools
+import re
+import sys
+import threading
+import time
+import unicodedata
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import httpx
+
+from ingest_reading_texts import HAN, Tokenizer
+from lesson_loader import LessonDataError, find_data_files, stream_all_lessons
+from supabase_client import get_client, project_url
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_BATCH_SIZE = 100
+KEYS_PER_LOOKUP = 200
+
+# Characters removed from a clicked word by src/app/reading/[id]/page.tsx
+CLICK_PUNCTUATION = re.compile('[。，、！？；：""\'\'（）【】《》…—]')
+WHITESPACE = re.compile(r'\s+')
+
+
+def normalize(text: str) -> str:
+    """Cache key for a text; /api/translate normalizes the same way"""
+    return WHITESPACE.sub(' ', unicodedata.normalize('NFC', text)).strip()
+
+
+def clean(text: str) -> str:
+    return normalize(CLICK_PUNCTUATION.sub('', text))
+
+
+class LocalBackend:
+    """Stand-in that "translates" without any network access"""
+
+    name = 'local'
+
+    def __init__(self, latency_ms: float = 0):
+        self.latency = latency_ms / 1000
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        return f"[{source}->{target}] {text}"
+
+    def close(self):
+        pass
+
+
+class GoogleBackend:
+    """The free Google endpoint that /api/translate calls, over pooled connections"""
+
+    name = 'google'
+    URL = 'https://translate.googleapis.com/translate_a/single'
+
+    def __init__(self, timeout: float = 10):
+        self.client = httpx.Client(timeout=timeout, limits=httpx.Limits(max_keepalive_connections=DEFAULT_CONCURRENCY))
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        response = self.client.get(self.URL, params={'client': 'gtx', 'sl': source, 'tl': target, 'dt': 't', 'q': text})
+        response.raise_for_status()
+        data = response.json()
+        # The translation comes in segments, one per sentence
+        return ''.join(segment[0] for segment in data[0] or [] if segment and segment[0])
+
+    def close(self):
+        self.client.close()
+
+
+BACKENDS = {
+    'local': LocalBackend,
+    'google': GoogleBackend,
+}
+
+
+def lesson_texts() -> dict:
+    """Foreign-language texts in the lesson data files, as {language_code: set of texts}"""
+    texts = {}
+    for path in find_data_files():
+        try:
+            for language, lesson in stream_all_lessons(path):
+                if not isinstance(lesson, dict):
+                    continue
+                found = texts.setdefault(language, set())
+                content = lesson.get('content') if isinstance(lesson.get('content'), dict) else {}
+                items = [item for item in content.get('vocabulary', []) + content.get('phrases', [])
+                         if isinstance(item, str)]
+                found.update(items)
+                known = set(items)
+
+                for activity in lesson.get('activities', []):
+                    if not isinstance(activity, dict):
+                        continue
+                    answer = activity.get('correct_answer')
+                    if activity.get('type') == 'written' and isinstance(answer, str):
+                        # Written activities always ask for the language being learned
+                        found.add(answer)
+                        found.update(a for a in activity.get('accepted_answers', []) if isinstance(a, str))
+                    elif activity.get('type') == 'multiple_choice' and isinstance(answer, str):
+                        # Options are foreign when the answer is (otherwise they are English meanings)
+                        if answer in known or HAN.search(answer):
+                            found.update(o for o in activity.get('options', []) if isinstance(o, str))
+                    elif activity.get('type') == 'matching':
+                        found.update(pair.get('spanish') for pair in activity.get('pairs', [])
+                                     if isinstance(pair, dict) and isinstance(pair.get('spanish'), str))
+        except (OSError, LessonDataError) as e:
+            print(f"✗ Skipping {path}: {str(e)}")
+    return texts
+
+
+def reading_texts(tokenizer: Tokenizer, page_size: int = 200) -> dict:
+    """Words in the reading texts stored in Supabase, as {language_code: set of words}"""
+    texts = {}
+    after = None
+    while True:
+        query = get_client().table('reading_texts').select('id, language_code, content, tokens').order('id').limit(page_size)
+        if after is not None:
+            query = query.gt('id', after)
+        rows = query.execute().data or []
+        for row in rows:
+            language = row['language_code']
+            tokens = row.get('tokens') or tokenizer.split(language, row['content'])
+            texts.setdefault(language, set()).update(tokenizer.words(language, tokens))
+        if len(rows) < page_size:
+            return texts
+        after = rows[-1]['id']
+
+
+def collect(targets: list, include_reading: bool = True) -> dict:
+    """Unique cleaned texts per (source, target) language pair"""
+    sources = lesson_texts()
+    if include_reading:
+        for language, words in reading_texts(Tokenizer()).items():
+            sources.setdefault(language, set()).update(words)
+
+    pairs = {}
+    for language, texts in sources.items():
+        cleaned = {clean(text) for text in texts}
+        cleaned.discard('')
+        for target in targets:
+            if target != language:
+                pairs[(language, target)] = cleaned
+    return pairs
+
+
+def cached_texts(source: str, target: str, texts: set) -> set:
+    """The texts of a language pair that are already in the cache with a real translation"""
+    found = set()
+    ordered = sorted(texts)
+    for start in range(0, len(ordered), KEYS_PER_LOOKUP):
+        keys = ordered[start:start + KEYS_PER_LOOKUP]
+        rows = (get_client().table('translation_cache').select('text')
+                .eq('source_lang', source).eq('target_lang', target).in_('text', keys)
+                .neq('backend', LocalBackend.name).execute().data or [])
+        found.update(row['text'] for row in rows)
+    return found
+
+
+def write_batch(rows: list):
+    (get_client().table('translation_cache')
+     .upsert(rows, on_conflict='source_lang,target_lang,text', returning='minimal').execute())
+
+
+def prewarm(pairs: dict, backend, concurrency: int = DEFAULT_CONCURRENCY,
+            batch_size: int = DEFAULT_BATCH_SIZE, dry_run: bool = False) -> dict:
+    """
+    Translate every uncached text and write the results to the cache.
+
+    Returns:
+        Dict with 'translated', 'cached' and 'failed' counts
+    """
+    todo = []
+    totals = {'translated': 0, 'cached': 0, 'failed': 0}
+    for (source, target), texts in sorted(pairs.items()):
+        cached = cached_texts(source, target, texts)
+        missing = sorted(texts - cached)
+        totals['cached'] += len(cached)
+        print(f"  {source}->{target}: {len(texts)} unique texts, {len(cached)} cached, {len(missing)} to translate")
+        todo.extend((source, target, text) for text in missing)
+    if dry_run or not todo:
+        return totals
+
+    pending_rows = []
+    lock = threading.Lock()
+    started = time.perf_counter()
+
+    def flush(force: bool = False):
+        with lock:
+            if not pending_rows or (len(pending_rows) < batch_size and not force):
+                return
+            rows = pending_rows[:]
+            pending_rows.clear()
+        write_batch(rows)
+        print(f"✓ Cached {len(rows)} translations ({totals['translated']}/{len(todo)})")
+
+    def translate(item):
+        source, target, text = item
+        translation = backend.translate(text, source, target)
+        return {'source_lang': source, 'target_lang': target, 'text': text,
+                'translation': translation, 'backend': backend.name}
+
+    # Submit lazily so at most `concurrency` texts are in flight at once
+    items = iter(todo)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {pool.submit(translate, item): item for item in itertools.islice(items, concurrency)}
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                source, target, text = futures.pop(future)
+                try:
+                    row = future.result()
+                except Exception as e:
+                    totals['failed'] += 1
+                    print(f"✗ {source}->{target} '{text}': {str(e)}")
+                else:
+                    if row['translation']:
+                        with lock:
+                            pending_rows.append(row)
+                        totals['translated'] += 1
+                    else:
+                        totals['failed'] += 1
+                for item in itertools.islice(items, 1):
+                    futures[pool.submit(translate, item)] = item
+            flush()
+    flush(force=True)
+
+    elapsed = time.perf_counter() - started
+    rate = totals['translated'] / elapsed if elapsed > 0 else 0
+    print(f"{totals['translated']} translated in {elapsed:.2f}s ({rate:.1f}/s)")
+    return totals
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Prewarm the translation cache")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='google',
+                        help="Translation backend (default: google)")
+    parser.add_argument('--target', action='append', default=None,
+                        help="Target language, repeatable (default: en)")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Translations in flight at once (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Translations per cache write (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument('--no-reading-texts', action='store_true',
+                        help="Only use the lesson data files")
+    parser.add_argument('--dry-run', action='store_true', help="Count the texts to translate and stop")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    args.target = args.target or ['en']
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Placeholder translations must never reach the cache learners are served from
+    if args.backend == LocalBackend.name and not args.dry_run and not (project_url() or '').startswith('sqlite:'):
+        print("✗ The local backend only writes to the SQLite backend; set SUPABASE_SQLITE_DB or use --dry-run")
+        return 1
+    pairs = collect(args.target, include_reading=not args.no_reading_texts)
+    backend = BACKENDS[args.backend]()
+    try:
+        totals = prewarm(pairs, backend, args.concurrency, args.batch_size, args.dry_run)
+    finally:
+        backend.close()
+
+    print(f"\n{'✗' if totals['failed'] else '✓'} {totals['translated']} translated, "
+          f"{totals['cached']} already cached, {totals['failed']} failed")
+    return 1 if totals['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
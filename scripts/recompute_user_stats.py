@@ -0,0 +1,267 @@
+"""
+Recompute the XP and completed-lesson counts in user_profiles from
+user_lesson_progress.
+
+The `on_lesson_completed` trigger (003_create_lessons.sql) adds to these
+stats one progress row at a time and never subtracts, so reseeding lessons,
+backfilling progress or clearing user_lesson_progress leaves them wrong.
+This job rebuilds them in one pass instead:
+
+- progress rows are streamed in id order and joined to `lessons.xp_reward`
+  with a sorted lookup array;
+- completed lessons and XP are summed per user with numpy, a page at a time;
+- only profiles whose stats changed are written back, in batched upserts.
+
+A full rebuild covers every profile, so users without completed lessons go
+back to zero. `--incremental` only recomputes users with progress rows
+updated since the last run. The watermark (latest `updated_at` seen) is kept
+per Supabase project in scripts/.user_stats_watermark.json. Deleted progress
+rows leave no trace for the incremental mode; run a full rebuild after
+clearing tables.
+
+Usage:
+    python recompute_user_stats.py --dry-run
+    python recompute_user_stats.py --incremental
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from supabase_client import get_client, project_url
+
+WATERMARK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.user_stats_watermark.json')
+
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_BATCH_SIZE = 500
+# Users per in-list when fetching the rows of changed users
+USERS_PER_QUERY = 100
+
+PROGRESS_COLUMNS = 'id, user_id, lesson_id, status, updated_at'
+
+
+def iter_pages(table: str, columns: str, page_size: int = DEFAULT_PAGE_SIZE, where=None):
+    """Yield the rows of a table page by page, in id order; `where` adds filters to the query"""
+    after = None
+    while True:
+        query = get_client().table(table).select(columns).order('id').limit(page_size)
+        if where is not None:
+            query = where(query)
+        if after is not None:
+            query = query.gt('id', after)
+        rows = query.execute().data or []
+        if not rows:
+            return
+        yield rows
+        if len(rows) < page_size:
+            return
+        after = rows[-1]['id']
+
+
+def chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def later(first: str, second: str) -> str:
+    """The later of two timestamps as returned by PostgREST (either may be None)"""
+    if first is None or second is None:
+        return first or second
+    return first if datetime.fromisoformat(first) >= datetime.fromisoformat(second) else second
+
+
+class XpLookup:
+    """lessons.xp_reward by lesson id, as sorted arrays for vectorized lookups"""
+
+    def __init__(self, page_size: int = DEFAULT_PAGE_SIZE):
+        ids, rewards = [], []
+        for rows in iter_pages('lessons', 'id, xp_reward', page_size):
+            for row in rows:
+                ids.append(row['id'])
+                # The trigger adds NULL for a missing reward; count it as no XP
+                rewards.append(row['xp_reward'] or 0)
+        order = np.argsort(np.array(ids, dtype=str), kind='stable')
+        self.ids = np.array(ids, dtype=str)[order]
+        self.rewards = np.array(rewards, dtype=np.int64)[order]
+
+    def __call__(self, lesson_ids: np.ndarray) -> np.ndarray:
+        """XP for each lesson id; 0 for lessons that no longer exist"""
+        if not len(self.ids):
+            return np.zeros(len(lesson_ids), dtype=np.int64)
+        positions = np.searchsorted(self.ids, lesson_ids).clip(max=len(self.ids) - 1)
+        return np.where(self.ids[positions] == lesson_ids, self.rewards[positions], 0)
+
+
+def reduce_by_user(users: np.ndarray, lessons: np.ndarray, xp: np.ndarray) -> tuple:
+    """Sum lessons and XP per distinct user; returns (users, lessons, xp)"""
+    distinct, inverse = np.unique(users, return_inverse=True)
+    return (distinct,
+            np.bincount(inverse, weights=lessons, minlength=len(distinct)).astype(np.int64),
+            np.bincount(inverse, weights=xp, minlength=len(distinct)).astype(np.int64))
+
+
+class StatsAccumulator:
+    """
+    Completed lessons and XP per user.
+
+    Each page is reduced on its own to (user, lessons, xp) partial sums, and
+    the partial sums of all pages are grouped once in `totals()`, so the
+    work stays linear in the number of pages.
+    """
+
+    def __init__(self, xp_lookup: XpLookup):
+        self.xp_lookup = xp_lookup
+        self.partials = []
+        self.rows = 0
+        self.watermark = None
+
+    def add(self, rows: list):
+        """Fold a page of user_lesson_progress rows into the totals"""
+        self.rows += len(rows)
+        latest = max((row['updated_at'] for row in rows if row.get('updated_at')),
+                     key=datetime.fromisoformat, default=None)
+        self.watermark = later(self.watermark, latest)
+
+        completed = np.array([row['status'] == 'completed' for row in rows], dtype=bool)
+        if not completed.any():
+            return
+        users = np.array([row['user_id'] for row in rows], dtype=str)[completed]
+        xp = self.xp_lookup(np.array([row['lesson_id'] for row in rows], dtype=str)[completed])
+
+        self.partials.append(reduce_by_user(users, np.ones(len(users), dtype=np.int64), xp))
+
+    def totals(self) -> dict:
+        """{user_id: (lessons_completed, xp_points)}"""
+        if not self.partials:
+            return {}
+        users, lessons, xp = (np.concatenate(columns) for columns in zip(*self.partials))
+        users, lessons, xp = reduce_by_user(users, lessons, xp)
+        return {user: (int(lessons), int(xp)) for user, lessons, xp in zip(users, lessons, xp)}
+
+
+def load_watermark(path: str = WATERMARK_FILE) -> str:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f).get(project_url())
+
+
+def save_watermark(watermark: str, path: str = WATERMARK_FILE):
+    data = {}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    data[project_url()] = watermark
+    temporary = path + '.tmp'
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(temporary, path)
+
+
+def changed_users(watermark: str, page_size: int) -> tuple:
+    """Users with progress rows updated at or after the watermark, and the newest update seen"""
+    users = set()
+    latest = watermark
+    for rows in iter_pages('user_lesson_progress', 'id, user_id, updated_at', page_size,
+                           where=lambda query: query.gte('updated_at', watermark)):
+        users.update(row['user_id'] for row in rows)
+        for row in rows:
+            latest = later(latest, row.get('updated_at'))
+    return sorted(users), latest
+
+
+def corrections(totals: dict, profiles) -> tuple:
+    """Profile rows whose stats differ from the recomputed totals, and the number of profiles checked"""
+    rows = []
+    checked = 0
+    for page in profiles:
+        checked += len(page)
+        for profile in page:
+            lessons, xp = totals.get(profile['id'], (0, 0))
+            if profile.get('lessons_completed') != lessons or profile.get('xp_points') != xp:
+                # email is NOT NULL, so the upsert has to carry it
+                rows.append({'id': profile['id'], 'email': profile['email'],
+                             'lessons_completed': lessons, 'xp_points': xp})
+    return rows, checked
+
+
+def write_corrections(rows: list, batch_size: int = DEFAULT_BATCH_SIZE):
+    for batch in chunks(rows, batch_size):
+        get_client().table('user_profiles').upsert(batch, on_conflict='id', returning='minimal').execute()
+        print(f"✓ Updated {len(batch)} profiles")
+
+
+def recompute(incremental: bool = False, page_size: int = DEFAULT_PAGE_SIZE,
+              batch_size: int = DEFAULT_BATCH_SIZE, dry_run: bool = False) -> dict:
+    """
+    Recompute user stats and write the ones that changed.
+
+    Returns:
+        Dict with the number of progress rows read, profiles checked and
+        profiles corrected, and the new watermark
+    """
+    watermark = load_watermark() if incremental else None
+    if incremental and watermark is None:
+        print("No watermark recorded yet for this project, doing a full rebuild")
+        incremental = False
+
+    accumulator = StatsAccumulator(XpLookup(page_size))
+    profile_columns = 'id, email, xp_points, lessons_completed'
+
+    if incremental:
+        users, latest = changed_users(watermark, page_size)
+        print(f"  {len(users)} users with progress updated since {watermark}")
+        profiles = []
+        for group in chunks(users, USERS_PER_QUERY):
+            for rows in iter_pages('user_lesson_progress', PROGRESS_COLUMNS, page_size,
+                                   where=lambda query: query.in_('user_id', group)):
+                accumulator.add(rows)
+            profiles.extend(iter_pages('user_profiles', profile_columns, page_size,
+                                       where=lambda query: query.in_('id', group)))
+        accumulator.watermark = later(accumulator.watermark, latest)
+    else:
+        for rows in iter_pages('user_lesson_progress', PROGRESS_COLUMNS, page_size):
+            accumulator.add(rows)
+        profiles = iter_pages('user_profiles', profile_columns, page_size)
+
+    totals = accumulator.totals()
+    fixes, checked = corrections(totals, profiles)
+    print(f"  {accumulator.rows} progress rows, {len(totals)} users with completed lessons, "
+          f"{checked} profiles checked, {len(fixes)} out of date")
+
+    if not dry_run:
+        write_corrections(fixes, batch_size)
+        if accumulator.watermark is not None:
+            save_watermark(accumulator.watermark)
+    return {'rows': accumulator.rows, 'profiles': checked,
+            'corrected': len(fixes), 'watermark': accumulator.watermark}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Recompute user XP and completed lessons from lesson progress")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only recompute users with progress updated since the last run")
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f"Rows per select (default: {DEFAULT_PAGE_SIZE})")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Profiles per upsert (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument('--dry-run', action='store_true', help="Report what would change without writing")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    started = time.perf_counter()
+    result = recompute(args.incremental, args.page_size, args.batch_size, args.dry_run)
+    elapsed = time.perf_counter() - started
+    action = "would be corrected" if args.dry_run else "corrected"
+    print(f"\n✓ {result['corrected']} of {result['profiles']} profiles {action} in {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+Script to delete the rows of a Supabase table that match column filters
+
+Matching ids are resolved first, page by page in id order, using the
+filters given on the command line (and optionally a file of key values).
+They are then deleted in batched `IN` requests with a bounded number of
+requests in flight.
+
+Usage:
+    python remove_matching.py lessons --eq course_id=<uuid> --gt lesson_number=10
+    python remove_matching.py user_vocabulary --eq language_code=de --keys-file users.txt --key-column user_id
+    python remove_matching.py lessons --eq course_id=<uuid> --dry-run
+"""
+import argparse
+import sys
+import time
+
+from cleartable import delete_ids
+from supabase_client import get_client
+
+# Number of ids per delete request; keeps the IN list well under URL limits
+DEFAULT_BATCH_SIZE = 200
+
+# Number of key values per lookup request when a keys file is given
+KEYS_PER_LOOKUP = 200
+
+# Filter operators accepted on the command line, as PostgREST builder methods
+OPERATORS = ['eq', 'neq', 'gt', 'gte', 'lt', 'lte']
+
+# Indexed columns per table, from supabase/migrations. Filtering on one of
+# these lets the id lookup use an index instead of scanning the table.
+INDEXED_COLUMNS = {
+    'language_courses': ['id', 'language_code', 'is_active'],
+    'lessons': ['id', 'course_id', 'lesson_number', 'is_published'],
+    'user_profiles': ['id', 'learning_language'],
+    'user_lesson_progress': ['id', 'user_id', 'lesson_id', 'status'],
+    'reading_texts': ['id', 'language_code', 'difficulty', 'is_published'],
+    'user_reading_progress': ['id', 'user_id', 'text_id'],
+    'user_vocabulary': ['id', 'user_id', 'language_code'],
+}
+
+def apply_filters(query, filters: list):
+    """Apply (operator, column, value) filters to a query builder"""
+    for operator, column, value in filters:
+        query = getattr(query, operator)(column, value)
+    return query
+
+def resolve_ids(table_name: str, filters: list, keys: list = None, key_column: str = None,
+                page_size: int = 1000):
+    """
+    Yield pages of ids for the rows matching the filters.
+
+    Pages are fetched in id order, each starting after the last id of the
+    previous page. With `keys`, only rows whose `key_column` is one of the
+    keys are matched; the keys are looked up a chunk at a time.
+    """
+    key_chunks = [None]
+    if keys is not None:
+        key_chunks = [keys[i:i + KEYS_PER_LOOKUP] for i in range(0, len(keys), KEYS_PER_LOOKUP)]
+
+    for key_chunk in key_chunks:
+        after = None
+        while True:
+            query = apply_filters(get_client().table(table_name).select('id'), filters)
+            if key_chunk is not None:
+                query = query.in_(key_column, key_chunk)
+            if after is not None:
+                query = query.gt('id', after)
+            ids = [row['id'] for row in query.order('id').limit(page_size).execute().data or []]
+            if ids:
+                yield ids
+            if len(ids) < page_size:
+                break
+            after = ids[-1]
+
+def count_matching(table_name: str, filters: list, keys: list = None, key_column: str = None):
+    """Return the number of rows matching the filters without deleting anything"""
+    if keys is None:
+        query = apply_filters(get_client().table(table_name).select('id', count='exact'), filters)
+        return query.limit(1).execute().count or 0
+    return sum(len(ids) for ids in resolve_ids(table_name, filters, keys, key_column))
+
+def delete_matching(table_name: str, filters: list, keys: list = None, key_column: str = None,
+                    batch_size: int = DEFAULT_BATCH_SIZE, concurrency: int = 4):
+    """
+    Delete all rows matching the filters
+
+    Returns:
+        Tuple of (number of rows deleted, list of errors)
+    """
+    # Imported here so that `--help` starts quickly
+    from concurrent.futures import ThreadPoolExecutor
+
+    deleted = 0
+    errors = []
+    started = time.perf_counter()
+
+    def delete_batch(ids):
+        delete_ids(table_name, ids)
+        return len(ids)
+
+    # All ids are resolved before deleting, so deletes cannot shift the pages being read
+    ids = [row_id for page in resolve_ids(table_name, filters, keys, key_column) for row_id in page]
+    batches = [ids[i:i + batch_size] for i in range(0, len(ids), batch_size)]
+    print(f"Resolved {len(ids)} matching rows in {table_name}, deleting in {len(batches)} batches")
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for batch, future in [(batch, pool.submit(delete_batch, batch)) for batch in batches]:
+            try:
+                deleted += future.result()
+                print(f"  {table_name}: {deleted}/{len(ids)} rows deleted")
+            except Exception as e:
+                errors.append(str(e))
+                print(f"✗ Error deleting a batch of {len(batch)} rows from {table_name}: {str(e)}")
+
+    elapsed = time.perf_counter() - started
+    rate = deleted / elapsed if elapsed > 0 else 0
+    summary = f"{deleted} rows from {table_name} in {elapsed:.2f}s ({rate:.0f} rows/s)"
+    if errors:
+        print(f"✗ Deleted {summary}, {len(errors)} of {len(batches)} batches failed")
+    else:
+        print(f"✓ Deleted {summary}")
+    return deleted, errors
+
+def read_keys(path: str):
+    """Read one key value per line, skipping blank lines and duplicates"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return list(dict.fromkeys(line.strip() for line in f if line.strip()))
+
+def parse_filter(operator: str):
+    def parse(text: str):
+        column, sep, value = text.partition('=')
+        if not sep or not column:
+            raise argparse.ArgumentTypeError(f"expected COLUMN=VALUE, got '{text}'")
+        return operator, column.strip(), value
+    return parse
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Delete the rows of a table that match column filters")
+    parser.add_argument('table', help="Table to delete from")
+    for operator in OPERATORS:
+        parser.add_argument(f'--{operator}', dest='filters', action='append', default=[],
+                            type=parse_filter(operator), metavar='COLUMN=VALUE',
+                            help=f"Match rows where COLUMN {operator} VALUE (repeatable)")
+    parser.add_argument('--keys-file', help="File with one key value per line")
+    parser.add_argument('--key-column', help="Column the values in --keys-file are matched against")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Ids per delete request (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help="Delete requests in flight at the same time (default: 4)")
+    parser.add_argument('--dry-run', action='store_true', help="Only count the matching rows")
+    parser.add_argument('--yes', action='store_true', help="Skip the confirmation prompt")
+    args = parser.parse_args(argv)
+    if bool(args.keys_file) != bool(args.key_column):
+        parser.error("--keys-file and --key-column must be used together")
+    if not args.filters and not args.keys_file:
+        parser.error("refusing to match every row; give at least one filter or a keys file "
+                     "(use cleartable.py to clear a whole table)")
+    if args.batch_size < 1 or args.concurrency < 1:
+        parser.error("--batch-size and --concurrency must be at least 1")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    keys = read_keys(args.keys_file) if args.keys_file else None
+
+    columns = {column for _, column, _ in args.filters} | ({args.key_column} if keys else set())
+    indexed = set(INDEXED_COLUMNS.get(args.table, ['id']))
+    if not columns & indexed:
+        print(f"Warning: none of {', '.join(sorted(columns))} is indexed on {args.table}; "
+              f"the lookup will scan the table")
+
+    description = ', '.join(f"{column} {operator} {value}" for operator, column, value in args.filters)
+    if keys is not None:
+        description = ', '.join(filter(None, [description, f"{args.key_column} in {len(keys)} keys"]))
+    matching = count_matching(args.table, args.filters, keys, args.key_column)
+    print(f"{matching} rows in {args.table} match: {description}")
+
+    if args.dry_run or matching == 0:
+        return 0
+
+    # Confirmation prompt
+    if not args.yes:
+        confirmation = input(f"Delete these {matching} rows? (yes/no): ")
+        if confirmation.lower() != "yes":
+            print("Operation cancelled.")
+            return 0
+
+    _, errors = delete_matching(args.table, args.filters, keys, args.key_column, args.batch_size, args.concurrency)
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+Nightly spaced-repetition scheduler for user_vocabulary.
+
+Each word gets an SM-2 schedule: an ease factor, the number of successful
+reviews in a row and the interval until the next review. Learning a word
+counts as its first review, and every flashcard review on the vocabulary page
+is a successful one (the page does not grade answers, so all reviews use
+REVIEW_QUALITY). See supabase/migrations/011_add_vocabulary_review_schedule.sql.
+
+The vocabulary page applies the same step when a flashcard is reviewed
+(src/lib/review-schedule.ts), so this job only has words left to schedule
+that were learned but not reviewed yet, reset, or reviewed some other way.
+Run it nightly, for example from cron:
+
+    0 3 * * * cd /path/to/app && python scripts/schedule_reviews.py
+
+The whole table is streamed in id order one page at a time, so memory stays
+bounded however many rows there are. For each page the reviews done since the
+last run (times_reviewed - scheduled_reviews) are replayed on numpy arrays,
+and only the rows whose schedule changed are written back in batched upserts.
+
+`due_now()` returns the words due for one user from the
+(user_id, language_code, next_review_at) index.
+
+Usage:
+    python schedule_reviews.py
+    python schedule_reviews.py --rebuild --dry-run
+    python schedule_reviews.py --due USER_ID --language zh
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from supabase_client import get_client
+
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_BATCH_SIZE = 500
+PROGRESS_EVERY = 10000
+
+# SM-2 parameters
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+REVIEW_QUALITY = 4  # 0-5; 3 and above is a successful review
+FIRST_INTERVAL_DAYS = 1
+SECOND_INTERVAL_DAYS = 6
+MAX_INTERVAL_DAYS = 365
+
+VOCABULARY_COLUMNS = ('id, user_id, word, language_code, learned_at, times_reviewed, last_reviewed_at, '
+                      'ease_factor, interval_days, repetitions, scheduled_reviews, next_review_at')
+
+# Upper bounds (in days from now) of the due-date summary buckets
+DUE_BUCKETS = [('due now', 0), ('tomorrow', 1), ('this week', 7), ('this month', 30), ('later', float('inf'))]
+
+
+def iter_pages(page_size: int = DEFAULT_PAGE_SIZE):
+    """Yield user_vocabulary page by page, in id order"""
+    after = None
+    while True:
+        query = get_client().table('user_vocabulary').select(VOCABULARY_COLUMNS).order('id').limit(page_size)
+        if after is not None:
+            query = query.gt('id', after)
+        rows = query.execute().data or []
+        if not rows:
+            return
+        yield rows
+        if len(rows) < page_size:
+            return
+        after = rows[-1]['id']
+
+
+def epoch(value: str, default: float) -> float:
+    return datetime.fromisoformat(value).timestamp() if value else default
+
+
+def ease_change(quality: int) -> float:
+    return 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+
+
+def replay(repetitions, ease, interval, reviews, quality: int = REVIEW_QUALITY):
+    """
+    Apply `reviews[i]` successful SM-2 reviews to word i, for all words at once.
+
+    Returns:
+        New (repetitions, ease, interval) arrays
+    """
+    repetitions, ease, interval, reviews = repetitions.copy(), ease.copy(), interval.copy(), reviews.copy()
+    while True:
+        active = reviews > 0
+        if not active.any():
+            return repetitions, ease, interval
+        grown = np.minimum(MAX_INTERVAL_DAYS, np.rint(interval * ease)).astype(np.int64)
+        interval = np.where(active & (repetitions == 0), FIRST_INTERVAL_DAYS,
+                   np.where(active & (repetitions == 1), SECOND_INTERVAL_DAYS,
+                   np.where(active, grown, interval)))
+        ease = np.where(active, np.maximum(MIN_EASE, ease + ease_change(quality)), ease)
+        repetitions += active
+        reviews -= active
+
+
+def schedule_page(rows: list, now: float, rebuild: bool = False) -> tuple:
+    """
+    Compute the schedule of a page of rows.
+
+    Returns:
+        (rows to upsert, next review time of every row as epoch seconds)
+    """
+    times_reviewed = np.array([row.get('times_reviewed') or 0 for row in rows], dtype=np.int64)
+    previously_scheduled = np.array([row.get('scheduled_reviews') or 0 for row in rows], dtype=np.int64)
+    repetitions = np.array([row.get('repetitions') or 0 for row in rows], dtype=np.int64)
+    ease = np.array([row.get('ease_factor') or INITIAL_EASE for row in rows], dtype=np.float64)
+    interval = np.array([row.get('interval_days') or 0 for row in rows], dtype=np.int64)
+    unscheduled = np.array([row.get('next_review_at') is None for row in rows], dtype=bool)
+    # Reviews are counted from the last flashcard review, or from learning the word
+    reviewed_at = np.array([epoch(row.get('last_reviewed_at') or row.get('learned_at'), now) for row in rows])
+
+    # Start over when asked to, or when times_reviewed went down (the word was reset)
+    fresh = (previously_scheduled > times_reviewed) | rebuild
+    scheduled = previously_scheduled.copy()
+    repetitions[fresh], ease[fresh], interval[fresh], scheduled[fresh] = 0, INITIAL_EASE, 0, 0
+
+    repetitions, ease, interval = replay(repetitions, ease, interval, times_reviewed - scheduled)
+    due = reviewed_at + interval * 86400.0
+
+    changed = (times_reviewed != previously_scheduled) | unscheduled | rebuild
+    updates = []
+    for i in np.flatnonzero(changed):
+        row = rows[i]
+        updates.append({
+            # user_id, word and language_code are NOT NULL, so the upsert has to carry them
+            'id': row['id'], 'user_id': row['user_id'], 'word': row['word'], 'language_code': row['language_code'],
+            'ease_factor': round(float(ease[i]), 2),
+            'interval_days': int(interval[i]),
+            'repetitions': int(repetitions[i]),
+            'scheduled_reviews': int(times_reviewed[i]),
+            'next_review_at': datetime.fromtimestamp(due[i], timezone.utc).isoformat(),
+        })
+    return updates, due
+
+
+def write_schedules(rows: list, batch_size: int = DEFAULT_BATCH_SIZE):
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        get_client().table('user_vocabulary').upsert(batch, on_conflict='id', returning='minimal').execute()
+
+
+def schedule_all(page_size: int = DEFAULT_PAGE_SIZE, batch_size: int = DEFAULT_BATCH_SIZE,
+                 rebuild: bool = False, dry_run: bool = False) -> dict:
+    """
+    Reschedule every word whose review count changed (or every word with `rebuild`).
+
+    Returns:
+        Dict with the rows read and rescheduled, and the number of words per DUE_BUCKETS label
+    """
+    now = time.time()
+    bounds = np.array([now + days * 86400.0 for _, days in DUE_BUCKETS[:-1]])
+    buckets = np.zeros(len(DUE_BUCKETS), dtype=np.int64)
+    totals = {'rows': 0, 'rescheduled': 0}
+    for rows in iter_pages(page_size):
+        updates, due = schedule_page(rows, now, rebuild)
+        if updates and not dry_run:
+            write_schedules(updates, batch_size)
+        totals['rows'] += len(rows)
+        totals['rescheduled'] += len(updates)
+        buckets += np.bincount(np.searchsorted(bounds, due), minlength=len(DUE_BUCKETS))
+        if totals['rows'] % PROGRESS_EVERY < len(rows):
+            print(f"✓ {totals['rows']} words read, {totals['rescheduled']} rescheduled")
+    totals['due'] = {label: int(count) for (label, _), count in zip(DUE_BUCKETS, buckets)}
+    return totals
+
+
+def due_now(user_id: str, language_code: str, limit: int = 50, now: datetime = None) -> list:
+    """Words due for review for one user, never-scheduled words first, then the most overdue"""
+    now = (now or datetime.now(timezone.utc)).isoformat()
+
+    def base():
+        return (get_client().table('user_vocabulary').select(VOCABULARY_COLUMNS)
+                .eq('user_id', user_id).eq('language_code', language_code))
+
+    words = base().is_('next_review_at', 'null').order('learned_at').limit(limit).execute().data or []
+    if len(words) < limit:
+        words += (base().lte('next_review_at', now).order('next_review_at')
+                  .limit(limit - len(words)).execute().data or [])
+    return words
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compute spaced-repetition schedules for user vocabulary")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="Recompute every schedule from scratch, not only words reviewed since the last run")
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f"Rows per select (default: {DEFAULT_PAGE_SIZE})")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Rows per upsert (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument('--dry-run', action='store_true', help="Compute schedules without writing them")
+    parser.add_argument('--due', metavar='USER_ID', help="Only list the words due now for this user")
+    parser.add_argument('--language', help="Language code for --due")
+    parser.add_argument('--limit', type=int, default=50, help="Words to list with --due (default: 50)")
+    args = parser.parse_args(argv)
+    if args.due and not args.language:
+        parser.error("--due needs --language")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.due:
+        words = due_now(args.due, args.language, args.limit)
+        for word in words:
+            print(f"  {word['word']}: due {word.get('next_review_at') or 'now (not scheduled yet)'}")
+        print(f"\n✓ {len(words)} words due")
+        return 0
+
+    started = time.perf_counter()
+    totals = schedule_all(args.page_size, args.batch_size, args.rebuild, args.dry_run)
+    elapsed = time.perf_counter() - started
+    rate = totals['rows'] / elapsed if elapsed > 0 else 0
+    print("\nNext reviews:")
+    for label, count in totals['due'].items():
+        print(f"  {label:<11} {count}")
+    action = "would be rescheduled" if args.dry_run else "rescheduled"
+    print(f"\n✓ {totals['rescheduled']} of {totals['rows']} words {action} in {elapsed:.2f}s ({rate:.0f} rows/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Content hashes for incremental lesson seeding.
+
+Each seeded lesson is recorded in a local manifest together with a stable
+hash of its data-file entry and of each of its activities. On the next run
+only lessons whose hash changed (or that were added or removed) need to be
+sent to Supabase.
+"""
+import hashlib
+import json
+import os
+import threading
+
+MANIFEST_FILENAME = '.seed_manifest.json'
+MANIFEST_VERSION = 1
+
+
+def stable_hash(value) -> str:
+    """Hash a JSON-compatible value independently of key order and whitespace"""
+    encoded = json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:16]
+
+
+def hash_lesson(lesson_data: dict) -> dict:
+    """Return the manifest entry for one lesson of a data file"""
+    return {
+        'title': lesson_data.get('title'),
+        'hash': stable_hash(lesson_data),
+        'activities': [stable_hash(activity) for activity in lesson_data.get('activities', [])],
+    }
+
+
+def default_manifest_path() -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), MANIFEST_FILENAME)
+
+
+class SeedManifest:
+    """
+    Hashes of the lessons last written to each Supabase project.
+
+    The manifest is keyed by project URL so seeding staging and production
+    from the same checkout does not mix their state.
+    """
+
+    def __init__(self, path: str, project: str):
+        self.path = path
+        self.project = project or 'default'
+        self._lock = threading.Lock()
+        self._data = {'version': MANIFEST_VERSION, 'projects': {}}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                self._data = data
+
+    def lessons(self, language_code: str, course_id: str) -> dict:
+        """Return {lesson_number: entry} recorded for a course, or {} if unknown"""
+        with self._lock:
+            course = self._data['projects'].get(self.project, {}).get(language_code)
+        if not course or course.get('course_id') != course_id:
+            return {}
+        return {int(number): entry for number, entry in course['lessons'].items()}
+
+    def record(self, language_code: str, course_id: str, lessons: dict):
+        """Replace the recorded lessons of a course with {lesson_number: entry}"""
+        with self._lock:
+            project = self._data['projects'].setdefault(self.project, {})
+            project[language_code] = {
+                'course_id': course_id,
+                'lessons': {str(number): entry for number, entry in sorted(lessons.items())},
+            }
+
+    def save(self):
+        with self._lock:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+
+
+def diff_lessons(previous: dict, current: dict) -> dict:
+    """
+    Compare two {lesson_number: entry} mappings.
+
+    Returns:
+        Dict with sorted lesson-number lists under 'added', 'changed',
+        'removed' and 'unchanged', plus 'activities' mapping each changed
+        lesson number to the 1-based positions of its changed activities
+    """
+    added = sorted(set(current) - set(previous))
+    removed = sorted(set(previous) - set(current))
+    changed = []
+    unchanged = []
+    activities = {}
+
+    for number in sorted(set(current) & set(previous)):
+        old, new = previous[number], current[number]
+        if old['hash'] == new['hash']:
+            unchanged.append(number)
+            continue
+        changed.append(number)
+        old_activities, new_activities = old['activities'], new['activities']
+        activities[number] = [
+            position for position in range(1, max(len(old_activities), len(new_activities)) + 1)
+            if old_activities[position - 1:position] != new_activities[position - 1:position]
+        ]
+
+    return {
+        'added': added,
+        'changed': changed,
+        'removed': removed,
+        'unchanged': unchanged,
+        'activities': activities,
+    }
+
+
+def format_diff(language_name: str, diff: dict) -> str:
+    """Render a one-language diff summary for the console"""
+    lines = [
+        f"{language_name}: {len(diff['added'])} added, {len(diff['changed'])} changed, "
+        f"{len(diff['removed'])} removed, {len(diff['unchanged'])} unchanged"
+    ]
+    for number in diff['added']:
+        lines.append(f"  + Lesson {number}")
+    for number in diff['changed']:
+        positions = ', '.join(str(position) for position in diff['activities'][number])
+        detail = f" (activities {positions})" if positions else " (lesson fields)"
+        lines.append(f"  ~ Lesson {number}{detail}")
+    for number in diff['removed']:
+        lines.append(f"  - Lesson {number}")
+    return '\n'.join(lines)
@@ -0,0 +1,433 @@
+"""
+Back up and restore the app tables as compressed NDJSON shards.
+
+Export pages through each table in id order (keyset pagination) and writes
+the rows to gzip-compressed NDJSON shards of a fixed number of rows, so
+memory use does not grow with the table. Tables are exported in parallel.
+`manifest.json` records every finished shard with its row count, id range
+and sha256, which lets an interrupted export continue after the last
+finished shard.
+
+Import checks each shard against the manifest and streams it back through
+batched upserts on `id`, parents before children (see cleartable.py).
+Finished shards are recorded in `import_progress.json`, so an interrupted
+import resumes too. Afterwards the row counts and id checksums of the
+restored tables are compared with the snapshot.
+
+The export is not a point-in-time copy: rows written while it runs may or
+may not be included. `user_profiles` and `user_vocabulary` reference
+auth.users, so they can only be restored into a project that has the same
+users.
+
+Usage:
+    python snapshot.py export backups/2025-01-01
+    python snapshot.py import backups/2025-01-01 --tables lessons user_lesson_progress
+    python snapshot.py verify backups/2025-01-01
+"""
+import argparse
+import gzip
+import hashlib
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cleartable import TABLE_DEPENDENCIES, clear_order
+from supabase_client import get_client, project_url
+
+MANIFEST_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+PROGRESS_FILE = 'import_progress.json'
+
+# Rows per request when reading; Supabase returns at most 1000 rows by default
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_SHARD_ROWS = 50000
+DEFAULT_BATCH_SIZE = 500
+
+# Triggers that change other tables while a table is restored. Restoring
+# user_lesson_progress adds XP and completed lessons to user_profiles through
+# update_user_stats_on_lesson_completion, so the profiles are restored again
+# afterwards to put back the snapshot values.
+TRIGGER_SIDE_EFFECTS = {
+    'user_lesson_progress': ['user_profiles'],
+}
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def table_digest(shards: list) -> str:
+    """Checksum of a whole table, combined from the id checksums of its shards"""
+    return hashlib.sha256(''.join(shard['ids_sha256'] for shard in shards).encode('ascii')).hexdigest()
+
+
+def iter_pages(table: str, page_size: int, after=None, columns: str = '*'):
+    """Yield the rows of a table page by page, in id order, starting after `after`"""
+    while True:
+        query = get_client().table(table).select(columns).order('id').limit(page_size)
+        if after is not None:
+            query = query.gt('id', after)
+        rows = query.execute().data or []
+        if not rows:
+            return
+        yield rows
+        if len(rows) < page_size:
+            return
+        after = rows[-1]['id']
+
+
+class Snapshot:
+    """A snapshot directory and its manifest"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, MANIFEST_FILE)
+        # Held while the manifest is changed or written, as tables export in parallel
+        self.lock = threading.Lock()
+        self.data = {'version': MANIFEST_VERSION, 'project': None, 'tables': {}}
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != MANIFEST_VERSION:
+                raise ValueError(f"{self.path} has unsupported version {data.get('version')}")
+            self.data = data
+
+    def table(self, name: str) -> dict:
+        with self.lock:
+            return self.data['tables'].setdefault(name, {'complete': False, 'rows': 0, 'shards': []})
+
+    def shard_path(self, shard: dict) -> str:
+        return os.path.join(self.directory, shard['file'])
+
+    def save(self):
+        with self.lock:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+
+def valid_shards(snapshot: Snapshot, entry: dict) -> list:
+    """The leading shards of a table whose files still match the manifest"""
+    shards = []
+    for shard in entry['shards']:
+        path = snapshot.shard_path(shard)
+        if not os.path.exists(path) or file_sha256(path) != shard['sha256']:
+            break
+        shards.append(shard)
+    return shards
+
+
+def export_table(snapshot: Snapshot, table: str, page_size: int, shard_rows: int) -> int:
+    """Export one table, continuing after the last finished shard. Returns the rows written."""
+    entry = snapshot.table(table)
+    if entry['complete']:
+        print(f"  {table}: already exported ({entry['rows']} rows)")
+        return 0
+
+    shards = valid_shards(snapshot, entry)
+    with snapshot.lock:
+        entry['shards'] = shards
+        entry['rows'] = sum(shard['rows'] for shard in shards)
+    after = shards[-1]['last_id'] if shards else None
+    if shards:
+        print(f"  {table}: resuming after {len(shards)} shards")
+    os.makedirs(os.path.join(snapshot.directory, table), exist_ok=True)
+
+    written = 0
+    started = time.perf_counter()
+    writer = None
+
+    def finish_shard():
+        writer['file'].close()
+        os.replace(writer['tmp_path'], writer['path'])
+        shard = {
+            'file': os.path.relpath(writer['path'], snapshot.directory),
+            'rows': writer['rows'],
+            'first_id': writer['first_id'],
+            'last_id': writer['last_id'],
+            'sha256': file_sha256(writer['path']),
+            'ids_sha256': writer['ids'].hexdigest(),
+        }
+        with snapshot.lock:
+            shards.append(shard)
+            entry['rows'] += shard['rows']
+        snapshot.save()
+
+    for page in iter_pages(table, page_size, after):
+        for row in page:
+            if writer is None:
+                path = os.path.join(snapshot.directory, table, f"{table}.{len(shards) + 1:05d}.ndjson.gz")
+                writer = {
+                    'path': path,
+                    'tmp_path': path + '.partial',
+                    'file': gzip.open(path + '.partial', 'wt', encoding='utf-8'),
+                    'rows': 0,
+                    'first_id': row['id'],
+                    'ids': hashlib.sha256(),
+                }
+            writer['file'].write(json.dumps(row, ensure_ascii=False, separators=(',', ':')) + '\n')
+            writer['ids'].update(str(row['id']).encode('utf-8') + b'\n')
+            writer['rows'] += 1
+            writer['last_id'] = row['id']
+            written += 1
+            if writer['rows'] >= shard_rows:
+                finish_shard()
+                writer = None
+    if writer is not None:
+        finish_shard()
+
+    with snapshot.lock:
+        entry['complete'] = True
+        entry['ids_sha256'] = table_digest(shards)
+    snapshot.save()
+    elapsed = time.perf_counter() - started
+    rate = written / elapsed if elapsed > 0 else 0
+    print(f"✓ {table}: {entry['rows']} rows in {len(shards)} shards ({rate:.0f} rows/s)")
+    return written
+
+
+def export_snapshot(directory: str, tables: list, page_size: int = DEFAULT_PAGE_SIZE,
+                    shard_rows: int = DEFAULT_SHARD_ROWS, workers: int = 4) -> dict:
+    """Export several tables in parallel. Returns {table: rows written by this run}."""
+    os.makedirs(directory, exist_ok=True)
+    snapshot = Snapshot(directory)
+    project = project_url()
+    if snapshot.data['project'] not in (None, project):
+        raise ValueError(f"{directory} holds a snapshot of {snapshot.data['project']}, not {project}")
+    snapshot.data['project'] = project
+    snapshot.data.setdefault('created_at', time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()))
+    snapshot.save()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {table: pool.submit(export_table, snapshot, table, page_size, shard_rows) for table in tables}
+        return {table: future.result() for table, future in futures.items()}
+
+
+def iter_shard_rows(path: str):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class ImportProgress:
+    """Shards already restored into a project, kept next to the snapshot"""
+
+    def __init__(self, directory: str, project: str):
+        self.path = os.path.join(directory, PROGRESS_FILE)
+        self.project = project
+        self._lock = threading.Lock()
+        self.data = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+
+    def done(self, table: str) -> set:
+        with self._lock:
+            return set(self.data.get(self.project, {}).get(table, []))
+
+    def _save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def mark(self, table: str, shard_file: str):
+        with self._lock:
+            self.data.setdefault(self.project, {}).setdefault(table, []).append(shard_file)
+            self._save()
+
+    def reset(self, table: str):
+        with self._lock:
+            self.data.get(self.project, {}).pop(table, None)
+            self._save()
+
+    def finish(self):
+        """Forget the project once its import is complete, so the next import starts over"""
+        with self._lock:
+            self.data.pop(self.project, None)
+            self._save()
+
+
+def upsert_rows(table: str, rows: list):
+    get_client().table(table).upsert(rows, on_conflict='id', returning='minimal').execute()
+
+
+def import_table(snapshot: Snapshot, progress: ImportProgress, table: str, batch_size: int) -> int:
+    """Restore one table from its shards, skipping shards restored by an earlier run"""
+    entry = snapshot.data['tables'].get(table)
+    if not entry or not entry['complete']:
+        raise ValueError(f"Snapshot has no complete export of {table}")
+
+    done = progress.done(table)
+    restored = 0
+    started = time.perf_counter()
+    for shard in entry['shards']:
+        if shard['file'] in done:
+            continue
+        path = snapshot.shard_path(shard)
+        if file_sha256(path) != shard['sha256']:
+            raise ValueError(f"{shard['file']} does not match its checksum in the manifest")
+        batch = []
+        for row in iter_shard_rows(path):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                upsert_rows(table, batch)
+                restored += len(batch)
+                batch = []
+        if batch:
+            upsert_rows(table, batch)
+            restored += len(batch)
+        progress.mark(table, shard['file'])
+
+    elapsed = time.perf_counter() - started
+    rate = restored / elapsed if elapsed > 0 else 0
+    print(f"✓ {table}: {restored} rows restored ({rate:.0f} rows/s)")
+    return restored
+
+
+def import_snapshot(directory: str, tables: list, batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 4) -> dict:
+    """Restore tables in foreign-key order, tables of the same stage in parallel"""
+    snapshot = Snapshot(directory)
+    progress = ImportProgress(directory, project_url())
+    restored = {}
+    for stage in reversed(clear_order(tables)):
+        with ThreadPoolExecutor(max_workers=min(workers, len(stage))) as pool:
+            futures = {table: pool.submit(import_table, snapshot, progress, table, batch_size) for table in stage}
+            for table, future in futures.items():
+                restored[table] = future.result()
+        for table in stage:
+            for affected in TRIGGER_SIDE_EFFECTS.get(table, []):
+                if affected in tables:
+                    print(f"  Restoring {affected} again to undo triggers fired by {table}")
+                    progress.reset(affected)
+                    import_table(snapshot, progress, affected, batch_size)
+    progress.finish()
+    return restored
+
+
+def verify_table(snapshot: Snapshot, table: str, page_size: int = DEFAULT_PAGE_SIZE) -> list:
+    """
+    Compare a table in the database with the snapshot.
+
+    Shard files are checked against their sha256, then the table's ids are
+    streamed from the database and hashed with the same shard boundaries.
+
+    Returns:
+        List of problems, empty when the table matches
+    """
+    entry = snapshot.data['tables'].get(table)
+    if not entry or not entry['complete']:
+        return [f"{table}: no complete export in the snapshot"]
+
+    problems = []
+    for shard in entry['shards']:
+        path = snapshot.shard_path(shard)
+        if not os.path.exists(path):
+            problems.append(f"{table}: missing shard {shard['file']}")
+        elif file_sha256(path) != shard['sha256']:
+            problems.append(f"{table}: {shard['file']} does not match its checksum")
+
+    def database_ids():
+        for page in iter_pages(table, page_size, columns='id'):
+            for row in page:
+                yield row['id']
+
+    ids = database_ids()
+    count = 0
+    for shard in entry['shards']:
+        digest = hashlib.sha256()
+        for row_id in itertools.islice(ids, shard['rows']):
+            digest.update(str(row_id).encode('utf-8') + b'\n')
+            count += 1
+        if digest.hexdigest() != shard['ids_sha256']:
+            problems.append(f"{table}: ids in {shard['file']} differ from the database")
+            break
+    count += sum(1 for _ in ids)
+    if count != entry['rows']:
+        problems.append(f"{table}: {count} rows in the database, {entry['rows']} in the snapshot")
+    return problems
+
+
+def verify_snapshot(directory: str, tables: list) -> dict:
+    snapshot = Snapshot(directory)
+    return {table: verify_table(snapshot, table) for table in tables}
+
+
+def print_verification(results: dict) -> bool:
+    ok = True
+    for table, problems in results.items():
+        if problems:
+            ok = False
+            for problem in problems:
+                print(f"✗ {problem}")
+        else:
+            print(f"✓ {table}: row count and ids match the snapshot")
+    return ok
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Export, restore and verify snapshots of the app tables")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export = subparsers.add_parser('export', help="Write a snapshot of the tables")
+    export.add_argument('directory', help="Snapshot directory (an existing one is resumed)")
+    export.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f"Rows read per request (default: {DEFAULT_PAGE_SIZE})")
+    export.add_argument('--shard-rows', type=int, default=DEFAULT_SHARD_ROWS,
+                        help=f"Rows per shard file (default: {DEFAULT_SHARD_ROWS})")
+
+    restore = subparsers.add_parser('import', help="Restore tables from a snapshot")
+    restore.add_argument('directory', help="Snapshot directory")
+    restore.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                         help=f"Rows per upsert request (default: {DEFAULT_BATCH_SIZE})")
+    restore.add_argument('--no-verify', action='store_true', help="Skip the comparison after restoring")
+    restore.add_argument('--yes', action='store_true', help="Skip the confirmation prompt")
+
+    verify = subparsers.add_parser('verify', help="Compare the database with a snapshot")
+    verify.add_argument('directory', help="Snapshot directory")
+
+    for subparser in (export, restore, verify):
+        subparser.add_argument('--tables', nargs='+', default=list(TABLE_DEPENDENCIES),
+                               choices=list(TABLE_DEPENDENCIES), help="Tables to include (default: all)")
+    for subparser in (export, restore):
+        subparser.add_argument('--workers', type=int, default=4,
+                               help="Tables processed at the same time (default: 4)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    started = time.perf_counter()
+
+    if args.command == 'export':
+        print(f"Exporting {', '.join(args.tables)} to {args.directory}")
+        written = export_snapshot(args.directory, args.tables, args.page_size, args.shard_rows, args.workers)
+        print(f"\n✓ Snapshot written ({sum(written.values())} rows in {time.perf_counter() - started:.2f}s)")
+        return 0
+
+    if args.command == 'import':
+        if not args.yes:
+            print(f"⚠️  WARNING: This will upsert the snapshot rows into: {', '.join(args.tables)}")
+            confirmation = input("Are you sure you want to continue? (yes/no): ")
+            if confirmation.lower() != "yes":
+                print("Operation cancelled.")
+                return 0
+        restored = import_snapshot(args.directory, args.tables, args.batch_size, args.workers)
+        print(f"\n✓ Restored {sum(restored.values())} rows in {time.perf_counter() - started:.2f}s")
+        if args.no_verify:
+            return 0
+
+    return 0 if print_verification(verify_snapshot(args.directory, args.tables)) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,651 @@
+"""
+Embedded SQLite backend for the scripts.
+
+`SQLiteClient` answers the table operations the scripts make through the
+Supabase client (select with eq/neq/gt/gte/lt/lte/in_/is_ filters, order,
+limit and exact counts; insert, upsert, update and delete) and the database
+functions in FUNCTIONS from a local SQLite database, so a catalog can be
+seeded, validated and cleared without a network round trip per request.
+
+The schema mirrors supabase/migrations: the same tables, columns, defaults,
+CHECK and UNIQUE constraints, foreign keys (except those to auth.users),
+indexes and triggers, including `on_lesson_completed`, which adds XP and
+completed lessons to user_profiles. Row level security does not apply, as
+with the service role key. The default language courses are created with the
+database; the reading texts inserted by the migrations are not (load them
+with ingest_reading_texts.py). Keep SCHEMA in step with new migrations.
+
+Values come back as PostgREST returns them: JSONB columns decoded, booleans
+as bool and timestamps as ISO 8601 strings in UTC.
+
+Set SUPABASE_SQLITE_DB (in the environment or .env) to a database file, or
+to :memory:, and `get_client()` in supabase_client.py returns this backend:
+
+    SUPABASE_SQLITE_DB=local.db python main.py --bulk --languages all
+    SUPABASE_SQLITE_DB=local.db python cleartable.py lessons --yes
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+# Same format as PostgREST timestamps: 2025-01-01T12:00:00.123456+00:00
+NOW = "(strftime('%Y-%m-%dT%H:%M:%f000+00:00', 'now'))"
+UUID = ("(lower(hex(randomblob(4)) || '-' || hex(randomblob(2)) || '-4' || substr(hex(randomblob(2)), 2) || '-' || "
+        "substr('89ab', 1 + abs(random()) % 4, 1) || substr(hex(randomblob(2)), 2) || '-' || hex(randomblob(6))))")
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS user_profiles (
+  id UUID PRIMARY KEY,
+  email TEXT NOT NULL,
+  learning_language TEXT,
+  native_language TEXT DEFAULT 'en',
+  xp_points INTEGER DEFAULT 0,
+  lessons_completed INTEGER DEFAULT 0,
+  words_learned INTEGER DEFAULT 0,
+  current_streak INTEGER DEFAULT 0,
+  last_activity_date TIMESTAMPTZ,
+  created_at TIMESTAMPTZ DEFAULT {NOW},
+  updated_at TIMESTAMPTZ DEFAULT {NOW}
+);
+CREATE INDEX IF NOT EXISTS user_profiles_learning_language_idx ON user_profiles(learning_language);
+
+CREATE TABLE IF NOT EXISTS language_courses (
+  id UUID PRIMARY KEY DEFAULT {UUID},
+  language_code TEXT NOT NULL UNIQUE,
+  language_name TEXT NOT NULL,
+  description TEXT,
+  flag_emoji TEXT,
+  total_lessons INTEGER DEFAULT 0,
+  difficulty_level TEXT CHECK (difficulty_level IN ('beginner', 'intermediate', 'advanced')),
+  is_active BOOLEAN DEFAULT true,
+  created_at TIMESTAMPTZ DEFAULT {NOW},
+  updated_at TIMESTAMPTZ DEFAULT {NOW}
+);
+CREATE INDEX IF NOT EXISTS idx_language_courses_language_code ON language_courses(language_code);
+CREATE INDEX IF NOT EXISTS idx_language_courses_is_active ON language_courses(is_active);
+
+INSERT OR IGNORE INTO language_courses (language_code, language_name, description, flag_emoji, difficulty_level) VALUES
+  ('es', 'Spanish', 'Learn Spanish from scratch or improve your existing skills', '🇪🇸', 'beginner'),
+  ('fr', 'French', 'Master the language of love and culture', '🇫🇷', 'beginner'),
+  ('de', 'German', 'Discover the German language and culture', '🇩🇪', 'beginner'),
+  ('it', 'Italian', 'Learn the beautiful Italian language', '🇮🇹', 'beginner'),
+  ('pt', 'Portuguese', 'Speak Portuguese like a native', '🇵🇹', 'beginner'),
+  ('ja', 'Japanese', 'Explore the fascinating Japanese language', '🇯🇵', 'beginner'),
+  ('ko', 'Korean', 'Learn Korean and K-culture', '🇰🇷', 'beginner'),
+  ('zh', 'Chinese', 'Master Mandarin Chinese', '🇨🇳', 'beginner');
+
+CREATE TABLE IF NOT EXISTS lessons (
+  id UUID PRIMARY KEY DEFAULT {UUID},
+  course_id UUID NOT NULL REFERENCES language_courses(id) ON DELETE CASCADE,
+  lesson_number INTEGER NOT NULL,
+  title TEXT NOT NULL,
+  description TEXT,
+  difficulty TEXT CHECK (difficulty IN ('easy', 'medium', 'hard')),
+  xp_reward INTEGER DEFAULT 10,
+  content JSONB,
+  is_published BOOLEAN DEFAULT true,
+  created_at TIMESTAMPTZ DEFAULT {NOW},
+  updated_at TIMESTAMPTZ DEFAULT {NOW},
+  UNIQUE(course_id, lesson_number)
+);
+CREATE INDEX IF NOT EXISTS idx_lessons_course_id ON lessons(course_id);
+CREATE INDEX IF NOT EXISTS idx_lessons_lesson_number ON lessons(lesson_number);
+CREATE INDEX IF NOT EXISTS idx_lessons_is_published ON lessons(is_published);
+
+CREATE TABLE IF NOT EXISTS lessons_staging (
+  course_id UUID NOT NULL REFERENCES language_courses(id) ON DELETE CASCADE,
+  lesson_number INTEGER NOT NULL,
+  title TEXT NOT NULL,
+  description TEXT,
+  difficulty TEXT CHECK (difficulty IN ('easy', 'medium', 'hard')),
+  xp_reward INTEGER DEFAULT 10,
+  content JSONB,
+  is_published BOOLEAN DEFAULT true,
+  lesson_id UUID,
+  staged_at TIMESTAMPTZ DEFAULT {NOW},
+  PRIMARY KEY (course_id, lesson_number)
+);
+
+CREATE TABLE IF NOT EXISTS user_lesson_progress (
+  id UUID PRIMARY KEY DEFAULT {UUID},
+  user_id UUID NOT NULL REFERENCES user_profiles(id) ON DELETE CASCADE,
+  lesson_id UUID NOT NULL REFERENCES lessons(id) ON DELETE CASCADE,
+  status TEXT CHECK (status IN ('not_started', 'in_progress', 'completed')) DEFAULT 'not_started',
+  score INTEGER CHECK (score >= 0 AND score <= 100),
+  attempts INTEGER DEFAULT 0,
+  time_spent_seconds INTEGER DEFAULT 0,
+  completed_at TIMESTAMPTZ,
+  last_accessed_at TIMESTAMPTZ DEFAULT {NOW},
+  created_at TIMESTAMPTZ DEFAULT {NOW},
+  updated_at TIMESTAMPTZ DEFAULT {NOW},
+  UNIQUE(user_id, lesson_id)
+);
+CREATE INDEX IF NOT EXISTS idx_user_lesson_progress_user_id ON user_lesson_progress(user_id);
+CREATE INDEX IF NOT EXISTS idx_user_lesson_progress_lesson_id ON user_lesson_progress(lesson_id);
+CREATE INDEX IF NOT EXISTS idx_user_lesson_progress_status ON user_lesson_progress(status);
+
+CREATE TABLE IF NOT EXISTS reading_texts (
+  id UUID PRIMARY KEY DEFAULT {UUID},
+  language_code TEXT NOT NULL,
+  title TEXT NOT NULL,
+  content TEXT NOT NULL,
+  difficulty TEXT CHECK (difficulty IN ('beginner', 'intermediate', 'advanced')) NOT NULL,
+  word_count INTEGER,
+  category TEXT,
+  source TEXT,
+  is_published BOOLEAN DEFAULT true,
+  tokens JSONB,
+  word_frequencies JSONB,
+  stats JSONB,
+  created_at TIMESTAMPTZ DEFAULT {NOW},
+  updated_at TIMESTAMPTZ DEFAULT {NOW}
+);
+CREATE INDEX IF NOT EXISTS idx_reading_texts_language ON reading_texts(language_code);
+CREATE INDEX IF NOT EXISTS idx_reading_texts_difficulty ON reading_texts(difficulty);
+CREATE INDEX IF NOT EXISTS idx_reading_texts_published ON reading_texts(is_published);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_reading_texts_language_title ON reading_texts(language_code, title);
+
+CREATE TABLE IF NOT EXISTS user_reading_progress (
+  id UUID PRIMARY KEY DEFAULT {UUID},
+  user_id UUID NOT NULL REFERENCES user_profiles(id) ON DELETE CASCADE,
+  text_id UUID NOT NULL REFERENCES reading_texts(id) ON DELETE CASCADE,
+  progress_percentage INTEGER DEFAULT 0 CHECK (progress_percentage >= 0 AND progress_percentage <= 100),
+  words_looked_up INTEGER DEFAULT 0,
+  completed BOOLEAN DEFAULT false,
+  last_read_at TIMESTAMPTZ DEFAULT {NOW},
+  created_at TIMESTAMPTZ DEFAULT {NOW},
+  updated_at TIMESTAMPTZ DEFAULT {NOW},
+  UNIQUE(user_id, text_id)
+);
+CREATE INDEX IF NOT EXISTS idx_user_reading_progress_user ON user_reading_progress(user_id);
+CREATE INDEX IF NOT EXISTS idx_user_reading_progress_text ON user_reading_progress(text_id);
+
+CREATE TABLE IF NOT EXISTS user_vocabulary (
+  id UUID PRIMARY KEY DEFAULT {UUID},
+  user_id UUID NOT NULL,
+  word TEXT NOT NULL,
+  language_code TEXT NOT NULL,
+  learned_at TIMESTAMPTZ DEFAULT {NOW},
+  times_reviewed INTEGER DEFAULT 1,
+  ease_factor REAL NOT NULL DEFAULT 2.5,
+  interval_days INTEGER NOT NULL DEFAULT 0,
+  repetitions INTEGER NOT NULL DEFAULT 0,
+  scheduled_reviews INTEGER NOT NULL DEFAULT 0,
+  last_reviewed_at TIMESTAMPTZ,
+  next_review_at TIMESTAMPTZ,
+  UNIQUE(user_id, word, language_code)
+);
+CREATE INDEX IF NOT EXISTS idx_user_vocabulary_user_id ON user_vocabulary(user_id);
+CREATE INDEX IF NOT EXISTS idx_user_vocabulary_language ON user_vocabulary(language_code);
+CREATE INDEX IF NOT EXISTS idx_user_vocabulary_due ON user_vocabulary(user_id, language_code, next_review_at);
+
+CREATE TABLE IF NOT EXISTS translation_cache (
+  source_lang TEXT NOT NULL,
+  target_lang TEXT NOT NULL,
+  text TEXT NOT NULL,
+  translation TEXT NOT NULL,
+  backend TEXT NOT NULL,
+  created_at TIMESTAMPTZ DEFAULT {NOW},
+  updated_at TIMESTAMPTZ DEFAULT {NOW},
+  PRIMARY KEY (source_lang, target_lang, text)
+);
+
+CREATE TRIGGER IF NOT EXISTS update_language_courses_timestamp
+  AFTER UPDATE ON language_courses FOR EACH ROW
+  BEGIN UPDATE language_courses SET updated_at = {NOW} WHERE rowid = NEW.rowid; END;
+
+CREATE TRIGGER IF NOT EXISTS update_lessons_timestamp
+  AFTER UPDATE ON lessons FOR EACH ROW
+  BEGIN UPDATE lessons SET updated_at = {NOW} WHERE rowid = NEW.rowid; END;
+
+CREATE TRIGGER IF NOT EXISTS update_user_lesson_progress_timestamp
+  AFTER UPDATE ON user_lesson_progress FOR EACH ROW
+  BEGIN UPDATE user_lesson_progress SET updated_at = {NOW} WHERE rowid = NEW.rowid; END;
+
+CREATE TRIGGER IF NOT EXISTS update_translation_cache_timestamp
+  AFTER UPDATE ON translation_cache FOR EACH ROW
+  BEGIN UPDATE translation_cache SET updated_at = {NOW} WHERE rowid = NEW.rowid; END;
+
+-- update_user_stats_on_lesson_completion(), split into its INSERT and UPDATE cases
+CREATE TRIGGER IF NOT EXISTS on_lesson_completed_insert
+  AFTER INSERT ON user_lesson_progress FOR EACH ROW
+  WHEN NEW.status = 'completed'
+  BEGIN
+    UPDATE user_profiles
+    SET lessons_completed = lessons_completed + 1,
+        xp_points = xp_points + (SELECT xp_reward FROM lessons WHERE id = NEW.lesson_id),
+        last_activity_date = {NOW},
+        updated_at = {NOW}
+    WHERE id = NEW.user_id;
+  END;
+
+CREATE TRIGGER IF NOT EXISTS on_lesson_completed_update
+  AFTER UPDATE ON user_lesson_progress FOR EACH ROW
+  WHEN NEW.status = 'completed' AND (OLD.status IS NULL OR OLD.status != 'completed')
+  BEGIN
+    UPDATE user_profiles
+    SET lessons_completed = lessons_completed + 1,
+        xp_points = xp_points + (SELECT xp_reward FROM lessons WHERE id = NEW.lesson_id),
+        last_activity_date = {NOW},
+        updated_at = {NOW}
+    WHERE id = NEW.user_id;
+  END;
+"""
+
+# PostgREST filter operators supported by the query builder
+OPERATORS = {'eq': '=', 'neq': '!=', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+
+# HTTP method PostgREST would use for each operation, for the trace
+METHODS = {'select': 'GET', 'insert': 'POST', 'upsert': 'POST', 'update': 'PATCH', 'delete': 'DELETE',
+           'rpc': 'POST'}
+
+# Columns publish_course() copies from lessons_staging to lessons
+PUBLISHED_COLUMNS = ['title', 'description', 'difficulty', 'xp_reward', 'content', 'is_published']
+
+
+def timestamp(value):
+    """A timestamp in the stored format, so that timestamps compare as text"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc).isoformat(timespec='microseconds')
+    return value
+
+
+def encode(value, column_type: str):
+    if value is None:
+        return None
+    if column_type == 'JSONB':
+        return json.dumps(value, ensure_ascii=False)
+    if column_type == 'TIMESTAMPTZ':
+        return timestamp(value)
+    return value
+
+
+def decode(value, column_type: str):
+    if value is None:
+        return None
+    if column_type == 'JSONB':
+        # NUMERIC affinity turns JSON numbers into SQLite numbers
+        return json.loads(value) if isinstance(value, str) else value
+    if column_type == 'BOOLEAN':
+        return bool(value)
+    return value
+
+
+class SQLiteResponse:
+    """The parts of a postgrest APIResponse the scripts read"""
+
+    def __init__(self, data: list, count: int = None):
+        self.data = data
+        self.count = count
+
+
+class SQLiteQuery:
+    """Query builder with the chaining interface of the postgrest request builders"""
+
+    def __init__(self, client: 'SQLiteClient', table: str):
+        self.client = client
+        self.table = table
+        self.operation = None
+        self.columns = '*'
+        self.count = None
+        self.rows = []
+        self.values = {}
+        self.on_conflict = None
+        self.ignore_duplicates = False
+        self.returning = True
+        self.filters = []
+        self.ordering = []
+        self.row_limit = None
+
+    # -- operations ----------------------------------------------------------
+
+    def select(self, *columns, count: str = None):
+        self.operation = 'select'
+        self.columns = ','.join(columns) or '*'
+        self.count = count
+        return self
+
+    def insert(self, json, *, returning: str = 'representation', **kwargs):
+        self.operation = 'insert'
+        self.rows = json if isinstance(json, list) else [json]
+        self.returning = returning != 'minimal'
+        return self
+
+    def upsert(self, json, *, returning: str = 'representation', on_conflict: str = '',
+               ignore_duplicates: bool = False, **kwargs):
+        self.insert(json, returning=returning)
+        self.operation = 'upsert'
+        self.on_conflict = [column.strip() for column in on_conflict.split(',') if column.strip()] or None
+        self.ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, json: dict, *, returning: str = 'representation', **kwargs):
+        self.operation = 'update'
+        self.values = json
+        self.returning = returning != 'minimal'
+        return self
+
+    def delete(self, *, returning: str = 'representation', **kwargs):
+        self.operation = 'delete'
+        self.returning = returning != 'minimal'
+        return self
+
+    # -- filters and modifiers -------------------------------------------------
+
+    def _filter(self, column: str, operator: str, value):
+        self.filters.append((column, operator, value))
+        return self
+
+    def eq(self, column: str, value):
+        return self._filter(column, 'eq', value)
+
+    def neq(self, column: str, value):
+        return self._filter(column, 'neq', value)
+
+    def gt(self, column: str, value):
+        return self._filter(column, 'gt', value)
+
+    def gte(self, column: str, value):
+        return self._filter(column, 'gte', value)
+
+    def lt(self, column: str, value):
+        return self._filter(column, 'lt', value)
+
+    def lte(self, column: str, value):
+        return self._filter(column, 'lte', value)
+
+    def in_(self, column: str, values):
+        return self._filter(column, 'in', list(values))
+
+    def is_(self, column: str, value):
+        return self._filter(column, 'is', value)
+
+    def order(self, column: str, *, desc: bool = False, nullsfirst: bool = False, **kwargs):
+        self.ordering.append((column, desc, nullsfirst))
+        return self
+
+    def limit(self, size: int, **kwargs):
+        self.row_limit = size
+        return self
+
+    # -- SQL -------------------------------------------------------------------
+
+    def _column(self, name: str) -> str:
+        if name not in self.client.columns(self.table):
+            raise sqlite3.OperationalError(f'column {self.table}.{name} does not exist')
+        return f'"{name}"'
+
+    def _where(self) -> tuple:
+        types = self.client.columns(self.table)
+        clauses, params = [], []
+        for column, operator, value in self.filters:
+            quoted = self._column(column)
+            if operator == 'is':
+                keyword = 'NULL' if value in (None, 'null') else 'TRUE' if value in (True, 'true') else 'FALSE'
+                clauses.append(f'{quoted} IS {keyword}')
+            elif operator == 'in':
+                clauses.append(f"{quoted} IN ({', '.join('?' * len(value))})")
+                params.extend(encode(item, types[column]) for item in value)
+            else:
+                clauses.append(f'{quoted} {OPERATORS[operator]} ?')
+                params.append(encode(value, types[column]))
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    def _order(self) -> str:
+        terms = []
+        for column, desc, nullsfirst in self.ordering:
+            quoted = self._column(column)
+            # PostgreSQL puts NULLs last in ascending order and first in descending order
+            nulls = 'FIRST' if nullsfirst or desc else 'LAST'
+            terms.append(f"{quoted} {'DESC' if desc else 'ASC'} NULLS {nulls}")
+        return ' ORDER BY ' + ', '.join(terms) if terms else ''
+
+    def _decode(self, cursor) -> list:
+        types = self.client.columns(self.table)
+        names = [description[0] for description in cursor.description]
+        return [{name: decode(value, types.get(name)) for name, value in zip(names, row)} for row in cursor]
+
+    def _select(self, connection) -> SQLiteResponse:
+        if self.columns.strip() == '*':
+            columns = '*'
+        else:
+            columns = ', '.join(self._column(column.strip()) for column in self.columns.split(',') if column.strip())
+        where, params = self._where()
+        sql = f'SELECT {columns} FROM "{self.table}"{where}{self._order()}'
+        if self.row_limit is not None:
+            sql += f' LIMIT {int(self.row_limit)}'
+        data = self._decode(connection.execute(sql, params))
+        count = None
+        if self.count == 'exact':
+            count = connection.execute(f'SELECT COUNT(*) FROM "{self.table}"{where}', params).fetchone()[0]
+        return SQLiteResponse(data, count)
+
+    def _write_rows(self, connection) -> list:
+        types = self.client.columns(self.table)
+        written = []
+        for row in self.rows:
+            columns = [self._column(column) for column in row]
+            sql = (f'INSERT INTO "{self.table}" ({", ".join(columns)}) '
+                   f'VALUES ({", ".join("?" * len(columns))})')
+            if self.operation == 'upsert':
+                target = self.on_conflict or self.client.primary_key(self.table)
+                if self.ignore_duplicates:
+                    sql += f' ON CONFLICT ({", ".join(map(self._column, target))}) DO NOTHING'
+                else:
+                    # Like merge-duplicates: only the columns sent are overwritten
+                    updated = [column for column in row if column not in target] or target
+                    assignments = ', '.join(f'"{column}" = excluded."{column}"' for column in updated)
+                    sql += f' ON CONFLICT ({", ".join(map(self._column, target))}) DO UPDATE SET {assignments}'
+            cursor = connection.execute(sql + ' RETURNING *', [encode(value, types[column])
+                                                              for column, value in row.items()])
+            written.extend(self._decode(cursor))
+        return written
+
+    def _run(self, connection) -> SQLiteResponse:
+        if self.operation == 'select':
+            return self._select(connection)
+        if self.operation in ('insert', 'upsert'):
+            data = self._write_rows(connection)
+        else:
+            where, params = self._where()
+            if self.operation == 'update':
+                types = self.client.columns(self.table)
+                assignments = ', '.join(f'{self._column(column)} = ?' for column in self.values)
+                values = [encode(value, types[column]) for column, value in self.values.items()]
+                cursor = connection.execute(f'UPDATE "{self.table}" SET {assignments}{where} RETURNING *',
+                                            values + params)
+            else:
+                cursor = connection.execute(f'DELETE FROM "{self.table}"{where} RETURNING *', params)
+            data = self._decode(cursor)
+        return SQLiteResponse(data if self.returning else [])
+
+    def execute(self) -> SQLiteResponse:
+        return self.client.execute(self)
+
+
+def publish_course(connection, p_course_id: str) -> dict:
+    """publish_course() from migration 012: swap a course's staged lessons into lessons"""
+    if connection.execute('SELECT 1 FROM language_courses WHERE id = ?', [p_course_id]).fetchone() is None:
+        raise sqlite3.DatabaseError(f'Course {p_course_id} does not exist')
+
+    staged = connection.execute('SELECT lesson_number, title, content FROM lessons_staging '
+                                'WHERE course_id = ? ORDER BY lesson_number', [p_course_id]).fetchall()
+    if not staged:
+        raise sqlite3.DatabaseError(f'No lessons are staged for course {p_course_id}')
+    if staged[0][0] != 1 or staged[-1][0] != len(staged):
+        raise sqlite3.DatabaseError(f'Staged lessons of course {p_course_id} are not numbered 1 to {len(staged)}')
+
+    for lesson_number, title, content in staged:
+        # main.py stores content as a JSON string, which the app parses
+        body = decode(content, 'JSONB')
+        if isinstance(body, str):
+            body = json.loads(body)
+        activities = body.get('activities') if isinstance(body, dict) else None
+        if not title.strip():
+            problem = 'an empty title'
+        elif not isinstance(activities, list) or not activities:
+            problem = 'no activities'
+        else:
+            continue
+        raise sqlite3.DatabaseError(f'Staged course {p_course_id} cannot be published: '
+                                    f'lesson {lesson_number} has {problem}')
+
+    # Match on identical content, then on the title; the k-th copy of a key is paired with the k-th one
+    unmatched = connection.execute('SELECT id, title, content FROM lessons WHERE course_id = ? '
+                                   'ORDER BY lesson_number', [p_course_id]).fetchall()
+    matches = {}
+    for key in (2, 1):
+        candidates = {}
+        for lesson in unmatched:
+            candidates.setdefault(lesson[key], []).append(lesson)
+        for lesson_number, *lesson in staged:
+            if lesson_number not in matches and candidates.get(lesson[key - 1]):
+                matches[lesson_number] = candidates[lesson[key - 1]].pop(0)[0]
+        kept = set(matches.values())
+        unmatched = [lesson for lesson in unmatched if lesson[0] not in kept]
+    connection.execute('UPDATE lessons_staging SET lesson_id = NULL WHERE course_id = ?', [p_course_id])
+    connection.executemany('UPDATE lessons_staging SET lesson_id = ? WHERE course_id = ? AND lesson_number = ?',
+                           [(lesson_id, p_course_id, number) for number, lesson_id in matches.items()])
+
+    deleted = connection.execute(
+        'DELETE FROM lessons WHERE course_id = ? AND id NOT IN '
+        '(SELECT lesson_id FROM lessons_staging WHERE course_id = ? AND lesson_id IS NOT NULL)',
+        [p_course_id, p_course_id]).rowcount
+    assignments = ', '.join(f'{column} = s.{column}' for column in PUBLISHED_COLUMNS)
+    changed = ' OR '.join(f'lessons.{column} IS NOT s.{column}' for column in PUBLISHED_COLUMNS)
+    updated = connection.execute(
+        f'UPDATE lessons SET {assignments} FROM lessons_staging s '
+        f'WHERE s.course_id = ? AND s.lesson_id = lessons.id AND ({changed})', [p_course_id]).rowcount
+    # Moved lessons are parked on negative numbers first, as (course_id, lesson_number) is unique
+    moved = connection.execute(
+        'UPDATE lessons SET lesson_number = -s.lesson_number FROM lessons_staging s '
+        'WHERE s.course_id = ? AND s.lesson_id = lessons.id AND lessons.lesson_number <> s.lesson_number',
+        [p_course_id]).rowcount
+    connection.execute('UPDATE lessons SET lesson_number = -lesson_number '
+                       'WHERE course_id = ? AND lesson_number < 0', [p_course_id])
+    columns = ', '.join(['course_id', 'lesson_number'] + PUBLISHED_COLUMNS)
+    inserted = connection.execute(
+        f'INSERT INTO lessons ({columns}) SELECT {columns} FROM lessons_staging s '
+        f'WHERE s.course_id = ? AND s.lesson_id IS NULL', [p_course_id]).rowcount
+
+    connection.execute('UPDATE language_courses SET total_lessons = ? WHERE id = ?', [len(staged), p_course_id])
+    connection.execute('DELETE FROM lessons_staging WHERE course_id = ?', [p_course_id])
+    return {'inserted': inserted, 'updated': updated, 'moved': moved,
+            'unchanged': len(staged) - inserted - updated, 'deleted': deleted}
+
+
+# Database functions that can be called with SQLiteClient.rpc()
+FUNCTIONS = {'publish_course': publish_course}
+
+
+class SQLiteCall:
+    """A call to a database function, like the request builder of client.rpc()"""
+
+    def __init__(self, client: 'SQLiteClient', name: str, params: dict):
+        self.client = client
+        self.table = name
+        self.operation = 'rpc'
+        self.params = params or {}
+
+    def _run(self, connection) -> SQLiteResponse:
+        function = FUNCTIONS.get(self.table)
+        if function is None:
+            raise sqlite3.OperationalError(f'function {self.table} does not exist')
+        return SQLiteResponse(function(connection, **self.params))
+
+    def execute(self) -> SQLiteResponse:
+        return self.client.execute(self)
+
+
+class SQLiteClient:
+    """Stand-in for the Supabase client, backed by one SQLite database"""
+
+    def __init__(self, path: str):
+        self.path = path
+        # One connection shared by all threads; the lock serializes statements
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.lock = threading.Lock()
+        # supabase_tracing.enable_tracing sets this to record every statement
+        self.tracer = None
+        self._columns = {}
+        self._primary_keys = {}
+        self.connection.execute('PRAGMA foreign_keys = ON')
+        self.connection.execute('PRAGMA busy_timeout = 5000')
+        if path != ':memory:':
+            self.connection.execute('PRAGMA journal_mode = WAL')
+            self.connection.execute('PRAGMA synchronous = NORMAL')
+        self.connection.executescript(SCHEMA)
+
+    def table(self, name: str) -> SQLiteQuery:
+        return SQLiteQuery(self, name)
+
+    def rpc(self, name: str, params: dict = None) -> SQLiteCall:
+        return SQLiteCall(self, name, params)
+
+    def columns(self, table: str) -> dict:
+        """{column: declared type} of a table"""
+        if table not in self._columns:
+            info = self.connection.execute(f'PRAGMA table_info("{table}")').fetchall()
+            if not info:
+                raise sqlite3.OperationalError(f'relation "{table}" does not exist')
+            self._columns[table] = {name: declared.upper() for _, name, declared, *_ in info}
+            self._primary_keys[table] = [name for _, name, _, _, _, position in
+                                         sorted(info, key=lambda column: column[5]) if position]
+        return self._columns[table]
+
+    def primary_key(self, table: str) -> list:
+        self.columns(table)
+        return self._primary_keys[table]
+
+    def execute(self, query) -> SQLiteResponse:
+        """Run a query as one transaction, like one PostgREST request"""
+        started = time.perf_counter()
+        status, error = None, None
+        try:
+            with self.lock:
+                # Writers take the write lock up front, so that other processes wait instead of failing
+                self.connection.execute('BEGIN' if query.operation == 'select' else 'BEGIN IMMEDIATE')
+                try:
+                    response = query._run(self.connection)
+                except BaseException:
+                    self.connection.execute('ROLLBACK')
+                    raise
+                self.connection.execute('COMMIT')
+            status = 200 if query.operation in ('select', 'update', 'delete', 'rpc') else 201
+            return response
+        except sqlite3.IntegrityError as e:
+            status, error = 409, f"IntegrityError: {e}"
+            raise
+        except sqlite3.Error as e:
+            status, error = 400, f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            if self.tracer is not None:
+                ms = round((time.perf_counter() - started) * 1000, 2)
+                self.tracer.record({
+                    'ts': round(time.time(), 3), 'method': METHODS.get(query.operation, 'GET'),
+                    'operation': query.operation, 'table': query.table, 'status': status,
+                    'ms': ms, 'ttfb_ms': ms, 'request_bytes': 0, 'response_bytes': 0,
+                    'attempt': 1, 'thread': threading.current_thread().name, 'error': error,
+                })
+
+    def close(self):
+        self.connection.close()
+
+
+def database_path() -> str:
+    """The SQLite database selected with SUPABASE_SQLITE_DB, or None"""
+    path = os.environ.get('SUPABASE_SQLITE_DB')
+    if not path:
+        return None
+    return path if path == ':memory:' else os.path.abspath(path)
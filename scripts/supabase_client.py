@@ -0,0 +1,159 @@
+"""
+Shared Supabase client for the scripts.
+
+The client is created on first use from the `.env` file at the repository
+root, using the service role key when it is set and the anon key otherwise.
+Its PostgREST session keeps a pool of keep-alive connections, and requests
+go through a transport that:
+
+- retries idempotent requests (selects, deletes, updates and upserts) on
+  429 and 5xx responses and on connection errors, with jittered exponential
+  backoff that honours Retry-After;
+- limits how many requests are in flight with an AIMD limiter, which halves
+  the limit when Supabase throttles and grows it back by one per round of
+  successful requests.
+
+The transport lives in supabase_transport.py. supabase, httpx, dotenv and
+the SQLite backend are only imported when the client is created, so scripts
+start quickly when they do not talk to Supabase (--help, dry runs,
+validation).
+
+When SUPABASE_SQLITE_DB is set, `get_client()` returns the embedded SQLite
+backend from sqlite_backend.py instead, so the scripts run offline.
+
+Usage:
+    from supabase_client import get_client
+    get_client().table('lessons').select('id').limit(1).execute()
+"""
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+ENV_FILE = Path(__file__).parent.parent / '.env'
+
+# Keep-alive connections kept open to PostgREST
+POOL_SIZE = 16
+
+DEFAULT_MAX_IN_FLIGHT = 4
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit that adapts to rate limiting (additive increase,
+    multiplicative decrease).
+
+    Every successful request raises the limit by 1/limit, so the limit grows
+    by about one per round of requests. A throttled request halves it, at
+    most once per round: requests that were already in flight when the limit
+    was last cut do not cut it again.
+    """
+
+    def __init__(self, maximum: int = DEFAULT_MAX_IN_FLIGHT, minimum: int = 1):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(maximum)
+        self.in_flight = 0
+        self.last_decrease = 0.0
+        self.condition = threading.Condition()
+
+    def set_maximum(self, maximum: int):
+        with self.condition:
+            self.maximum = maximum
+            self.limit = float(maximum)
+            self.condition.notify_all()
+
+    def acquire(self) -> float:
+        """Wait for a free slot; returns the start time to pass to `release`"""
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+            return time.monotonic()
+
+    def release(self, started: float, throttled: bool = False):
+        with self.condition:
+            self.in_flight -= 1
+            if throttled:
+                if started > self.last_decrease:
+                    self.limit = max(self.minimum, self.limit / 2)
+                    self.last_decrease = time.monotonic()
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self.condition.notify_all()
+
+
+limiter = AdaptiveLimiter()
+
+
+def set_max_in_flight(limit: int):
+    """Change how many Supabase requests may run at the same time"""
+    limiter.set_maximum(limit)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def load_environment():
+    """Load the .env file at the repository root into the environment"""
+    from dotenv import load_dotenv
+    load_dotenv(ENV_FILE)
+
+
+def project_url() -> str:
+    from sqlite_backend import database_path
+    load_environment()
+    path = database_path()
+    if path:
+        return f"sqlite:{path}"
+    return os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
+
+
+def create_pooled_client() -> 'Client':
+    """Create a Supabase client whose PostgREST requests are pooled, retried and rate-limited"""
+    url = project_url()
+    # Use the service role key to bypass RLS, falling back to the anon key
+    key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+    if not key:
+        print("Warning: SUPABASE_SERVICE_ROLE_KEY not found, trying anon key...")
+        key = os.environ.get("NEXT_PUBLIC_SUPABASE_ANON_KEY")
+    if not url or not key:
+        raise ValueError("Missing Supabase credentials. Make sure NEXT_PUBLIC_SUPABASE_URL and "
+                         "SUPABASE_SERVICE_ROLE_KEY or NEXT_PUBLIC_SUPABASE_ANON_KEY are set in your .env file")
+
+    # Imported here: supabase and httpx account for most of the scripts' startup time
+    import httpx
+    from supabase import create_client
+    from supabase_transport import RetryTransport
+
+    client = create_client(url, key)
+    session = client.postgrest.session
+    pool = httpx.HTTPTransport(
+        http2=True,
+        limits=httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE),
+    )
+    session._transport.close()
+    session._transport = RetryTransport(pool, limiter)
+    return client
+
+
+def get_client() -> 'Client':
+    """Return the shared client (the SQLite backend when SUPABASE_SQLITE_DB is set), creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from sqlite_backend import SQLiteClient, database_path
+                load_environment()
+                path = database_path()
+                if path:
+                    print(f"Using the local SQLite database {path}")
+                    _client = SQLiteClient(path)
+                else:
+                    _client = create_pooled_client()
+    return _client
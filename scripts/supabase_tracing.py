@@ -0,0 +1,229 @@
+"""
+Request tracing for the Supabase client used by the scripts.
+
+`enable_tracing(client)` wraps the HTTP transport of the client's PostgREST
+session with `TracingTransport` (supabase_transport.py), so every
+`.execute()` is recorded without changing the code that builds the queries.
+Each attempt of a request becomes one JSON line:
+
+    {"ts": 1718000000.12, "method": "POST", "operation": "upsert", "table": "lessons",
+     "status": 201, "ms": 84.2, "ttfb_ms": 80.9, "request_bytes": 51234,
+     "response_bytes": 48812, "attempt": 1, "thread": "ThreadPoolExecutor-0_1", "error": null}
+
+and `Tracer.print_summary()` prints per-table totals and a latency histogram
+at the end of a run. `SamplingProfiler` covers the local side (building
+rows, JSON encoding) by sampling the stacks of all threads.
+
+Usage:
+    python main.py --bulk --trace seed_trace.jsonl --profile seed_profile.folded
+    python cleartable.py lessons --trace clear_trace.jsonl
+"""
+import json
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+HISTOGRAM_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+class Tracer:
+    """Collects request events and optionally writes them as JSON lines"""
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.events = []
+        self.lock = threading.Lock()
+        self.file = open(path, 'w', encoding='utf-8') if path else None
+
+    def record(self, event: dict):
+        with self.lock:
+            self.events.append(event)
+            if self.file:
+                self.file.write(json.dumps(event) + '\n')
+
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
+    def summary(self) -> dict:
+        """Aggregate the recorded events by operation and table"""
+        with self.lock:
+            events = list(self.events)
+        groups = {}
+        for event in events:
+            groups.setdefault((event['operation'], event['table']), []).append(event)
+
+        rows = []
+        for (operation, table), group in sorted(groups.items()):
+            latencies = [event['ms'] for event in group]
+            rows.append({
+                'operation': operation,
+                'table': table,
+                'requests': len(group),
+                'errors': sum(1 for event in group if event['error'] or (event['status'] or 0) >= 400),
+                'retries': sum(1 for event in group if event['attempt'] > 1),
+                'request_bytes': sum(event['request_bytes'] for event in group),
+                'response_bytes': sum(event['response_bytes'] for event in group),
+                'total_ms': round(sum(latencies), 1),
+                'p50_ms': round(percentile(latencies, 0.50), 1),
+                'p95_ms': round(percentile(latencies, 0.95), 1),
+                'max_ms': round(max(latencies), 1),
+            })
+
+        histogram = Counter()
+        for event in events:
+            bucket = next((bound for bound in HISTOGRAM_BUCKETS if event['ms'] <= bound), None)
+            histogram[bucket] += 1
+        return {'requests': len(events), 'groups': rows, 'histogram': histogram}
+
+    def print_summary(self):
+        summary = self.summary()
+        if not summary['requests']:
+            print("\nNo Supabase requests were made")
+            return
+
+        print(f"\nSupabase requests: {summary['requests']}")
+        print(f"  {'operation':9} {'table':24} {'reqs':>6} {'errs':>5} {'retry':>5} {'sent KB':>9} {'recv KB':>9} "
+              f"{'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+        for row in summary['groups']:
+            print(f"  {row['operation']:9} {row['table'][:24]:24} {row['requests']:>6} {row['errors']:>5} {row['retries']:>5} "
+                  f"{row['request_bytes'] / 1024:>9.1f} {row['response_bytes'] / 1024:>9.1f} "
+                  f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['max_ms']:>8.1f}")
+
+        print("\nLatency histogram:")
+        histogram = summary['histogram']
+        widest = max(histogram.values())
+        bounds = HISTOGRAM_BUCKETS + [None]
+        # Only print the range of buckets that actually has requests
+        used = [position for position, bound in enumerate(bounds) if histogram.get(bound)]
+        for position in range(used[0], used[-1] + 1):
+            bound = bounds[position]
+            lower = bounds[position - 1] if position else 0
+            count = histogram.get(bound, 0)
+            label = f"{lower}-{bound} ms" if bound is not None else f">{lower} ms"
+            bar = '#' * max(1 if count else 0, round(40 * count / widest))
+            print(f"  {label:>14} {count:>6} {bar}")
+
+
+def enable_tracing(client, path: str = None) -> Tracer:
+    """
+    Trace every PostgREST request made through a Supabase client.
+
+    Args:
+        client: Client returned by supabase.create_client
+        path: Optional file for the JSON-lines trace
+
+    Returns:
+        The Tracer collecting the events
+    """
+    from sqlite_backend import SQLiteClient
+
+    tracer = Tracer(path)
+    # The SQLite backend makes no HTTP requests; it records its statements itself
+    if isinstance(client, SQLiteClient):
+        client.tracer = tracer
+        return tracer
+    from supabase_transport import RetryTransport, TracingTransport
+
+    session = client.postgrest.session
+    # Trace below the retrying transport so that every attempt is recorded
+    if isinstance(session._transport, RetryTransport):
+        session._transport.transport = TracingTransport(session._transport.transport, tracer)
+    else:
+        session._transport = TracingTransport(session._transport, tracer)
+    # Proxy settings mount their own transports, which bypass _transport
+    session._mounts = {
+        pattern: TracingTransport(transport, tracer) if transport is not None else None
+        for pattern, transport in session._mounts.items()
+    }
+    return tracer
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all other threads at a fixed interval.
+
+    The result is written in the folded-stack format read by flamegraph.pl and
+    speedscope, and the functions seen most often at the top of a stack are
+    printed as a short table.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write_folded(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def print_top(self, limit: int = 10):
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        total = sum(leaves.values())
+        if not total:
+            return
+        print(f"\nProfile ({self.samples} samples every {self.interval * 1000:g} ms), busiest frames:")
+        for frame, count in leaves.most_common(limit):
+            print(f"  {100 * count / total:5.1f}%  {frame}")
+
+
+@contextmanager
+def tracing(client, trace_path: str = None, profile_path: str = None):
+    """
+    Trace and/or profile the enclosed block, printing the summaries when it ends.
+
+    Does nothing when neither path is given, so scripts can wrap their work
+    unconditionally.
+    """
+    tracer = enable_tracing(client, trace_path) if trace_path else None
+    profiler = SamplingProfiler().start() if profile_path else None
+    try:
+        yield tracer
+    finally:
+        if tracer is not None:
+            tracer.close()
+            tracer.print_summary()
+        if profiler is not None:
+            profiler.stop()
+            profiler.write_folded(profile_path)
+            profiler.print_top()
@@ -0,0 +1,176 @@
+"""
+httpx transports wrapped around the PostgREST session of the Supabase client.
+
+- `RetryTransport` retries failed requests and applies the concurrency
+  limiter of supabase_client.py;
+- `TracingTransport` records one event per request for supabase_tracing.py.
+
+httpx is slow to import, so supabase_client.py and supabase_tracing.py only
+import this module once a client is created or tracing is enabled.
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 20.0
+
+# Responses meaning "slow down"; they shrink the concurrency limit
+THROTTLE_STATUSES = {429, 503}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def is_idempotent(request) -> bool:
+    """Whether repeating the request cannot change the outcome"""
+    if request.method in ('GET', 'HEAD', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'):
+        return True
+    # Upserts resolve duplicates instead of inserting them again
+    return request.method == 'POST' and 'resolution=' in request.headers.get('prefer', '')
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given (1-based) attempt"""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** (attempt - 1)))
+
+
+def retry_after(response) -> float:
+    """Seconds to wait according to the Retry-After header, or None"""
+    value = response.headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        return min(BACKOFF_CAP, max(0.0, float(value)))
+    except ValueError:
+        pass
+    try:
+        return min(BACKOFF_CAP, max(0.0, parsedate_to_datetime(value).timestamp() - time.time()))
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryTransport(httpx.BaseTransport):
+    """Transport wrapper that retries failed requests and applies the limiter"""
+
+    def __init__(self, transport, limiter, max_retries: int = MAX_RETRIES):
+        self.transport = transport
+        self.limiter = limiter
+        self.max_retries = max_retries
+
+    def handle_request(self, request):
+        idempotent = is_idempotent(request)
+        attempt = 0
+        while True:
+            attempt += 1
+            request.extensions['attempt'] = attempt
+            last = attempt > self.max_retries
+            started = self.limiter.acquire()
+            try:
+                response = self.transport.handle_request(request)
+            except httpx.TransportError as e:
+                self.limiter.release(started)
+                # A request that never reached the server can always be sent again
+                if last or not (idempotent or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))):
+                    raise
+                delay = backoff_delay(attempt)
+            else:
+                status = response.status_code
+                self.limiter.release(started, throttled=status in THROTTLE_STATUSES)
+                # A 429 is rejected before the request runs, so it is safe to repeat
+                if last or status not in RETRY_STATUSES or not (idempotent or status == 429):
+                    return response
+                delay = retry_after(response) or backoff_delay(attempt)
+                response.close()
+            time.sleep(delay)
+
+    def close(self):
+        self.transport.close()
+
+
+def _operation(request) -> str:
+    if request.method == 'POST':
+        prefer = request.headers.get('prefer', '')
+        return 'upsert' if 'resolution=' in prefer else 'insert'
+    return {'GET': 'select', 'HEAD': 'count', 'PATCH': 'update', 'DELETE': 'delete'}.get(
+        request.method, request.method.lower())
+
+
+def _table(request) -> str:
+    path = request.url.path
+    marker = '/rest/v1/'
+    return path.split(marker, 1)[1] if marker in path else path
+
+
+def _request_bytes(request) -> int:
+    try:
+        return len(request.content)
+    except httpx.RequestNotRead:
+        return 0
+
+
+class _TracedStream(httpx.SyncByteStream):
+    """Response body stream that counts bytes and reports when it is closed"""
+
+    def __init__(self, stream, on_close):
+        self.stream = stream
+        self.on_close = on_close
+        self.size = 0
+
+    def __iter__(self):
+        for chunk in self.stream:
+            self.size += len(chunk)
+            yield chunk
+
+    def close(self):
+        try:
+            self.stream.close()
+        finally:
+            self.on_close(self.size)
+
+
+class TracingTransport(httpx.BaseTransport):
+    """Transport wrapper that records one event per request"""
+
+    def __init__(self, transport, tracer):
+        self.transport = transport
+        self.tracer = tracer
+
+    def handle_request(self, request):
+        event = {
+            'ts': round(time.time(), 3),
+            'method': request.method,
+            'operation': _operation(request),
+            'table': _table(request),
+            'status': None,
+            'ms': 0.0,
+            'ttfb_ms': 0.0,
+            'request_bytes': _request_bytes(request),
+            'response_bytes': 0,
+            'attempt': request.extensions.get('attempt', 1),
+            'thread': threading.current_thread().name,
+            'error': None,
+        }
+        started = time.perf_counter()
+        try:
+            response = self.transport.handle_request(request)
+        except Exception as e:
+            event['ms'] = round((time.perf_counter() - started) * 1000, 2)
+            event['error'] = f"{type(e).__name__}: {e}"
+            self.tracer.record(event)
+            raise
+        event['status'] = response.status_code
+        event['ttfb_ms'] = round((time.perf_counter() - started) * 1000, 2)
+
+        def finish(size):
+            event['ms'] = round((time.perf_counter() - started) * 1000, 2)
+            event['response_bytes'] = size
+            self.tracer.record(event)
+
+        response.stream = _TracedStream(response.stream, finish)
+        return response
+
+    def close(self):
+        self.transport.close()
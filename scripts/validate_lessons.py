@@ -0,0 +1,249 @@
+"""
+Validate lesson data files before they are seeded.
+
+Each file is read in a single streaming pass and every lesson is checked as
+soon as it is parsed. Files are checked in parallel on a process pool. The
+report lists every issue with a stable code, so it can be consumed by other
+tools as well as read on the console.
+
+Usage:
+    python validate_lessons.py                     # every data file in scripts/
+    python validate_lessons.py spanish_data2.json --report report.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from lesson_loader import LessonDataError, find_data_files, stream_all_lessons
+
+# Allowed by the CHECK constraint on lessons.difficulty
+DIFFICULTIES = {'easy', 'medium', 'hard'}
+
+ACTIVITY_TYPES = {'teaching', 'multiple_choice', 'written', 'matching'}
+
+# Fields every activity of a type must have, besides `type` and `order`
+REQUIRED_ACTIVITY_FIELDS = {
+    'teaching': ['title', 'content'],
+    'multiple_choice': ['question', 'options', 'correct_answer'],
+    'written': ['question', 'correct_answer'],
+    'matching': ['question', 'pairs'],
+}
+
+ERROR = 'error'
+WARNING = 'warning'
+
+
+def _issue(severity, code, message, language=None, lesson=None, title=None, activity=None):
+    return {
+        'severity': severity,
+        'code': code,
+        'message': message,
+        'language': language,
+        'lesson': lesson,
+        'title': title,
+        'activity': activity,
+    }
+
+
+def check_activity(activity, position: int, report):
+    """Check one activity; `report(severity, code, message, activity=...)` records issues"""
+    if not isinstance(activity, dict):
+        report(ERROR, 'activity_not_object', f"Activity {position} is not an object")
+        return
+    order = activity.get('order', position)
+    activity_type = activity.get('type')
+    if activity_type not in ACTIVITY_TYPES:
+        report(ERROR, 'unknown_activity_type', f"Unknown activity type '{activity_type}'", activity=order)
+        return
+
+    for field in REQUIRED_ACTIVITY_FIELDS[activity_type]:
+        value = activity.get(field)
+        if value is None or value == '' or value == []:
+            report(ERROR, 'missing_field', f"{activity_type} activity is missing '{field}'", activity=order)
+
+    if activity_type == 'multiple_choice':
+        options = activity.get('options')
+        if not isinstance(options, list):
+            # A missing list was reported above
+            if options is not None:
+                report(ERROR, 'invalid_options', f"options must be a list, not {type(options).__name__}",
+                       activity=order)
+            return
+        if len(options) < 2:
+            report(ERROR, 'too_few_options', f"Only {len(options)} option(s)", activity=order)
+        if len(set(map(str, options))) != len(options):
+            report(WARNING, 'duplicate_options', "Options contain duplicates", activity=order)
+        answer = activity.get('correct_answer')
+        if answer not in (None, '') and answer not in options:
+            report(ERROR, 'answer_not_in_options',
+                   f"correct_answer '{answer}' is not one of the options", activity=order)
+
+    elif activity_type == 'matching':
+        pairs = activity.get('pairs')
+        if isinstance(pairs, list):
+            for pair in pairs:
+                if not isinstance(pair, dict) or len([v for v in pair.values() if v]) < 2:
+                    report(ERROR, 'incomplete_pair', f"Matching pair {pair!r} needs two values", activity=order)
+
+
+def check_lesson(lesson, language: str, number: int, seen_titles: dict) -> list:
+    """Return the issues found in one lesson"""
+    issues = []
+    title = lesson.get('title') if isinstance(lesson, dict) else None
+
+    def report(severity, code, message, activity=None):
+        issues.append(_issue(severity, code, message, language, number, title, activity))
+
+    if not isinstance(lesson, dict):
+        report(ERROR, 'lesson_not_object', "Lesson is not an object")
+        return issues
+
+    for field in ('title', 'description', 'difficulty', 'xp_reward', 'content'):
+        if field not in lesson:
+            report(ERROR, 'missing_field', f"Lesson is missing '{field}'")
+
+    if 'difficulty' in lesson and lesson['difficulty'] not in DIFFICULTIES:
+        report(ERROR, 'invalid_difficulty',
+               f"difficulty '{lesson['difficulty']}' is not one of {', '.join(sorted(DIFFICULTIES))}")
+
+    xp_reward = lesson.get('xp_reward')
+    if 'xp_reward' in lesson and (not isinstance(xp_reward, int) or isinstance(xp_reward, bool) or xp_reward < 0):
+        report(ERROR, 'invalid_xp_reward', f"xp_reward {xp_reward!r} is not a non-negative integer")
+
+    content = lesson.get('content')
+    if 'content' in lesson and not isinstance(content, dict):
+        report(ERROR, 'invalid_content', "content is not an object")
+    elif isinstance(content, dict) and not isinstance(content.get('vocabulary', []), list):
+        report(ERROR, 'invalid_vocabulary', "content.vocabulary is not a list")
+
+    if title:
+        if title in seen_titles:
+            report(ERROR, 'duplicate_title', f"Title also used by lesson {seen_titles[title]}")
+        else:
+            seen_titles[title] = number
+
+    activities = lesson.get('activities', [])
+    if not isinstance(activities, list):
+        report(ERROR, 'invalid_activities', "activities is not a list")
+        return issues
+    if not activities:
+        report(WARNING, 'no_activities', "Lesson has no activities")
+
+    orders = [a.get('order') for a in activities if isinstance(a, dict)]
+    if orders and orders != list(range(1, len(activities) + 1)):
+        report(ERROR, 'bad_order_sequence',
+               f"Activity orders are {orders}, expected 1..{len(activities)} in sequence")
+
+    for position, activity in enumerate(activities, start=1):
+        check_activity(activity, position, report)
+
+    return issues
+
+
+def validate_file(path: str) -> dict:
+    """Validate one data file in a single streaming pass"""
+    started = time.perf_counter()
+    issues = []
+    lesson_count = 0
+    activity_count = 0
+    numbers = {}
+    seen_titles = {}
+
+    try:
+        for language, lesson in stream_all_lessons(path):
+            numbers[language] = numbers.get(language, 0) + 1
+            lesson_count += 1
+            if isinstance(lesson, dict) and isinstance(lesson.get('activities'), list):
+                activity_count += len(lesson['activities'])
+            issues.extend(check_lesson(lesson, language, numbers[language],
+                                       seen_titles.setdefault(language, {})))
+    except (OSError, LessonDataError) as e:
+        issues.append(_issue(ERROR, 'unreadable_file', str(e)))
+
+    return {
+        'path': path,
+        'languages': numbers,
+        'lessons': lesson_count,
+        'activities': activity_count,
+        'errors': sum(1 for issue in issues if issue['severity'] == ERROR),
+        'warnings': sum(1 for issue in issues if issue['severity'] == WARNING),
+        'issues': issues,
+        'seconds': round(time.perf_counter() - started, 4),
+    }
+
+
+def validate_files(paths: list, workers: int = None) -> dict:
+    """Validate several files in parallel and combine their results into one report"""
+    if workers == 1 or len(paths) <= 1:
+        results = [validate_file(path) for path in paths]
+    else:
+        # Imported here: multiprocessing is slow to import and single files do not need it
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(validate_file, paths))
+
+    return {
+        'files': results,
+        'summary': {
+            'files': len(results),
+            'lessons': sum(r['lessons'] for r in results),
+            'activities': sum(r['activities'] for r in results),
+            'errors': sum(r['errors'] for r in results),
+            'warnings': sum(r['warnings'] for r in results),
+        },
+    }
+
+
+def format_report(report: dict) -> str:
+    """Render a report for the console"""
+    lines = []
+    for result in report['files']:
+        name = os.path.basename(result['path'])
+        mark = '✗' if result['errors'] else '✓'
+        lines.append(f"{mark} {name}: {result['lessons']} lessons, {result['errors']} errors, "
+                     f"{result['warnings']} warnings")
+        for issue in result['issues']:
+            where = ' '.join(part for part in [
+                issue['language'] and f"[{issue['language']}]",
+                issue['lesson'] and f"lesson {issue['lesson']}",
+                issue['activity'] and f"activity {issue['activity']}",
+            ] if part)
+            lines.append(f"  {issue['severity']}: {where + ': ' if where else ''}{issue['message']} ({issue['code']})")
+    summary = report['summary']
+    lines.append(f"{summary['files']} files, {summary['lessons']} lessons, {summary['activities']} activities: "
+                 f"{summary['errors']} errors, {summary['warnings']} warnings")
+    return '\n'.join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Validate lesson data files")
+    parser.add_argument('paths', nargs='*', help="Data files to check (default: every data file in scripts/)")
+    parser.add_argument('--report', help="Write the machine-readable report to this file ('-' for stdout)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Files checked in parallel (default: one per CPU)")
+    parser.add_argument('--quiet', action='store_true', help="Only print the summary line")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    paths = args.paths or find_data_files()
+    report = validate_files(paths, args.workers)
+
+    if args.report == '-':
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        text = format_report(report)
+        print(text.splitlines()[-1] if args.quiet else text)
+        if args.report:
+            with open(args.report, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+
+    return 1 if report['summary']['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
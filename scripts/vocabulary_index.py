@@ -0,0 +1,525 @@
+"""
+Inverted index from words to the lessons, activities and reading texts that
+use them, one binary file per language.
+
+Words come from the vocabulary and phrases of each lesson, from the
+questions, answers, options and teaching text of its activities, and from
+the reading texts. They are split with the tokenizer of
+ingest_reading_texts.py, so the keys are the words the reading page makes
+clickable, plus every vocabulary item and phrase as a whole. English in
+questions and teaching text is left out: outside Chinese, words there are
+only indexed when they appear in the lesson vocabulary.
+
+Each word maps to a sorted posting list of documents:
+
+    lesson:3        the vocabulary or phrases of lesson 3
+    lesson:3:5      the activity with order 5 in lesson 3
+    text:<id>       a reading text (its id, or its title for JSONL input)
+
+Lessons are numbered as main.py seeds them, so the data file of a language
+must be the one that is seeded. The index files in public/vocabulary-index/
+are committed, so deployments serve them without running this script;
+rebuild and commit them after changing lesson data.
+
+File format (`<language>.vix`, little endian), read with mmap by
+`VocabularyIndex` and with a DataView by src/lib/vocabulary-index.ts:
+
+    header    magic "VOCX", version, slot/word/document counts, section offsets
+    slots     open-addressing table: (FNV-1a hash, word number + 1), 0 = empty
+    words     (string offset, string length, postings offset, postings count)
+    docs      (string offset, string length)
+    postings  document numbers (uint32)
+    strings   UTF-8 words and document keys
+
+A lookup hashes the word, probes the slot table linearly and compares one or
+two stored words, so it takes constant time whatever the catalog size.
+
+Every source (data file, JSONL file of reading texts, the reading_texts
+table) is scanned into a part cached in scripts/.vocabulary_index/. A
+rebuild only rescans sources that changed since their part was written, and
+only rewrites the files of languages whose parts changed.
+
+Usage:
+    python vocabulary_index.py build
+    python vocabulary_index.py build --database --texts texts/chinese.jsonl
+    python vocabulary_index.py lookup 你好 --language zh
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+import unicodedata
+from typing import TYPE_CHECKING
+
+from lesson_loader import DATA_FILES, SCRIPT_DIR, LessonDataError, resolve_data_file, stream_all_lessons
+
+OUTPUT_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), 'public', 'vocabulary-index')
+PARTS_DIR = os.path.join(SCRIPT_DIR, '.vocabulary_index')
+PART_VERSION = 1
+
+MAGIC = b'VOCX'
+FORMAT_VERSION = 1
+# magic, version, reserved, slot count, word count, document count,
+# then the offsets of the words, docs, postings and strings sections
+HEADER = struct.Struct('<4sHHIIIIIII')
+SLOT = struct.Struct('<II')
+WORD = struct.Struct('<IIII')
+DOC = struct.Struct('<II')
+POSTING = struct.Struct('<I')
+
+DATABASE_SOURCE = 'database:reading_texts'
+
+if TYPE_CHECKING:
+    from ingest_reading_texts import Tokenizer
+
+
+def normalize(word: str) -> str:
+    return unicodedata.normalize('NFC', word).strip().lower()
+
+
+def fnv1a(data: bytes) -> int:
+    """32-bit FNV-1a; src/lib/vocabulary-index.ts computes the same hash"""
+    value = 0x811C9DC5
+    for byte in data:
+        value = ((value ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return value
+
+
+def document_order(key: str) -> tuple:
+    kind, _, rest = key.partition(':')
+    if kind == 'lesson':
+        numbers = [int(part) for part in rest.split(':')]
+        return (0, numbers[0], numbers[1] if len(numbers) > 1 else -1, '')
+    return (1, 0, 0, rest)
+
+
+# -- scanning ------------------------------------------------------------------
+
+class Postings:
+    """{language: {word: set of document keys}} for one source"""
+
+    def __init__(self, tokenizer: 'Tokenizer'):
+        self.tokenizer = tokenizer
+        self.languages = {}
+
+    def add(self, language: str, text, document: str, vocabulary_only: bool = False, whole: bool = False):
+        if not isinstance(text, str) or not text.strip():
+            return
+        words = self.languages.setdefault(language, {})
+        if whole:
+            words.setdefault(normalize(text), set()).add(document)
+        known = self.tokenizer.known.get(language, set())
+        for word in self.tokenizer.words(language, self.tokenizer.split(language, text)):
+            word = normalize(word)
+            # Outside Chinese, questions and teaching text are mostly English
+            if vocabulary_only and language != 'zh' and word not in known:
+                continue
+            words.setdefault(word, set()).add(document)
+
+    def to_json(self) -> dict:
+        return {language: {word: sorted(documents, key=document_order) for word, documents in words.items()}
+                for language, words in self.languages.items()}
+
+
+def scan_data_file(path: str, tokenizer: 'Tokenizer') -> dict:
+    from ingest_reading_texts import HAN
+
+    postings = Postings(tokenizer)
+    numbers = {}
+    for language, lesson in stream_all_lessons(path):
+        numbers[language] = numbers.get(language, 0) + 1
+        if not isinstance(lesson, dict):
+            continue
+        number = numbers[language]
+        content = lesson.get('content') if isinstance(lesson.get('content'), dict) else {}
+        items = [item for item in content.get('vocabulary', []) + content.get('phrases', []) if isinstance(item, str)]
+        for item in items:
+            postings.add(language, item, f"lesson:{number}", whole=True)
+
+        for activity in lesson.get('activities', []):
+            if not isinstance(activity, dict):
+                continue
+            document = f"lesson:{number}:{activity.get('order')}"
+            kind = activity.get('type')
+            answer = activity.get('correct_answer')
+            answers = answer if isinstance(answer, list) else [answer]
+            postings.add(language, activity.get('question'), document, vocabulary_only=True)
+            if kind == 'teaching':
+                postings.add(language, activity.get('title'), document, vocabulary_only=True)
+                postings.add(language, activity.get('content'), document, vocabulary_only=True)
+            elif kind == 'written':
+                # Written activities always ask for the language being learned
+                for text in answers + list(activity.get('accepted_answers', [])):
+                    postings.add(language, text, document, whole=True)
+            elif kind == 'multiple_choice':
+                # Options are foreign when the answer is (otherwise they are English meanings)
+                foreign = any(isinstance(a, str) and (a in items or HAN.search(a)) for a in answers)
+                for option in activity.get('options', []):
+                    postings.add(language, option, document, vocabulary_only=not foreign, whole=foreign)
+            elif kind == 'matching':
+                for pair in activity.get('pairs', []):
+                    if isinstance(pair, dict):
+                        for side in pair.values():
+                            postings.add(language, side, document, vocabulary_only=True)
+    return postings.to_json()
+
+
+def scan_texts(passages, tokenizer: 'Tokenizer') -> dict:
+    postings = Postings(tokenizer)
+    for passage in passages:
+        document = f"text:{passage.get('id') or passage['title']}"
+        tokens = passage.get('tokens')
+        if tokens:
+            # Already split by ingest_reading_texts.py
+            words = postings.languages.setdefault(passage['language_code'], {})
+            for word in tokenizer.words(passage['language_code'], tokens):
+                words.setdefault(normalize(word), set()).add(document)
+        else:
+            postings.add(passage['language_code'], passage['content'], document)
+    return postings.to_json()
+
+
+def jsonl_texts(path: str):
+    """The reading texts of a JSONL file in the format ingest_reading_texts.py reads"""
+    from ingest_reading_texts import read_jsonl
+
+    for location, line in read_jsonl([path]):
+        try:
+            passage = json.loads(line)
+        except ValueError as e:
+            raise LessonDataError(f"{location}: invalid JSON ({e})") from None
+        if not isinstance(passage, dict) or not passage.get('language_code') or not passage.get('content'):
+            raise LessonDataError(f"{location}: a reading text needs language_code and content")
+        passage.setdefault('title', location)
+        yield passage
+
+
+def database_texts(page_size: int = 200):
+    """The reading texts stored in Supabase"""
+    from supabase_client import get_client
+
+    after = None
+    while True:
+        query = (get_client().table('reading_texts').select('id, language_code, title, content, tokens')
+                 .order('id').limit(page_size))
+        if after is not None:
+            query = query.gt('id', after)
+        rows = query.execute().data or []
+        yield from rows
+        if len(rows) < page_size:
+            return
+        after = rows[-1]['id']
+
+
+# -- parts -----------------------------------------------------------------------
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def tokenizer_fingerprint(vocabulary: dict) -> str:
+    """
+    Changes whenever the tokenizer could split or filter words differently.
+    Computed without building the tokenizer, which is slow to load with jieba.
+    """
+    from ingest_reading_texts import jieba
+
+    state = {'tokenizer': 'jieba' if jieba is not None else 'max-match',
+             'vocabulary': {language: sorted(words) for language, words in sorted(vocabulary.items())}}
+    return hashlib.sha256(json.dumps(state, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def parts_directory(output: str) -> str:
+    """Parts are kept per output directory, since a build prunes the parts of sources it no longer has"""
+    return os.path.join(PARTS_DIR, hashlib.sha1(os.path.abspath(output).encode('utf-8')).hexdigest()[:12])
+
+
+def part_path(parts_dir: str, source: str) -> str:
+    return os.path.join(parts_dir, hashlib.sha1(source.encode('utf-8')).hexdigest()[:16] + '.json')
+
+
+def load_part(path: str):
+    try:
+        with open(path, encoding='utf-8') as f:
+            part = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return part if part.get('version') == PART_VERSION else None
+
+
+def save_part(path: str, part: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = path + '.tmp'
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(part, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temporary, path)
+
+
+def fresh_part(part, source: str, tokenizer_hash: str):
+    """The cached part if its source has not changed since it was written, else None"""
+    if part is None or part['source'] != source or part['tokenizer'] != tokenizer_hash:
+        return None
+    stat = os.stat(source)
+    if [stat.st_size, stat.st_mtime_ns] == part['stat']:
+        return part
+    # Touched but not edited: keep the part and remember the new timestamp
+    if file_sha256(source) == part['sha256']:
+        part['stat'] = [stat.st_size, stat.st_mtime_ns]
+        return part
+    return None
+
+
+# -- binary index -----------------------------------------------------------------
+
+def encode_index(words: dict) -> bytes:
+    """The binary index of {word: document keys sorted by document_order}"""
+    documents = sorted({document for keys in words.values() for document in keys}, key=document_order)
+    numbers = {document: number for number, document in enumerate(documents)}
+    ordered = sorted(words)
+
+    slot_count = 1
+    while slot_count < 2 * max(1, len(ordered)):
+        slot_count *= 2
+    slots = bytearray(SLOT.size * slot_count)
+    strings = bytearray()
+    word_table = bytearray()
+    postings = bytearray()
+    for number, word in enumerate(ordered):
+        encoded = word.encode('utf-8')
+        hashed = fnv1a(encoded)
+        slot = hashed & (slot_count - 1)
+        while SLOT.unpack_from(slots, slot * SLOT.size)[1]:
+            slot = (slot + 1) & (slot_count - 1)
+        SLOT.pack_into(slots, slot * SLOT.size, hashed, number + 1)
+        keys = words[word]
+        word_table += WORD.pack(len(strings), len(encoded), len(postings) // POSTING.size, len(keys))
+        strings += encoded
+        postings += struct.pack(f'<{len(keys)}I', *(numbers[key] for key in keys))
+
+    doc_table = bytearray()
+    for document in documents:
+        encoded = document.encode('utf-8')
+        doc_table += DOC.pack(len(strings), len(encoded))
+        strings += encoded
+
+    words_offset = HEADER.size + len(slots)
+    docs_offset = words_offset + len(word_table)
+    postings_offset = docs_offset + len(doc_table)
+    strings_offset = postings_offset + len(postings)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, 0, slot_count, len(ordered), len(documents),
+                         words_offset, docs_offset, postings_offset, strings_offset)
+    return b''.join([header, slots, word_table, doc_table, postings, strings])
+
+
+def write_index(path: str, words: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(encode_index(words))
+    os.replace(temporary, path)
+
+
+class VocabularyIndex:
+    """Read-only view of one language's index file, memory-mapped"""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, _, self.slot_count, self.word_count, self.doc_count, self.words_offset,
+         self.docs_offset, self.postings_offset, self.strings_offset) = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.data.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} vocabulary index")
+
+    @classmethod
+    def for_language(cls, language: str, directory: str = OUTPUT_DIR) -> 'VocabularyIndex':
+        return cls(os.path.join(directory, f'{language}.vix'))
+
+    def __len__(self):
+        return self.word_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.data.close()
+
+    def _string(self, offset: int, length: int) -> bytes:
+        start = self.strings_offset + offset
+        return self.data[start:start + length]
+
+    def lookup(self, word: str) -> list:
+        """Keys of the documents that contain a word (empty when it is not indexed)"""
+        encoded = normalize(word).encode('utf-8')
+        hashed = fnv1a(encoded)
+        mask = self.slot_count - 1
+        slot = hashed & mask
+        while True:
+            stored_hash, number = SLOT.unpack_from(self.data, HEADER.size + slot * SLOT.size)
+            if not number:
+                return []
+            if stored_hash == hashed:
+                offset, length, first, count = WORD.unpack_from(self.data, self.words_offset + (number - 1) * WORD.size)
+                if self._string(offset, length) == encoded:
+                    documents = struct.unpack_from(f'<{count}I', self.data, self.postings_offset + first * POSTING.size)
+                    return [self.document(document) for document in documents]
+            slot = (slot + 1) & mask
+
+    def document(self, number: int) -> str:
+        offset, length = DOC.unpack_from(self.data, self.docs_offset + number * DOC.size)
+        return self._string(offset, length).decode('utf-8')
+
+
+# -- build -----------------------------------------------------------------------
+
+def build(data_files: list, text_files: list = (), database: bool = False, output: str = OUTPUT_DIR,
+          force: bool = False) -> dict:
+    """
+    Rescan the sources that changed and rewrite the index files they affect.
+
+    Returns:
+        Dict with the sources rescanned and reused, and the words written per language
+    """
+    # Imported here so that lookups and --help do not import jieba
+    from ingest_reading_texts import Tokenizer, lesson_vocabulary
+
+    parts_dir = parts_directory(output)
+    vocabulary = lesson_vocabulary()
+    tokenizer_hash = tokenizer_fingerprint(vocabulary)
+    tokenizer = None
+    data_files = [os.path.abspath(path) for path in data_files]
+    text_files = [os.path.abspath(path) for path in text_files]
+    sources = data_files + text_files
+    if database:
+        sources.append(DATABASE_SOURCE)
+
+    parts, changed = {}, set()
+    seen = {}
+    stats = {'rescanned': [], 'reused': [], 'languages': {}}
+    for source in sources:
+        path = part_path(parts_dir, source)
+        previous = load_part(path)
+        stamp = (previous or {}).get('stat')
+        part = None if force or source == DATABASE_SOURCE else fresh_part(previous, source, tokenizer_hash)
+        if part is None:
+            tokenizer = tokenizer or Tokenizer(vocabulary)
+            if source == DATABASE_SOURCE:
+                postings = scan_texts(database_texts(), tokenizer)
+                part = {'version': PART_VERSION, 'source': source, 'tokenizer': tokenizer_hash, 'postings': postings}
+            else:
+                stat = os.stat(source)
+                postings = (scan_texts(jsonl_texts(source), tokenizer) if source in text_files
+                            else scan_data_file(source, tokenizer))
+                part = {'version': PART_VERSION, 'source': source, 'tokenizer': tokenizer_hash,
+                        'stat': [stat.st_size, stat.st_mtime_ns], 'sha256': file_sha256(source),
+                        'postings': postings}
+            if force or previous is None or previous.get('postings') != part['postings']:
+                changed.update(part['postings'])
+                changed.update((previous or {}).get('postings', {}))
+            stats['rescanned'].append(source)
+        else:
+            stats['reused'].append(source)
+        if source in data_files:
+            for language in part['postings']:
+                if seen.setdefault(language, source) != source:
+                    raise LessonDataError(f"'{language}' lessons are in both {seen[language]} and {source}; "
+                                          "lessons are numbered per data file, so use one file per language")
+        if part is not previous or part.get('stat') != stamp:
+            save_part(path, part)
+        parts[source] = part
+
+    # Parts of sources that are no longer indexed
+    if os.path.isdir(parts_dir):
+        current = {part_path(parts_dir, source) for source in sources}
+        for name in os.listdir(parts_dir):
+            path = os.path.join(parts_dir, name)
+            if name.endswith('.json') and path not in current:
+                changed.update((load_part(path) or {}).get('postings', {}))
+                os.remove(path)
+
+    languages = sorted({language for part in parts.values() for language in part['postings']})
+    for language in languages:
+        target = os.path.join(output, f'{language}.vix')
+        if language not in changed and os.path.exists(target):
+            continue
+        words = {}
+        for part in parts.values():
+            for word, documents in part['postings'].get(language, {}).items():
+                words.setdefault(word, set()).update(documents)
+        write_index(target, {word: sorted(documents, key=document_order) for word, documents in words.items()})
+        stats['languages'][language] = len(words)
+    # Languages that no source has any more
+    for language in changed - set(languages):
+        target = os.path.join(output, f'{language}.vix')
+        if os.path.exists(target):
+            os.remove(target)
+    return stats
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build and query the vocabulary inverted index")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = commands.add_parser('build', help="Build the index files, rescanning changed sources only")
+    build_parser.add_argument('data_files', nargs='*',
+                              help="Lesson data files (default: the file main.py seeds for each language)")
+    build_parser.add_argument('--texts', nargs='+', default=[], metavar='JSONL',
+                              help="JSONL files of reading texts, as read by ingest_reading_texts.py")
+    build_parser.add_argument('--database', action='store_true',
+                              help="Also index the reading texts in the reading_texts table")
+    build_parser.add_argument('--output', default=OUTPUT_DIR, help="Directory of the index files "
+                              "(default: public/vocabulary-index)")
+    build_parser.add_argument('--force', action='store_true', help="Rescan every source and rewrite every index file")
+
+    lookup_parser = commands.add_parser('lookup', help="List the documents that contain a word")
+    lookup_parser.add_argument('word')
+    lookup_parser.add_argument('--language', required=True, help="Language code, e.g. zh")
+    lookup_parser.add_argument('--output', default=OUTPUT_DIR, help="Directory of the index files")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == 'lookup':
+        try:
+            index = VocabularyIndex.for_language(args.language, args.output)
+        except (OSError, ValueError) as e:
+            print(f"✗ {str(e)}")
+            return 1
+        with index:
+            started = time.perf_counter()
+            documents = index.lookup(args.word)
+            elapsed = (time.perf_counter() - started) * 1e6
+        for document in documents:
+            print(f"  {document}")
+        print(f"\n✓ '{args.word}' is in {len(documents)} documents ({len(index)} words indexed, {elapsed:.0f} µs)")
+        return 0
+
+    data_files = args.data_files or [resolve_data_file(code) for code in DATA_FILES]
+    started = time.perf_counter()
+    try:
+        stats = build(data_files, args.texts, args.database, args.output, force=args.force)
+    except (OSError, LessonDataError) as e:
+        print(f"✗ {str(e)}")
+        return 1
+    elapsed = time.perf_counter() - started
+    for language, count in sorted(stats['languages'].items()):
+        print(f"✓ Wrote {language}.vix ({count} words)")
+    print(f"\n✓ {len(stats['rescanned'])} sources scanned, {len(stats['reused'])} unchanged, "
+          f"{len(stats['languages'])} index files written in {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,34 @@
 import { NextRequest, NextResponse } from 'next/server';
+import { createServerClient } from '@/lib/supabase-server';
+
+// Same key normalization as scripts/prewarm_translations.py
+function cacheKey(text: string) {
+  return text.normalize('NFC').replace(/\s+/g, ' ').trim();
+}
+
+async function cachedTranslation(word: string, sourceLang: string, targetLang: string) {
+  try {
+    const { data, error } = await createServerClient()
+      .from('translation_cache')
+      .select('translation')
+      .eq('source_lang', sourceLang)
+      .eq('target_lang', targetLang)
+      .eq('text', cacheKey(word))
+      // Placeholders from the local stand-in of prewarm_translations.py are not translations
+      .neq('backend', 'local')
+      .maybeSingle();
+
+    if (error) {
+      console.error('Translation cache error:', error);
+      return null;
+    }
+    return data?.translation ?? null;
+  } catch (error) {
+    // A cache failure should never stop the translation itself
+    console.error('Translation cache error:', error);
+    return null;
+  }
+}
 
 export async function POST(request: NextRequest) {
   try {
@@ -11,10 +41,12 @@ export async function POST(request: NextRequest) {
       );
     }
 
-    // Use a translation API (e.g., Google Translate, DeepL, or LibreTranslate)
-    // For now, using a simple mock translation
-    // You should replace this with an actual translation API
-    
+    const cached = await cachedTranslation(word, sourceLang, targetLang);
+    if (cached) {
+      return NextResponse.json({ translation: cached });
+    }
+
+    // Not prewarmed yet: use a translation API (e.g., Google Translate, DeepL, or LibreTranslate)
     const response = await fetch(
       `https://translate.googleapis.com/translate_a/single?client=gtx&sl=${sourceLang}&tl=${targetLang}&dt=t&q=${encodeURIComponent(word)}`
     );
@@ -35,7 +35,8 @@ export default function ChatPage() {
       await playStreamingAudio(
         text,
         () => setSpeakingMessageId(messageId),
-        () => setSpeakingMessageId(null)
+        () => setSpeakingMessageId(null),
+        userProfile?.learning_language
       );
     } catch (error) {
       console.error('Error playing audio:', error);
@@ -6,6 +6,8 @@ import { useRouter, useParams } from 'next/navigation';
 import { User } from '@supabase/supabase-js';
 import { SourceTextModule } from 'vm';
 import { set } from '@elevenlabs/elevenlabs-js/core/schemas';
+import { AnswerKeys, answerKeysFor, isCorrectAnswer } from '@/lib/answer-grading';
+import { playStreamingAudio, stopAudio } from '@/lib/tts';
 
 interface Lesson {
   id: string;
@@ -15,7 +17,11 @@ interface Lesson {
   description: string | null;
   difficulty: 'easy' | 'medium' | 'hard';
   xp_reward: number;
-  content: { activities?: Activity[]; vocabulary?: Array<{ word: string; translation: string }> };
+  content: {
+    activities?: Activity[];
+    vocabulary?: Array<string | { word: string; translation: string }>;
+    phrases?: string[];
+  };
   is_published: boolean;
 }
 
@@ -27,6 +33,7 @@ interface Activity {
   content?: string;
   options?: string[];
   correct_answer?: string | string[];
+  answer_keys?: AnswerKeys;
   hint?: string;
   explanation?: string;
   pairs?: { spanish: string; english: string }[];
@@ -54,11 +61,39 @@ export default function LessonPage() {
   const [correctAnswers, setCorrectAnswers] = useState<{ [key: number]: boolean }>({});
   const [writtenAnswer, setWrittenAnswer] = useState('');
   const [showHint, setShowHint] = useState(false);
+  const [speakingText, setSpeakingText] = useState<string | null>(null);
 
   useEffect(() => {
     loadLesson();
   }, [lessonId]);
 
+  useEffect(() => () => stopAudio(), []);
+
+  // Teaching text, vocabulary and phrases are pre-rendered by scripts/prerender_audio.py,
+  // so they play without waiting for ElevenLabs
+  async function speak(text: string) {
+    try {
+      await playStreamingAudio(
+        text,
+        () => setSpeakingText(text),
+        () => setSpeakingText(null),
+        userProfile?.learning_language || undefined
+      );
+    } catch (error) {
+      console.error('Error playing audio:', error);
+      setSpeakingText(null);
+    }
+  }
+
+  // Vocabulary and phrases of the lesson that a teaching activity mentions
+  function spokenItems(activity: Activity) {
+    const items = [
+      ...(lesson?.content?.vocabulary || []).map(v => (typeof v === 'string' ? v : v.word)),
+      ...(lesson?.content?.phrases || []),
+    ];
+    return items.filter(item => item && activity.content?.includes(item));
+  }
+
   async function loadLesson() {
     try {
       const { data: { user } } = await supabase.auth.getUser();
@@ -275,8 +310,8 @@ export default function LessonPage() {
     checkIfLessonCompleted(activityIndex + 1);
   }
 
-  function handleWrittenAnswer(activityIndex: number, userAnswer: string, correctAnswer: string) {
-    const isCorrect = userAnswer.toLowerCase().trim() === correctAnswer.toLowerCase().trim();
+  function handleWrittenAnswer(activityIndex: number, userAnswer: string, activity: Activity) {
+    const isCorrect = isCorrectAnswer(userAnswer, activity.answer_keys || answerKeysFor(activity.correct_answer));
     const newCorrectAnswers = { ...correctAnswers, [activityIndex]: isCorrect };
     
     setShowResult({ ...showResult, [activityIndex]: true });
@@ -510,9 +545,34 @@ export default function LessonPage() {
                                 {activity.content}
                               </div>
                             </div>
+                            {activity.content && (
+                              <button
+                                onClick={() => speak(activity.content!)}
+                                disabled={speakingText !== null}
+                                className="mt-4 text-indigo-600 hover:text-indigo-700 font-medium disabled:opacity-50"
+                              >
+                                {speakingText === activity.content ? '🔊 Playing...' : '🔊 Listen'}
+                              </button>
+                            )}
                           </div>
+                          {spokenItems(activity).length > 0 && (
+                            <div className="flex flex-wrap gap-2">
+                              {spokenItems(activity).map(item => (
+                                <button
+                                  key={item}
+                                  onClick={() => speak(item)}
+                                  disabled={speakingText !== null}
+                                  className="px-3 py-1 rounded-full border border-indigo-200 bg-white text-gray-800 hover:bg-indigo-50 disabled:opacity-50"
+                                >
+                                  {speakingText === item ? '🔊' : '🔈'} {item}
+                                </button>
+                              ))}
+                            </div>
+                          )}
                           <button
                             onClick={() => {
+                              stopAudio();
+                              setSpeakingText(null);
                               setCorrectAnswers({ ...correctAnswers, [currentActivityIndex]: true });
                               console.log(`Activity ${currentActivityIndex + 1} completed! (Teaching activity)`);
                               handleNextActivity();
@@ -583,7 +643,7 @@ export default function LessonPage() {
                           />
                           {!hasAnswered && (
                             <button
-                              onClick={() => handleWrittenAnswer(currentActivityIndex, writtenAnswer, Array.isArray(activity.correct_answer) ? activity.correct_answer[0] : (activity.correct_answer || ''))}
+                              onClick={() => handleWrittenAnswer(currentActivityIndex, writtenAnswer, activity)}
                               disabled={!writtenAnswer.trim()}
                               className="bg-indigo-600 text-white px-6 py-2 rounded-lg hover:bg-indigo-700 transition-colors disabled:bg-gray-400 disabled:cursor-not-allowed"
                             >
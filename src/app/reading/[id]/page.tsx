@@ -2,6 +2,7 @@
 
 import { useEffect, useState } from 'react';
 import { supabase } from '@/lib/supabase';
+import { findLessonsForWord } from '@/lib/vocabulary-index';
 import { useRouter, useParams } from 'next/navigation';
 import { User } from '@supabase/supabase-js';
 
@@ -14,6 +15,17 @@ interface ReadingText {
   word_count: number | null;
   category: string | null;
   source: string | null;
+  tokens?: string[] | null;
+}
+
+// Tokens precomputed by scripts/ingest_reading_texts.py (words for Chinese),
+// or the text split on the fly for texts that have not been tokenized yet
+function getTokens(text: ReadingText | null): string[] {
+  if (!text) return [];
+  if (text.tokens && text.tokens.length > 0) return text.tokens;
+  return text.language_code === 'zh'
+    ? text.content.split('') // Split by characters for Chinese
+    : text.content.match(/[a-zA-Z\u00C0-\u00FF\u0100-\u017F]+|\s+|[^a-zA-Z\u00C0-\u00FF\u0100-\u017F\s]+/g) || []; // Match words with accents, spaces, and other characters
 }
 
 interface UserProfile {
@@ -38,6 +50,7 @@ export default function ReadingTextPage() {
   const [wordPosition, setWordPosition] = useState<{ x: number; y: number } | null>(null);
   const [showInstruction, setShowInstruction] = useState(true);
   const [translationCache, setTranslationCache] = useState<Record<string, string>>({});
+  const [taughtInLessons, setTaughtInLessons] = useState<number[]>([]);
   const router = useRouter();
   const params = useParams();
   const textId = params.id as string;
@@ -148,7 +161,7 @@ export default function ReadingTextPage() {
     let newWord: string = '';
 
     if (isChinese) {
-      // For Chinese, keep the character-by-character selection behavior
+      // For Chinese, adjacent words (or characters) can be combined
       const isAdjacent = selectedIndices.length > 0 && 
         (selectedIndices.includes(index - 1) || selectedIndices.includes(index + 1));
 
@@ -156,8 +169,8 @@ export default function ReadingTextPage() {
         // Add to selection
         newIndices = [...selectedIndices, index].sort((a, b) => a - b);
         
-        // Build the combined word from all selected characters
-        const chars = readingText?.content.split('') || [];
+        // Build the combined word from all selected tokens
+        const chars = getTokens(readingText);
         newWord = newIndices.map(i => chars[i]).join('').replace(/[。，、！？；：""''（）【】《》…—]/g, '').trim();
       } else {
         // Start new selection
@@ -166,7 +179,7 @@ export default function ReadingTextPage() {
       }
     } else {
       // For other languages, handle word grouping
-      const tokens = readingText?.content.match(/[a-zA-Z\u00C0-\u00FF\u0100-\u017F]+|\s+|[^a-zA-Z\u00C0-\u00FF\u0100-\u017F\s]+/g) || [];
+      const tokens = getTokens(readingText);
       
       // Find all word indices (excluding spaces and punctuation)
       const wordIndices = tokens.map((token, idx) => 
@@ -203,6 +216,10 @@ export default function ReadingTextPage() {
 
     setSelectedIndices(newIndices);
     setSelectedWord(newWord);
+    setTaughtInLessons([]);
+    if (readingText) {
+      findLessonsForWord(newWord, readingText.language_code).then(setTaughtInLessons);
+    }
 
     // Calculate position (use the last clicked word's position)
     const rect = (event.target as HTMLElement).getBoundingClientRect();
@@ -443,13 +460,10 @@ export default function ReadingTextPage() {
           <div className="relative reading-content-container">
             <div className="text-lg md:text-xl leading-relaxed text-gray-800 space-y-4">
               {(() => {
-                const content = readingText?.content || '';
                 const isChinese = readingText?.language_code === 'zh';
                 
                 // Split content based on language
-                const tokens = isChinese
-                  ? content.split('') // Split by characters for Chinese
-                  : content.match(/[a-zA-Z\u00C0-\u00FF\u0100-\u017F]+|\s+|[^a-zA-Z\u00C0-\u00FF\u0100-\u017F\s]+/g) || []; // Match words with accents, spaces, and other characters
+                const tokens = getTokens(readingText);
                 
                 return tokens.map((token, index) => {
                   // For Chinese: check if it's a valid character
@@ -508,6 +522,11 @@ export default function ReadingTextPage() {
                   ) : (
                     <div className="text-sm text-gray-200">{translation}</div>
                   )}
+                  {taughtInLessons.length > 0 && (
+                    <div className="text-xs text-gray-400 mt-2">
+                      Taught in Lesson{taughtInLessons.length > 1 ? 's' : ''} {taughtInLessons.join(', ')}
+                    </div>
+                  )}
                   <div className="absolute bottom-0 left-1/2 transform -translate-x-1/2 translate-y-full">
                     <div className="border-8 border-transparent border-t-gray-900"></div>
                   </div>
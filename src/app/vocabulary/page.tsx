@@ -4,6 +4,8 @@ import { useEffect, useState } from 'react';
 import { supabase } from '@/lib/supabase';
 import { useRouter } from 'next/navigation';
 import { User } from '@supabase/supabase-js';
+import { scheduleReview } from '@/lib/review-schedule';
+import { playStreamingAudio, stopAudio } from '@/lib/tts';
 
 interface VocabularyWord {
   id: string;
@@ -11,8 +13,16 @@ interface VocabularyWord {
   language_code: string;
   learned_at: string;
   times_reviewed: number;
+  ease_factor: number;
+  interval_days: number;
+  repetitions: number;
+  scheduled_reviews: number;
+  next_review_at: string | null;
 }
 
+// Flashcards shown per review session
+const DUE_CARD_LIMIT = 50;
+
 interface UserProfile {
   id: string;
   learning_language: string | null;
@@ -22,6 +32,7 @@ export default function VocabularyPage() {
   const [user, setUser] = useState<User | null>(null);
   const [userProfile, setUserProfile] = useState<UserProfile | null>(null);
   const [vocabulary, setVocabulary] = useState<VocabularyWord[]>([]);
+  const [dueWords, setDueWords] = useState<VocabularyWord[]>([]);
   const [loading, setLoading] = useState(true);
   const [flashcardMode, setFlashcardMode] = useState(false);
   const [currentCardIndex, setCurrentCardIndex] = useState(0);
@@ -29,12 +40,26 @@ export default function VocabularyPage() {
   const [translation, setTranslation] = useState<string>('');
   const [loadingTranslation, setLoadingTranslation] = useState(false);
   const [showCelebration, setShowCelebration] = useState(false);
+  const [speaking, setSpeaking] = useState(false);
   const router = useRouter();
+  // Review the due words, or every word when none are due
+  const deck = dueWords.length > 0 ? dueWords : vocabulary;
 
   useEffect(() => {
     loadVocabulary();
+    return () => stopAudio();
   }, []);
 
+  // Lesson vocabulary is pre-rendered by scripts/prerender_audio.py, so it plays without streaming
+  async function speakWord(word: VocabularyWord) {
+    try {
+      await playStreamingAudio(word.word, () => setSpeaking(true), () => setSpeaking(false), word.language_code);
+    } catch (error) {
+      console.error('Error playing audio:', error);
+      setSpeaking(false);
+    }
+  }
+
   async function loadVocabulary() {
     try {
       const { data: { user } } = await supabase.auth.getUser();
@@ -72,6 +97,23 @@ export default function VocabularyPage() {
       } else {
         setVocabulary(vocabData || []);
       }
+
+      // Flashcards show the words due for review. Reviewing a card schedules its next review;
+      // new words have no next_review_at yet and are due right away.
+      const { data: dueData, error: dueError } = await supabase
+        .from('user_vocabulary')
+        .select('*')
+        .eq('user_id', user.id)
+        .eq('language_code', profile.learning_language)
+        .or(`next_review_at.is.null,next_review_at.lte.${new Date().toISOString()}`)
+        .order('next_review_at', { ascending: true, nullsFirst: true })
+        .limit(DUE_CARD_LIMIT);
+
+      if (dueError) {
+        console.error('Error fetching due words:', dueError);
+      } else {
+        setDueWords(dueData || []);
+      }
     } catch (error) {
       console.error('Error loading vocabulary:', error);
     } finally {
@@ -114,12 +156,12 @@ export default function VocabularyPage() {
   }
 
   function startFlashcards() {
-    if (vocabulary.length === 0) return;
+    if (deck.length === 0) return;
     setFlashcardMode(true);
     setCurrentCardIndex(0);
     setIsFlipped(false);
     setShowCelebration(false);
-    fetchTranslation(vocabulary[0].word, vocabulary[0].language_code);
+    fetchTranslation(deck[0].word, deck[0].language_code);
   }
 
   function exitFlashcards() {
@@ -131,11 +173,11 @@ export default function VocabularyPage() {
   }
 
   function nextCard() {
-    if (currentCardIndex < vocabulary.length - 1) {
+    if (currentCardIndex < deck.length - 1) {
       const nextIndex = currentCardIndex + 1;
       setCurrentCardIndex(nextIndex);
       setIsFlipped(false);
-      fetchTranslation(vocabulary[nextIndex].word, vocabulary[nextIndex].language_code);
+      fetchTranslation(deck[nextIndex].word, deck[nextIndex].language_code);
     }
   }
 
@@ -144,7 +186,7 @@ export default function VocabularyPage() {
       const prevIndex = currentCardIndex - 1;
       setCurrentCardIndex(prevIndex);
       setIsFlipped(false);
-      fetchTranslation(vocabulary[prevIndex].word, vocabulary[prevIndex].language_code);
+      fetchTranslation(deck[prevIndex].word, deck[prevIndex].language_code);
     }
   }
 
@@ -153,20 +195,22 @@ export default function VocabularyPage() {
   }
 
   async function markAsReviewed() {
-    const currentWord = vocabulary[currentCardIndex];
+    const currentWord = deck[currentCardIndex];
     try {
+      const schedule = scheduleReview(currentWord);
       await supabase
         .from('user_vocabulary')
-        .update({ times_reviewed: currentWord.times_reviewed + 1 })
+        .update(schedule)
         .eq('id', currentWord.id);
 
       // Update local state
-      const updatedVocab = [...vocabulary];
-      updatedVocab[currentCardIndex].times_reviewed += 1;
-      setVocabulary(updatedVocab);
+      const reviewed = (words: VocabularyWord[]) =>
+        words.map(word => (word.id === currentWord.id ? { ...word, ...schedule } : word));
+      setVocabulary(reviewed);
+      setDueWords(reviewed);
 
       // Check if this was the last card
-      if (currentCardIndex === vocabulary.length - 1) {
+      if (currentCardIndex === deck.length - 1) {
         setShowCelebration(true);
       }
     } catch (error) {
@@ -186,8 +230,8 @@ export default function VocabularyPage() {
   }
 
   // Flashcard Mode View
-  if (flashcardMode && vocabulary.length > 0) {
-    const currentWord = vocabulary[currentCardIndex];
+  if (flashcardMode && deck.length > 0) {
+    const currentWord = deck[currentCardIndex];
     
     // Celebration Screen
     if (showCelebration) {
@@ -204,7 +248,7 @@ export default function VocabularyPage() {
                 You did it! 🌟
               </p>
               <p className="text-xl text-gray-600">
-                You&apos;ve reviewed all {vocabulary.length} words!
+                You&apos;ve reviewed all {deck.length} words!
               </p>
             </div>
 
@@ -222,7 +266,7 @@ export default function VocabularyPage() {
               <h2 className="text-2xl font-bold text-gray-800 mb-4">Session Complete!</h2>
               <div className="grid grid-cols-2 gap-4 text-center">
                 <div className="bg-gradient-to-br from-blue-50 to-indigo-50 rounded-2xl p-6">
-                  <div className="text-4xl font-bold text-indigo-600">{vocabulary.length}</div>
+                  <div className="text-4xl font-bold text-indigo-600">{deck.length}</div>
                   <div className="text-sm text-gray-600 mt-2">Words Reviewed</div>
                 </div>
                 <div className="bg-gradient-to-br from-purple-50 to-pink-50 rounded-2xl p-6">
@@ -239,7 +283,7 @@ export default function VocabularyPage() {
                   setShowCelebration(false);
                   setCurrentCardIndex(0);
                   setIsFlipped(false);
-                  fetchTranslation(vocabulary[0].word, vocabulary[0].language_code);
+                  fetchTranslation(deck[0].word, deck[0].language_code);
                 }}
                 className="bg-gradient-to-r from-indigo-600 to-purple-800 text-white px-8 py-4 rounded-2xl hover:shadow-lg hover:shadow-purple-500/50 transition-all duration-300 transform hover:scale-105 font-semibold text-lg"
               >
@@ -266,7 +310,7 @@ export default function VocabularyPage() {
               Flashcard Mode 🎴
             </h1>
             <p className="text-gray-600">
-              Card {currentCardIndex + 1} of {vocabulary.length}
+              Card {currentCardIndex + 1} of {deck.length}
             </p>
             <button
               onClick={exitFlashcards}
@@ -297,6 +341,16 @@ export default function VocabularyPage() {
                   <p className="text-xl text-gray-500 mb-6">
                     {currentWord.language_code.toUpperCase()}
                   </p>
+                  <button
+                    onClick={event => {
+                      event.stopPropagation();
+                      speakWord(currentWord);
+                    }}
+                    disabled={speaking}
+                    className="mb-6 text-indigo-600 hover:text-indigo-700 font-medium disabled:opacity-50"
+                  >
+                    {speaking ? '🔊 Playing...' : '🔊 Listen'}
+                  </button>
                   <p className="text-sm text-indigo-600 animate-pulse">
                     Click to reveal translation
                   </p>
@@ -339,7 +393,7 @@ export default function VocabularyPage() {
             <button
               onClick={() => {
                 markAsReviewed();
-                if (currentCardIndex < vocabulary.length - 1) {
+                if (currentCardIndex < deck.length - 1) {
                   nextCard();
                 }
               }}
@@ -350,7 +404,7 @@ export default function VocabularyPage() {
             
             <button
               onClick={nextCard}
-              disabled={currentCardIndex === vocabulary.length - 1}
+              disabled={currentCardIndex === deck.length - 1}
               className="flex-1 bg-white text-indigo-600 px-6 py-3 rounded-xl font-semibold hover:bg-indigo-50 transition-colors disabled:opacity-50 disabled:cursor-not-allowed shadow-lg"
             >
               Next →
@@ -363,7 +417,7 @@ export default function VocabularyPage() {
               <div
                 className="bg-gradient-to-r from-indigo-500 to-purple-600 h-full transition-all duration-300"
                 style={{
-                  width: `${((currentCardIndex + 1) / vocabulary.length) * 100}%`,
+                  width: `${((currentCardIndex + 1) / deck.length) * 100}%`,
                 }}
               ></div>
             </div>
@@ -454,7 +508,7 @@ export default function VocabularyPage() {
                 onClick={startFlashcards}
                 className="bg-gradient-to-r from-indigo-600 to-purple-800 text-white px-8 py-4 rounded-2xl hover:shadow-lg hover:shadow-purple-500/50 transition-all duration-300 transform hover:scale-105 font-semibold text-lg flex items-center gap-2"
               >
-                🎴 Start Flashcards
+                🎴 Start Flashcards{dueWords.length > 0 ? ` (${dueWords.length} due)` : ''}
               </button>
             )}
           </div>
@@ -0,0 +1,69 @@
+// Grading of written answers against the answer keys compiled by
+// scripts/answer_grader.py when lessons are seeded. The normalization here
+// must stay in step with that module.
+
+export interface AnswerKeys {
+  exact: string[];
+  // [answer without accents, tones or spaces, typos tolerated]
+  loose: [string, number][];
+  // Other words of the course a typo away from an answer, which are graded wrong
+  near?: string[];
+}
+
+// Built with the RegExp constructor: property escapes need ES2018 syntax
+const PUNCTUATION_OR_SYMBOL = new RegExp('[\\p{P}\\p{S}]', 'gu');
+const COMBINING_MARK = new RegExp('\\p{Mn}', 'gu');
+const SPACES_AROUND_HAN = /\s*([一-龥])\s*/g;
+const TONE_NUMBER = /([a-z])[1-5]/g;
+const HAN = /[一-龥]/;
+
+export function normalizeAnswer(text: string) {
+  return text
+    .normalize('NFKC')
+    .toLowerCase()
+    .replace(/ß/g, 'ss')
+    .replace(PUNCTUATION_OR_SYMBOL, ' ')
+    .replace(/\s+/g, ' ')
+    .trim()
+    .replace(SPACES_AROUND_HAN, '$1');
+}
+
+function loosenAnswer(key: string) {
+  return key.normalize('NFD').replace(COMBINING_MARK, '').replace(TONE_NUMBER, '$1').replace(/ /g, '');
+}
+
+function allowedEdits(key: string) {
+  if (HAN.test(key) || key.length < 4) return 0;
+  return key.length < 8 ? 1 : 2;
+}
+
+function withinEdits(a: string, b: string, limit: number) {
+  if (Math.abs(a.length - b.length) > limit) return false;
+  let previous = Array.from({ length: b.length + 1 }, (_, j) => j);
+  for (let i = 1; i <= a.length; i++) {
+    const current = [i];
+    for (let j = 1; j <= b.length; j++) {
+      current[j] = Math.min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] === b[j - 1] ? 0 : 1));
+    }
+    if (Math.min(...current) > limit) return false;
+    previous = current;
+  }
+  return previous[b.length] <= limit;
+}
+
+// Keys for lessons seeded before answer keys were compiled
+export function answerKeysFor(correctAnswer: string | string[] | undefined): AnswerKeys {
+  const answers = (Array.isArray(correctAnswer) ? correctAnswer : [correctAnswer || ''])
+    .flatMap(answer => [answer, ...(answer.includes('/') ? answer.split('/') : [])]);
+  const exact = Array.from(new Set(answers.map(normalizeAnswer))).filter(Boolean);
+  return { exact, loose: exact.map(key => [loosenAnswer(key), allowedEdits(key)] as [string, number]) };
+}
+
+export function isCorrectAnswer(answer: string, keys: AnswerKeys) {
+  const submitted = normalizeAnswer(answer);
+  if (keys.exact.includes(submitted)) return true;
+  const relaxed = loosenAnswer(submitted);
+  if (keys.loose.some(([key]) => key === relaxed)) return true;
+  if (keys.near?.includes(relaxed)) return false;
+  return keys.loose.some(([key, edits]) => edits > 0 && withinEdits(relaxed, key, edits));
+}
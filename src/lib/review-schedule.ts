@@ -0,0 +1,61 @@
+// SM-2 schedule of a vocabulary word, applied when a flashcard is reviewed.
+// The steps are those of replay() in scripts/schedule_reviews.py, so the
+// nightly job finds nothing left to reschedule for words reviewed here.
+const INITIAL_EASE = 2.5;
+const MIN_EASE = 1.3;
+const REVIEW_QUALITY = 4; // 0-5; 3 and above is a successful review
+const FIRST_INTERVAL_DAYS = 1;
+const SECOND_INTERVAL_DAYS = 6;
+const MAX_INTERVAL_DAYS = 365;
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+export interface ReviewState {
+  times_reviewed: number;
+  ease_factor?: number | null;
+  interval_days?: number | null;
+  repetitions?: number | null;
+  scheduled_reviews?: number | null;
+}
+
+// Rounds halves to even, like numpy's rint
+function roundHalfEven(value: number) {
+  const rounded = Math.round(value);
+  return Math.abs(value % 1) === 0.5 && rounded % 2 !== 0 ? rounded - 1 : rounded;
+}
+
+// Columns to update when a word is reviewed once more
+export function scheduleReview(word: ReviewState, now = new Date()) {
+  const timesReviewed = word.times_reviewed + 1;
+  let scheduled = word.scheduled_reviews ?? 0;
+  let repetitions = word.repetitions ?? 0;
+  let ease = word.ease_factor || INITIAL_EASE;
+  let interval = word.interval_days ?? 0;
+
+  // Start over when times_reviewed went down (the word was reset)
+  if (scheduled > timesReviewed) {
+    scheduled = 0;
+    repetitions = 0;
+    ease = INITIAL_EASE;
+    interval = 0;
+  }
+
+  // Learning the word counts as its first review, so a new word catches up here
+  const easeChange = 0.1 - (5 - REVIEW_QUALITY) * (0.08 + (5 - REVIEW_QUALITY) * 0.02);
+  for (; scheduled < timesReviewed; scheduled++) {
+    if (repetitions === 0) interval = FIRST_INTERVAL_DAYS;
+    else if (repetitions === 1) interval = SECOND_INTERVAL_DAYS;
+    else interval = Math.min(MAX_INTERVAL_DAYS, roundHalfEven(interval * ease));
+    ease = Math.max(MIN_EASE, ease + easeChange);
+    repetitions++;
+  }
+
+  return {
+    times_reviewed: timesReviewed,
+    last_reviewed_at: now.toISOString(),
+    ease_factor: Math.round(ease * 100) / 100,
+    interval_days: interval,
+    repetitions,
+    scheduled_reviews: timesReviewed,
+    next_review_at: new Date(now.getTime() + interval * DAY_MS).toISOString(),
+  };
+}
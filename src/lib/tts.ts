@@ -10,6 +10,49 @@ let isPlaying = false;
 let lastPlayedMessage = '';
 let lastPlayedTimestamp = 0;
 
+// Lesson audio rendered ahead of time by scripts/prerender_audio.py
+const PRERENDERED_AUDIO_URL = '/audio/lessons';
+const VOICE_ID = 'JBFqnCBsd6RMkjVDRZzb';
+const MODEL_ID = 'eleven_v3';
+
+let manifestPromise: Promise<Record<string, { file: string }>> | null = null;
+
+function loadManifest() {
+  if (!manifestPromise) {
+    manifestPromise = fetch(`${PRERENDERED_AUDIO_URL}/manifest.json`)
+      .then(response => (response.ok ? response.json() : {}))
+      .then(manifest => manifest.entries ?? {})
+      .catch(() => ({}));
+  }
+  return manifestPromise;
+}
+
+async function sha256Hex(text: string) {
+  const digest = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(text));
+  return Array.from(new Uint8Array(digest), byte => byte.toString(16).padStart(2, '0')).join('');
+}
+
+// URL of the pre-rendered audio for a text, or null if it has not been rendered
+export async function findPrerenderedAudio(text: string, language: string) {
+  const entries = await loadManifest();
+  // Keyed the same way as audio_key() in scripts/prerender_audio.py
+  const key = await sha256Hex(`${VOICE_ID}\n${MODEL_ID}\n${language}\n${text.normalize('NFC').trim()}`);
+  const entry = entries[key];
+  return entry ? `${PRERENDERED_AUDIO_URL}/${entry.file}` : null;
+}
+
+async function fetchPrerenderedAudio(text: string, language: string) {
+  try {
+    const url = await findPrerenderedAudio(text, language);
+    if (!url) return null;
+    const response = await fetch(url);
+    return response.ok ? new Uint8Array(await response.arrayBuffer()) : null;
+  } catch (e) {
+    // Fall back to streaming
+    return null;
+  }
+}
+
 export function stopAudio() {
   if (currentAudioContext) {
     currentSources.forEach(source => {
@@ -26,7 +69,7 @@ export function stopAudio() {
   }
 }
 
-export async function playStreamingAudio(text: string, onStart?: () => void, onEnd?: () => void) {
+export async function playStreamingAudio(text: string, onStart?: () => void, onEnd?: () => void, language?: string) {
   // Prevent duplicate plays within 1 second and for the same message
   const now = Date.now();
   if (text === lastPlayedMessage && now - lastPlayedTimestamp < 1000) {
@@ -48,39 +91,44 @@ export async function playStreamingAudio(text: string, onStart?: () => void, onE
     isPlaying = true;
     onStart?.();
 
-    const audioStream = await elevenlabs.textToSpeech.stream('JBFqnCBsd6RMkjVDRZzb', {
-      text,
-      modelId: 'eleven_v3',
-    });
-
-    const reader = audioStream.getReader();
+    // Lesson content is usually pre-rendered; only stream what is not
+    let completeAudio = language ? await fetchPrerenderedAudio(text, language) : null;
     currentAudioContext = new AudioContext();
-    
-    // Collect all audio chunks first
-    const audioChunks: Uint8Array[] = [];
-    
-    while (isPlaying) {
-      const { done, value } = await reader.read();
-      if (done) break;
-      
-      if (value && isPlaying) {
-        audioChunks.push(new Uint8Array(value.buffer));
+
+    if (!completeAudio) {
+      const audioStream = await elevenlabs.textToSpeech.stream(VOICE_ID, {
+        text,
+        modelId: MODEL_ID,
+      });
+
+      const reader = audioStream.getReader();
+
+      // Collect all audio chunks first
+      const audioChunks: Uint8Array[] = [];
+
+      while (isPlaying) {
+        const { done, value } = await reader.read();
+        if (done) break;
+
+        if (value && isPlaying) {
+          audioChunks.push(new Uint8Array(value.buffer));
+        }
       }
-    }
 
-    if (!isPlaying) {
-      reader.cancel();
-      onEnd?.();
-      return;
-    }
+      if (!isPlaying) {
+        reader.cancel();
+        onEnd?.();
+        return;
+      }
 
-    // Concatenate all chunks into one buffer
-    const totalLength = audioChunks.reduce((acc, chunk) => acc + chunk.length, 0);
-    const completeAudio = new Uint8Array(totalLength);
-    let offset = 0;
-    for (const chunk of audioChunks) {
-      completeAudio.set(chunk, offset);
-      offset += chunk.length;
+      // Concatenate all chunks into one buffer
+      const totalLength = audioChunks.reduce((acc, chunk) => acc + chunk.length, 0);
+      completeAudio = new Uint8Array(totalLength);
+      let offset = 0;
+      for (const chunk of audioChunks) {
+        completeAudio.set(chunk, offset);
+        offset += chunk.length;
+      }
     }
 
     // Decode and play the complete audio
@@ -0,0 +1,119 @@
+// Reader for the vocabulary index built by scripts/vocabulary_index.py, which
+// maps each word to the lessons, activities and reading texts that use it.
+// See that script for the file format.
+const VOCABULARY_INDEX_URL = '/vocabulary-index';
+const MAGIC = 0x58434f56; // "VOCX" read as a little-endian uint32
+const FORMAT_VERSION = 1;
+const HEADER_SIZE = 36;
+const SLOT_SIZE = 8;
+const WORD_SIZE = 16;
+const DOC_SIZE = 8;
+
+interface VocabularyIndex {
+  view: DataView;
+  slotCount: number;
+  wordsOffset: number;
+  docsOffset: number;
+  postingsOffset: number;
+  stringsOffset: number;
+}
+
+export interface WordLocation {
+  lessonNumber?: number;
+  activityOrder?: number;
+  textId?: string;
+}
+
+const indexPromises: Record<string, Promise<VocabularyIndex | null>> = {};
+
+function loadIndex(language: string) {
+  if (!indexPromises[language]) {
+    indexPromises[language] = fetch(`${VOCABULARY_INDEX_URL}/${language}.vix`)
+      .then(response => (response.ok ? response.arrayBuffer() : null))
+      .then(buffer => {
+        if (!buffer || buffer.byteLength < HEADER_SIZE) return null;
+        const view = new DataView(buffer);
+        if (view.getUint32(0, true) !== MAGIC || view.getUint16(4, true) !== FORMAT_VERSION) return null;
+        return {
+          view,
+          slotCount: view.getUint32(8, true),
+          wordsOffset: view.getUint32(20, true),
+          docsOffset: view.getUint32(24, true),
+          postingsOffset: view.getUint32(28, true),
+          stringsOffset: view.getUint32(32, true),
+        };
+      })
+      .catch(() => null);
+  }
+  return indexPromises[language];
+}
+
+// 32-bit FNV-1a, the same hash as fnv1a() in scripts/vocabulary_index.py
+function fnv1a(bytes: Uint8Array) {
+  let hash = 0x811c9dc5;
+  for (const byte of bytes) {
+    hash = Math.imul(hash ^ byte, 0x01000193) >>> 0;
+  }
+  return hash;
+}
+
+function sameBytes(index: VocabularyIndex, offset: number, bytes: Uint8Array) {
+  const stored = new Uint8Array(index.view.buffer, index.stringsOffset + offset, bytes.length);
+  return stored.every((byte, i) => byte === bytes[i]);
+}
+
+function documentKey(index: VocabularyIndex, document: number) {
+  const entry = index.docsOffset + document * DOC_SIZE;
+  const offset = index.stringsOffset + index.view.getUint32(entry, true);
+  const length = index.view.getUint32(entry + 4, true);
+  return new TextDecoder().decode(new Uint8Array(index.view.buffer, offset, length));
+}
+
+function parseDocument(key: string): WordLocation {
+  const [kind, ...rest] = key.split(':');
+  if (kind === 'text') return { textId: rest.join(':') };
+  return {
+    lessonNumber: Number(rest[0]),
+    activityOrder: rest.length > 1 ? Number(rest[1]) : undefined,
+  };
+}
+
+// Lessons, activities and reading texts that use a word (empty when it is not indexed)
+export async function findWordLocations(word: string, language: string): Promise<WordLocation[]> {
+  const index = await loadIndex(language);
+  if (!index) return [];
+
+  // Normalized the same way as normalize() in scripts/vocabulary_index.py
+  const bytes = new TextEncoder().encode(word.normalize('NFC').trim().toLowerCase());
+  const hash = fnv1a(bytes);
+  const mask = index.slotCount - 1;
+  for (let slot = hash & mask; ; slot = (slot + 1) & mask) {
+    const slotOffset = HEADER_SIZE + slot * SLOT_SIZE;
+    const number = index.view.getUint32(slotOffset + 4, true);
+    if (number === 0) return [];
+    if (index.view.getUint32(slotOffset, true) !== hash) continue;
+
+    const entry = index.wordsOffset + (number - 1) * WORD_SIZE;
+    const length = index.view.getUint32(entry + 4, true);
+    if (length !== bytes.length || !sameBytes(index, index.view.getUint32(entry, true), bytes)) continue;
+
+    const first = index.view.getUint32(entry + 8, true);
+    const count = index.view.getUint32(entry + 12, true);
+    const locations = [];
+    for (let i = 0; i < count; i++) {
+      const document = index.view.getUint32(index.postingsOffset + (first + i) * 4, true);
+      locations.push(parseDocument(documentKey(index, document)));
+    }
+    return locations;
+  }
+}
+
+// Numbers of the lessons that teach or practise a word, in order
+export async function findLessonsForWord(word: string, language: string) {
+  const locations = await findWordLocations(word, language);
+  const lessons = new Set<number>();
+  for (const location of locations) {
+    if (location.lessonNumber !== undefined) lessons.add(location.lessonNumber);
+  }
+  return Array.from(lessons);
+}
@@ -0,0 +1,25 @@
+-- Add precomputed tokenization and word statistics to reading_texts.
+-- Filled in by scripts/ingest_reading_texts.py.
+ALTER TABLE public.reading_texts
+ADD COLUMN IF NOT EXISTS tokens JSONB,
+ADD COLUMN IF NOT EXISTS word_frequencies JSONB,
+ADD COLUMN IF NOT EXISTS stats JSONB;
+
+-- 005 and 008 both add texts titled 'My Day - 我的一天' and
+-- 'Chinese Tea Culture - 中国的茶文化' with different content. Number the later
+-- copies so both texts (and any progress on them) are kept.
+UPDATE public.reading_texts AS t
+SET title = t.title || ' (' || d.copy_number || ')'
+FROM (
+  SELECT id, ROW_NUMBER() OVER (PARTITION BY language_code, title ORDER BY created_at, id) AS copy_number
+  FROM public.reading_texts
+) AS d
+WHERE t.id = d.id AND d.copy_number > 1;
+
+-- One text per title and language, so ingestion can upsert on these columns
+CREATE UNIQUE INDEX IF NOT EXISTS idx_reading_texts_language_title
+  ON public.reading_texts(language_code, title);
+
+COMMENT ON COLUMN public.reading_texts.tokens IS 'The content split into the tokens the reading page renders (words for Chinese); joined together they give back the content';
+COMMENT ON COLUMN public.reading_texts.word_frequencies IS 'How often each word occurs in the text, most frequent first';
+COMMENT ON COLUMN public.reading_texts.stats IS 'Unique words, sentence and word lengths, share of lesson vocabulary and a 0-100 difficulty score';
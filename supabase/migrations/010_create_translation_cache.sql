@@ -0,0 +1,35 @@
+-- Cache of word and phrase translations, shared by all users.
+-- Filled in by scripts/prewarm_translations.py and read by /api/translate.
+CREATE TABLE IF NOT EXISTS public.translation_cache (
+  source_lang TEXT NOT NULL,
+  target_lang TEXT NOT NULL,
+  text TEXT NOT NULL, -- NFC-normalized, trimmed, whitespace collapsed
+  translation TEXT NOT NULL,
+  backend TEXT NOT NULL,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  PRIMARY KEY (source_lang, target_lang, text)
+);
+
+-- Enable RLS
+ALTER TABLE public.translation_cache ENABLE ROW LEVEL SECURITY;
+
+-- Translations are not private; only the service role writes them
+CREATE POLICY "Anyone can view cached translations"
+  ON public.translation_cache FOR SELECT
+  USING (true);
+
+-- Create function to update updated_at timestamp for translation_cache
+CREATE OR REPLACE FUNCTION public.update_translation_cache_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.updated_at = NOW();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Create trigger to automatically update updated_at for translation_cache
+CREATE TRIGGER update_translation_cache_timestamp
+  BEFORE UPDATE ON public.translation_cache
+  FOR EACH ROW
+  EXECUTE FUNCTION public.update_translation_cache_updated_at();
@@ -0,0 +1,20 @@
+-- Spaced-repetition schedule (SM-2) for user_vocabulary.
+-- Computed in bulk by scripts/schedule_reviews.py.
+ALTER TABLE public.user_vocabulary
+ADD COLUMN IF NOT EXISTS ease_factor REAL NOT NULL DEFAULT 2.5,
+ADD COLUMN IF NOT EXISTS interval_days INTEGER NOT NULL DEFAULT 0,
+ADD COLUMN IF NOT EXISTS repetitions INTEGER NOT NULL DEFAULT 0,
+ADD COLUMN IF NOT EXISTS scheduled_reviews INTEGER NOT NULL DEFAULT 0,
+ADD COLUMN IF NOT EXISTS last_reviewed_at TIMESTAMP WITH TIME ZONE,
+ADD COLUMN IF NOT EXISTS next_review_at TIMESTAMP WITH TIME ZONE;
+
+-- "Due now for this user" reads a range of this index instead of every word
+CREATE INDEX IF NOT EXISTS idx_user_vocabulary_due
+  ON public.user_vocabulary(user_id, language_code, next_review_at);
+
+COMMENT ON COLUMN public.user_vocabulary.ease_factor IS 'SM-2 ease factor (at least 1.3); intervals grow by this factor after each successful review';
+COMMENT ON COLUMN public.user_vocabulary.interval_days IS 'Days between the last review and next_review_at';
+COMMENT ON COLUMN public.user_vocabulary.repetitions IS 'Successful reviews in a row';
+COMMENT ON COLUMN public.user_vocabulary.scheduled_reviews IS 'times_reviewed when the schedule was last computed; differs from times_reviewed when the word needs rescheduling';
+COMMENT ON COLUMN public.user_vocabulary.last_reviewed_at IS 'When the word was last reviewed as a flashcard';
+COMMENT ON COLUMN public.user_vocabulary.next_review_at IS 'When the word is due for review; NULL until the word is first scheduled';
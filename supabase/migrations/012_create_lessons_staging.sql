@@ -0,0 +1,169 @@
+-- Staging area for publishing a whole course at once.
+-- scripts/main.py --publish loads a course here, then calls publish_course(),
+-- which checks it and swaps it into public.lessons in one transaction.
+CREATE TABLE IF NOT EXISTS public.lessons_staging (
+  course_id UUID NOT NULL REFERENCES public.language_courses(id) ON DELETE CASCADE,
+  lesson_number INTEGER NOT NULL,
+  title TEXT NOT NULL,
+  description TEXT,
+  difficulty TEXT CHECK (difficulty IN ('easy', 'medium', 'hard')),
+  xp_reward INTEGER DEFAULT 10,
+  content JSONB,
+  is_published BOOLEAN DEFAULT true,
+  -- The published lesson this one replaces, set by publish_course()
+  lesson_id UUID,
+  staged_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  PRIMARY KEY (course_id, lesson_number)
+);
+
+-- Enable RLS; there are no policies, so only the service role can use the table
+ALTER TABLE public.lessons_staging ENABLE ROW LEVEL SECURITY;
+
+-- Publish the staged lessons of a course and empty its staging area.
+-- Each staged lesson is matched with a published one, so that the lesson
+-- keeps its id and the progress pointing at it: first on identical content
+-- (the activities, vocabulary and phrases), then on the title. A matched
+-- lesson is updated only if something changed, and renumbered if it moved.
+-- Staged lessons without a match are inserted, and published lessons
+-- without one are deleted with their progress. Any failed check raises, and
+-- the whole publish is rolled back.
+CREATE OR REPLACE FUNCTION public.publish_course(p_course_id UUID)
+RETURNS JSONB AS $$
+DECLARE
+  staged INTEGER;
+  problem TEXT;
+  inserted INTEGER;
+  updated INTEGER;
+  moved INTEGER;
+  deleted INTEGER;
+BEGIN
+  -- One publish per course at a time
+  PERFORM 1 FROM public.language_courses WHERE id = p_course_id FOR UPDATE;
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Course % does not exist', p_course_id;
+  END IF;
+
+  SELECT COUNT(*) INTO staged FROM public.lessons_staging WHERE course_id = p_course_id;
+  IF staged = 0 THEN
+    RAISE EXCEPTION 'No lessons are staged for course %', p_course_id;
+  END IF;
+
+  -- Lessons must be numbered 1..n
+  IF (SELECT MIN(lesson_number) <> 1 OR MAX(lesson_number) <> staged
+      FROM public.lessons_staging WHERE course_id = p_course_id) THEN
+    RAISE EXCEPTION 'Staged lessons of course % are not numbered 1 to %', p_course_id, staged;
+  END IF;
+
+  -- main.py stores content as a JSON string, which the app parses
+  SELECT format('lesson %s has %s', lesson_number,
+                CASE WHEN btrim(title) = '' THEN 'an empty title' ELSE 'no activities' END)
+  INTO problem
+  FROM (
+    SELECT lesson_number, title,
+           CASE WHEN jsonb_typeof(content) = 'string' THEN (content #>> '{}')::jsonb ELSE content END AS body
+    FROM public.lessons_staging
+    WHERE course_id = p_course_id
+  ) lesson
+  WHERE btrim(title) = ''
+     OR CASE WHEN jsonb_typeof(body -> 'activities') = 'array'
+             THEN jsonb_array_length(body -> 'activities') = 0
+             ELSE true END
+  ORDER BY lesson_number
+  LIMIT 1;
+  IF problem IS NOT NULL THEN
+    RAISE EXCEPTION 'Staged course % cannot be published: %', p_course_id, problem;
+  END IF;
+
+  UPDATE public.lessons_staging SET lesson_id = NULL WHERE course_id = p_course_id;
+
+  -- Match on identical content; the k-th copy of a content is paired with the k-th one
+  UPDATE public.lessons_staging s
+  SET lesson_id = m.id
+  FROM (
+    SELECT st.lesson_number, ex.id
+    FROM (SELECT lesson_number, content,
+                 row_number() OVER (PARTITION BY content ORDER BY lesson_number) AS k
+          FROM public.lessons_staging WHERE course_id = p_course_id) st
+    JOIN (SELECT id, content,
+                 row_number() OVER (PARTITION BY content ORDER BY lesson_number) AS k
+          FROM public.lessons WHERE course_id = p_course_id) ex
+      ON ex.content = st.content AND ex.k = st.k
+  ) m
+  WHERE s.course_id = p_course_id AND s.lesson_number = m.lesson_number;
+
+  -- Then match the rest on the title, so that edited lessons keep their id
+  UPDATE public.lessons_staging s
+  SET lesson_id = m.id
+  FROM (
+    SELECT st.lesson_number, ex.id
+    FROM (SELECT lesson_number, title,
+                 row_number() OVER (PARTITION BY title ORDER BY lesson_number) AS k
+          FROM public.lessons_staging WHERE course_id = p_course_id AND lesson_id IS NULL) st
+    JOIN (SELECT id, title,
+                 row_number() OVER (PARTITION BY title ORDER BY lesson_number) AS k
+          FROM public.lessons l
+          WHERE course_id = p_course_id
+            AND NOT EXISTS (SELECT 1 FROM public.lessons_staging s
+                            WHERE s.course_id = p_course_id AND s.lesson_id = l.id)) ex
+      ON ex.title = st.title AND ex.k = st.k
+  ) m
+  WHERE s.course_id = p_course_id AND s.lesson_number = m.lesson_number;
+
+  DELETE FROM public.lessons l
+  WHERE l.course_id = p_course_id
+    AND NOT EXISTS (
+      SELECT 1 FROM public.lessons_staging s
+      WHERE s.course_id = p_course_id AND s.lesson_id = l.id
+    );
+  GET DIAGNOSTICS deleted = ROW_COUNT;
+
+  UPDATE public.lessons l
+  SET title = s.title,
+      description = s.description,
+      difficulty = s.difficulty,
+      xp_reward = s.xp_reward,
+      content = s.content,
+      is_published = s.is_published
+  FROM public.lessons_staging s
+  WHERE s.course_id = p_course_id
+    AND s.lesson_id = l.id
+    AND (l.title, l.description, l.difficulty, l.xp_reward, l.content, l.is_published)
+        IS DISTINCT FROM (s.title, s.description, s.difficulty, s.xp_reward, s.content, s.is_published);
+  GET DIAGNOSTICS updated = ROW_COUNT;
+
+  -- Renumber in two steps: the unique (course_id, lesson_number) constraint is
+  -- checked row by row, so moved lessons are parked on negative numbers first
+  UPDATE public.lessons l
+  SET lesson_number = -s.lesson_number
+  FROM public.lessons_staging s
+  WHERE s.course_id = p_course_id
+    AND s.lesson_id = l.id
+    AND l.lesson_number <> s.lesson_number;
+  GET DIAGNOSTICS moved = ROW_COUNT;
+
+  UPDATE public.lessons
+  SET lesson_number = -lesson_number
+  WHERE course_id = p_course_id AND lesson_number < 0;
+
+  INSERT INTO public.lessons (course_id, lesson_number, title, description, difficulty, xp_reward, content, is_published)
+  SELECT s.course_id, s.lesson_number, s.title, s.description, s.difficulty, s.xp_reward, s.content, s.is_published
+  FROM public.lessons_staging s
+  WHERE s.course_id = p_course_id AND s.lesson_id IS NULL;
+  GET DIAGNOSTICS inserted = ROW_COUNT;
+
+  UPDATE public.language_courses SET total_lessons = staged WHERE id = p_course_id;
+  DELETE FROM public.lessons_staging WHERE course_id = p_course_id;
+
+  RETURN jsonb_build_object(
+    'inserted', inserted,
+    'updated', updated,
+    'moved', moved,
+    'unchanged', staged - inserted - updated,
+    'deleted', deleted
+  );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Publishing is for the service role only
+REVOKE EXECUTE ON FUNCTION public.publish_course(UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.publish_course(UUID) TO service_role;